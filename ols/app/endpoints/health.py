@@ -7,7 +7,7 @@ methods. For HEAD HTTP method, just the HTTP response code is used.
 
 import logging
 import time
-from typing import Any
+from typing import Any, Optional
 
 from fastapi import APIRouter, HTTPException, status
 from langchain_core.messages.ai import AIMessage
@@ -18,6 +18,7 @@ from ols.app.models.models import (
     NotAvailableResponse,
     ReadinessResponse,
 )
+from ols.constants import IndexLoadState
 from ols.src.llms.llm_loader import load_llm
 
 router = APIRouter(tags=["health"])
@@ -61,10 +62,34 @@ def llm_is_ready() -> bool:
 
 
 def index_is_ready() -> bool:
-    """Check if the index is loaded."""
-    if config.rag_index is None and config.ols_config.reference_content is not None:
+    """Check if the index is loaded.
+
+    Indexes are ready when none of them is loading anymore. With
+    `ready_on_primary_index` set, it is enough when the primary (first)
+    index is loaded, the remaining ones are loaded in the background.
+    """
+    reference_content = config.ols_config.reference_content
+    if reference_content is None:
+        return True
+    if config.rag_index is None:
         return False
-    return True
+    states = config.rag_index_loader.index_states
+    if IndexLoadState.LOADING not in states:
+        return True
+    primary_state = next(
+        (state for state in states if state != IndexLoadState.SKIPPED), None
+    )
+    return (
+        reference_content.ready_on_primary_index
+        and primary_state == IndexLoadState.LOADED
+    )
+
+
+def index_states() -> Optional[list[IndexLoadState]]:
+    """Return loading states of configured indexes, if there are any."""
+    if config.ols_config.reference_content is None:
+        return None
+    return config.rag_index_loader.index_states or None
 
 
 def cache_is_ready() -> bool:
@@ -114,7 +139,9 @@ def readiness_probe_get_method() -> ReadinessResponse:
             },
         )
 
-    return ReadinessResponse(ready=True, reason="service is ready")
+    return ReadinessResponse(
+        ready=True, reason="service is ready", index_states=index_states()
+    )
 
 
 get_liveness_responses: dict[int | str, dict[str, Any]] = {
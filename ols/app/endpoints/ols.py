@@ -7,11 +7,12 @@ import os
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Generator, Optional, Union
+from typing import Any, Generator, Optional
 
 import psycopg2
 import pytz
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from langchain_core.messages import AIMessage, HumanMessage
 
 from ols import config, constants
@@ -40,7 +41,7 @@ from ols.src.query_helpers.question_validator import QuestionValidator
 from ols.src.quota.quota_limiter import QuotaLimiter
 from ols.src.quota.token_usage_history import TokenUsageHistory
 from ols.utils import errors_parsing, suid
-from ols.utils.token_handler import PromptTooLongError
+from ols.utils.token_handler import PromptTooLongError, TokenHandler
 
 KEYWORDS = keywords.KEYWORDS
 INVALID_QUERY_RESP = prompts.INVALID_QUERY_RESP
@@ -106,7 +107,7 @@ def merge_tools_info(tool_calls: list[dict], tool_results: list[dict]) -> list[d
 
 
 @router.post("/query", responses=query_responses)
-def conversation_request(
+async def conversation_request(
     llm_request: LLMRequest,
     auth: Any = Depends(auth_dependency),
     user_id: Optional[str] = None,
@@ -121,7 +122,9 @@ def conversation_request(
     Returns:
         Response containing the processed information.
     """
-    processed_request = process_request(auth, llm_request)
+    # the request is handled on the event loop, so steps that block (cache
+    # and quota storage, question validation, transcripts) run in threadpool
+    processed_request = await run_in_threadpool(process_request, auth, llm_request)
 
     summarizer_response: SummarizerResponse | Generator
 
@@ -136,11 +139,10 @@ def conversation_request(
     else:
         client_headers = llm_request.mcp_headers
 
-        summarizer_response = generate_response(
+        summarizer_response = await generate_response_async(
             processed_request.conversation_id,
             llm_request,
             processed_request.previous_input,
-            streaming=False,
             user_token=processed_request.user_token,
             client_headers=client_headers,
         )
@@ -193,7 +195,8 @@ def conversation_request(
             )
         )
 
-    store_conversation_history(
+    await run_in_threadpool(
+        store_conversation_history,
         processed_request.user_id,
         processed_request.conversation_id,
         llm_request,
@@ -208,7 +211,8 @@ def conversation_request(
     if config.ols_config.user_data_collection.transcripts_disabled:
         logger.debug("transcripts collections is disabled in configuration")
     else:
-        store_transcript(
+        await run_in_threadpool(
+            store_transcript,
             processed_request.user_id,
             processed_request.conversation_id,
             processed_request.valid,
@@ -234,7 +238,8 @@ def conversation_request(
     input_tokens = calc_input_tokens(summarizer_response.token_counter)
     output_tokens = calc_output_tokens(summarizer_response.token_counter)
 
-    consume_tokens(
+    await run_in_threadpool(
+        consume_tokens,
         config.quota_limiters,
         config.token_usage_history,
         processed_request.user_id,
@@ -244,8 +249,8 @@ def conversation_request(
         llm_request.model or config.ols_config.default_model,
     )
 
-    available_quotas = get_available_quotas(
-        config.quota_limiters, processed_request.user_id
+    available_quotas = await run_in_threadpool(
+        get_available_quotas, config.quota_limiters, processed_request.user_id
     )
 
     return LLMResponse(
@@ -509,7 +514,10 @@ def retrieve_previous_input(
         previous_input = []
         if conversation_id:
             cache_content = config.conversation_cache.get(
-                user_id, conversation_id, skip_user_id_check
+                user_id,
+                conversation_id,
+                skip_user_id_check,
+                limit=constants.CONVERSATION_HISTORY_MAX_ENTRIES,
             )
             if cache_content is not None:
                 previous_input = cache_content
@@ -564,22 +572,22 @@ def generate_response(
     conversation_id: str,
     llm_request: LLMRequest,
     previous_input: list[CacheEntry],
-    streaming: bool = False,
     user_token: Optional[str] = None,
     client_headers: dict[str, dict[str, str]] | None = None,
-) -> Union[SummarizerResponse, Generator]:
-    """Generate response based on validation result, previous input, and model output.
+) -> Generator:
+    """Generate streamed response based on previous input and model output.
+
+    Complete (not streamed) responses are generated by `generate_response_async`.
 
     Args:
         conversation_id: The unique identifier for the conversation.
         llm_request: The request containing a query.
         previous_input: The history of the conversation (if available).
-        streaming: The flag indicating if the response should be streamed.
         user_token: The user token used for authorization.
         client_headers: Client-provided MCP headers for authentication.
 
     Returns:
-        SummarizerResponse or Generator, depending on the streaming flag.
+        Generator of the streamed response.
     """
     try:
         docs_summarizer = DocsSummarizer(
@@ -590,40 +598,80 @@ def generate_response(
             client_headers=client_headers,
         )
         history = CacheEntry.cache_entries_to_history(previous_input)
-        if streaming:
-            return docs_summarizer.generate_response(
-                llm_request.query, config.rag_index_loader.get_retriever(), history
-            )
-        response = docs_summarizer.create_response(
+        return docs_summarizer.generate_response(
+            llm_request.query, config.rag_index_loader.get_retriever(), history
+        )
+    except Exception as summarizer_error:
+        raise summarizer_error_to_http_exception(summarizer_error)
+
+
+async def generate_response_async(
+    conversation_id: str,
+    llm_request: LLMRequest,
+    previous_input: list[CacheEntry],
+    user_token: Optional[str] = None,
+    client_headers: dict[str, dict[str, str]] | None = None,
+) -> SummarizerResponse:
+    """Generate complete response without blocking the event loop.
+
+    Args:
+        conversation_id: The unique identifier for the conversation.
+        llm_request: The request containing a query.
+        previous_input: The history of the conversation (if available).
+        user_token: The user token used for authorization.
+        client_headers: Client-provided MCP headers for authentication.
+
+    Returns:
+        SummarizerResponse with the complete response.
+    """
+    try:
+        # loading of LLM and creating of retriever block, so they are done
+        # in the thread pool too
+        docs_summarizer = await run_in_threadpool(
+            DocsSummarizer,
+            provider=llm_request.provider,
+            model=llm_request.model,
+            system_prompt=llm_request.system_prompt,
+            user_token=user_token,
+            client_headers=client_headers,
+        )
+        rag_retriever = await run_in_threadpool(config.rag_index_loader.get_retriever)
+        history = CacheEntry.cache_entries_to_history(previous_input)
+        response = await docs_summarizer.create_response_async(
             llm_request.query,
-            config.rag_index_loader.get_retriever(),
+            rag_retriever,
             history,
         )
         logger.debug("%s Generated response: %s", conversation_id, response)
         return response
-    except PromptTooLongError as summarizer_error:
+    except Exception as summarizer_error:
+        raise summarizer_error_to_http_exception(summarizer_error)
+
+
+def summarizer_error_to_http_exception(summarizer_error: Exception) -> HTTPException:
+    """Log error raised while generating response and convert it to HTTPException."""
+    if isinstance(summarizer_error, PromptTooLongError):
         logger.error("Prompt is too long: %s", summarizer_error)
-        raise HTTPException(
+        return HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail={
                 "response": "Prompt is too long",
                 "cause": str(summarizer_error),
             },
         )
-    except Exception as summarizer_error:
-        logger.error("Error while obtaining answer for user question")
-        logger.exception(summarizer_error)
-        status_code, response_text, cause = errors_parsing.parse_generic_llm_error(
-            summarizer_error
-        )
-        response_text, cause = errors_parsing.handle_known_errors(response_text, cause)
-        raise HTTPException(
-            status_code=status_code,
-            detail={
-                "response": response_text,
-                "cause": cause,
-            },
-        )
+    logger.error("Error while obtaining answer for user question")
+    logger.exception(summarizer_error)
+    status_code, response_text, cause = errors_parsing.parse_generic_llm_error(
+        summarizer_error
+    )
+    response_text, cause = errors_parsing.handle_known_errors(response_text, cause)
+    return HTTPException(
+        status_code=status_code,
+        detail={
+            "response": response_text,
+            "cause": cause,
+        },
+    )
 
 
 def validate_requested_provider_model(llm_request: LLMRequest) -> None:
@@ -680,12 +728,19 @@ def store_conversation_history(
             if llm_request.model:
                 response_message.response_metadata["model"] = llm_request.model
 
+            # messages are counted now, so they do not need to be tokenized
+            # again every time they are part of conversation history
+            token_counts = TokenHandler().history_message_token_counts(
+                [query_message, response_message]
+            )
             cache_entry = CacheEntry(
                 query=query_message,
                 response=response_message,
                 attachments=attachments,
                 tool_calls=tool_calls or [],
                 tool_results=tool_results or [],
+                query_token_count=token_counts[0],
+                response_token_count=token_counts[1],
             )
             config.conversation_cache.insert_or_append(
                 user_id,
@@ -107,7 +107,6 @@ def conversation_request(
             processed_request.conversation_id,
             llm_request,
             processed_request.previous_input,
-            streaming=True,
             user_token=processed_request.user_token,
             client_headers=client_headers,
         )
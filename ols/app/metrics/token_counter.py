@@ -55,7 +55,9 @@ class GenericTokenCounter(AsyncCallbackHandler):  # pylint: disable=R0901
 
     def tokens_count(self, text: str) -> int:
         """Compute tokens count for given input text."""
-        return len(self.token_handler.text_to_tokens(text))
+        # streamed tokens and whole prompts are unlikely to be counted again,
+        # so they would only push out remembered counts of prompt parts
+        return self.token_handler.count_tokens(text, memoize=False)
 
     def __str__(self) -> str:
         """Textual representation of GenericTokenCounter instance."""
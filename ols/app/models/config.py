@@ -186,6 +186,9 @@ class AuthenticationConfig(BaseModel):
     skip_tls_verification: bool = False
     k8s_cluster_api: Optional[AnyHttpUrl] = None
     k8s_ca_cert_path: Optional[FilePath] = None
+    review_cache_ttl: int = constants.K8S_AUTH_CACHE_TTL
+    review_cache_negative_ttl: int = constants.K8S_AUTH_CACHE_NEGATIVE_TTL
+    review_cache_max_entries: int = constants.K8S_AUTH_CACHE_MAX_ENTRIES
 
     def validate_yaml(self) -> None:
         """Validate YAML containing authentication configuration section."""
@@ -196,6 +199,18 @@ class AuthenticationConfig(BaseModel):
                 f"invalid authentication module: {self.module}, supported modules are"
                 f" {constants.SUPPORTED_AUTHENTICATION_MODULES}"
             )
+        if self.review_cache_ttl < 0:
+            raise checks.InvalidConfigurationError(
+                "review_cache_ttl can not be negative"
+            )
+        if self.review_cache_negative_ttl < 0:
+            raise checks.InvalidConfigurationError(
+                "review_cache_negative_ttl can not be negative"
+            )
+        if self.review_cache_max_entries <= 0:
+            raise checks.InvalidConfigurationError(
+                "review_cache_max_entries must be positive"
+            )
 
 
 class TLSSecurityProfile(BaseModel):
@@ -322,6 +337,8 @@ class ProviderConfig(BaseModel):
     fake_provider_config: Optional[FakeConfig] = None
     certificates_store: Optional[str] = None
     tls_security_profile: Optional[TLSSecurityProfile] = None
+    max_connections: int = constants.DEFAULT_LLM_MAX_CONNECTIONS
+    max_keepalive_connections: int = constants.DEFAULT_LLM_MAX_KEEPALIVE_CONNECTIONS
 
     def __init__(
         self,
@@ -377,6 +394,13 @@ class ProviderConfig(BaseModel):
         self.tls_security_profile = TLSSecurityProfile(
             data.get("tlsSecurityProfile", None)
         )
+        self.max_connections = data.get(
+            "max_connections", constants.DEFAULT_LLM_MAX_CONNECTIONS
+        )
+        self.max_keepalive_connections = data.get(
+            "max_keepalive_connections",
+            constants.DEFAULT_LLM_MAX_KEEPALIVE_CONNECTIONS,
+        )
 
     def set_provider_type(self, data: dict) -> None:
         """Set the provider type."""
@@ -527,6 +551,8 @@ class ProviderConfig(BaseModel):
                 and self.watsonx_config == other.watsonx_config
                 and self.bam_config == other.bam_config
                 and self.tls_security_profile == other.tls_security_profile
+                and self.max_connections == other.max_connections
+                and self.max_keepalive_connections == other.max_keepalive_connections
             )
         return False
 
@@ -538,6 +564,18 @@ class ProviderConfig(BaseModel):
             raise checks.InvalidConfigurationError(
                 "provider URL is invalid, only http:// and https:// URLs are supported"
             )
+        if not isinstance(self.max_connections, int) or self.max_connections <= 0:
+            raise checks.InvalidConfigurationError(
+                f"max_connections for provider {self.name} needs to be a positive integer"
+            )
+        if (
+            not isinstance(self.max_keepalive_connections, int)
+            or not 0 <= self.max_keepalive_connections <= self.max_connections
+        ):
+            raise checks.InvalidConfigurationError(
+                f"max_keepalive_connections for provider {self.name} needs to be "
+                "between 0 and max_connections"
+            )
 
 
 class LLMProviders(BaseModel):
@@ -684,6 +722,10 @@ class PostgresConfig(BaseModel):
     gss_encmode: str = constants.POSTGRES_CACHE_GSSENCMODE
     ca_cert_path: Optional[FilePath] = None
     max_entries: PositiveInt = constants.POSTGRES_CACHE_MAX_ENTRIES
+    schema_mode: str = constants.POSTGRES_CACHE_SCHEMA
+    pool_min_size: int = constants.POSTGRES_POOL_MIN_SIZE
+    pool_max_size: PositiveInt = constants.POSTGRES_POOL_MAX_SIZE
+    pool_timeout: float = constants.POSTGRES_POOL_TIMEOUT
 
     def __init__(self, **data: Any) -> None:
         """Initialize configuration."""
@@ -698,6 +740,21 @@ class PostgresConfig(BaseModel):
         """Validate Postgres cache config."""
         if not 0 < self.port < 65536:
             raise ValueError("The port needs to be between 0 and 65536")
+        if not 0 <= self.pool_min_size <= self.pool_max_size:
+            raise ValueError(
+                "The pool_min_size needs to be between 0 and pool_max_size"
+            )
+        if self.pool_timeout <= 0:
+            raise ValueError("The pool_timeout needs to be positive")
+        if self.schema_mode not in (
+            constants.POSTGRES_CACHE_SCHEMA_BLOB,
+            constants.POSTGRES_CACHE_SCHEMA_MESSAGES,
+        ):
+            raise ValueError(
+                f"Invalid schema mode: {self.schema_mode}. "
+                f"Use '{constants.POSTGRES_CACHE_SCHEMA_BLOB}' or "
+                f"'{constants.POSTGRES_CACHE_SCHEMA_MESSAGES}' options."
+            )
         return self
 
 
@@ -918,11 +975,90 @@ class ReferenceContentIndex(BaseModel):
                 )
 
 
+class RerankerConfig(BaseModel):
+    """Configuration for reranking of retrieved chunks by cross-encoder model.
+
+    If this config is present, reranking is enabled. If absent, chunks are
+    ordered by similarity scores from vector database.
+    """
+
+    model_path: str = Field(description="Path to cross-encoder model")
+
+    onnx_file: Optional[str] = Field(
+        default=None,
+        description="ONNX export of the model (relative to model path) run by "
+        "ONNX Runtime instead of PyTorch",
+    )
+
+    onnx_threads: int = Field(
+        default=constants.DEFAULT_RERANKER_ONNX_THREADS,
+        ge=1,
+        description="Number of threads used by ONNX Runtime",
+    )
+
+    top_n: int = Field(
+        default=constants.DEFAULT_RERANKER_TOP_N,
+        ge=1,
+        description="Number of retrieved chunks that are reranked",
+    )
+
+    top_k: int = Field(
+        default=constants.RAG_CONTENT_LIMIT,
+        ge=1,
+        description="Number of reranked chunks used as context",
+    )
+
+    timeout: float = Field(
+        default=constants.DEFAULT_RERANKER_TIMEOUT,
+        gt=0.0,
+        description="Time budget for reranking in seconds, "
+        "chunks keep original order when it is exceeded",
+    )
+
+
+class HybridRetrievalConfig(BaseModel):
+    """Configuration for hybrid (dense + sparse) retrieval of chunks.
+
+    If this config is present, chunks are retrieved both by similarity of
+    embeddings and by BM25 index, and both results are fused by reciprocal
+    rank fusion. If absent, only similarity of embeddings is used.
+    """
+
+    dense_weight: float = Field(
+        default=constants.DEFAULT_HYBRID_RETRIEVAL_DENSE_WEIGHT,
+        ge=0.0,
+        description="Weight of ranks of chunks retrieved by similarity of embeddings",
+    )
+
+    sparse_weight: float = Field(
+        default=constants.DEFAULT_HYBRID_RETRIEVAL_SPARSE_WEIGHT,
+        ge=0.0,
+        description="Weight of ranks of chunks retrieved by BM25 index",
+    )
+
+    rrf_k: int = Field(
+        default=constants.DEFAULT_HYBRID_RETRIEVAL_RRF_K,
+        ge=1,
+        description="Constant of reciprocal rank fusion, "
+        "higher value lowers the influence of top ranks",
+    )
+
+
 class ReferenceContent(BaseModel):
     """Reference content configuration."""
 
     embeddings_model_path: Optional[FilePath] = None
+    embeddings_backend: str = constants.EmbeddingsBackend.TORCH
+    embeddings_onnx_file: str = constants.DEFAULT_EMBEDDINGS_ONNX_FILE
+    embeddings_onnx_threads: PositiveInt = constants.DEFAULT_EMBEDDINGS_ONNX_THREADS
     indexes: Optional[list[ReferenceContentIndex]] = None
+    reranker: Optional[RerankerConfig] = None
+    hybrid_retrieval: Optional[HybridRetrievalConfig] = None
+    deduplicate_chunks: bool = constants.RAG_DEDUPLICATE_CHUNKS
+    memory_map_indexes: bool = constants.RAG_INDEX_MEMORY_MAP
+    index_load_workers: PositiveInt = constants.RAG_INDEX_LOAD_MAX_WORKERS
+    index_reload_interval: int = constants.RAG_INDEX_RELOAD_INTERVAL
+    ready_on_primary_index: bool = False
 
     def __init__(self, data: Optional[dict] = None) -> None:
         """Initialize configuration and perform basic validation."""
@@ -931,17 +1067,55 @@ class ReferenceContent(BaseModel):
             return
 
         self.embeddings_model_path = data.get("embeddings_model_path", None)
+        self.embeddings_backend = data.get(
+            "embeddings_backend", constants.EmbeddingsBackend.TORCH
+        )
+        self.embeddings_onnx_file = data.get(
+            "embeddings_onnx_file", constants.DEFAULT_EMBEDDINGS_ONNX_FILE
+        )
+        self.embeddings_onnx_threads = data.get(
+            "embeddings_onnx_threads", constants.DEFAULT_EMBEDDINGS_ONNX_THREADS
+        )
         if "indexes" in data:
             self.indexes = [ReferenceContentIndex(i) for i in data["indexes"]]
         else:
             self.indexes = None
+        if data.get("reranker", None) is not None:
+            self.reranker = RerankerConfig(**data.get("reranker"))
+        if data.get("hybrid_retrieval", None) is not None:
+            self.hybrid_retrieval = HybridRetrievalConfig(
+                **data.get("hybrid_retrieval")
+            )
+        self.deduplicate_chunks = data.get(
+            "deduplicate_chunks", constants.RAG_DEDUPLICATE_CHUNKS
+        )
+        self.memory_map_indexes = data.get(
+            "memory_map_indexes", constants.RAG_INDEX_MEMORY_MAP
+        )
+        self.index_load_workers = data.get(
+            "index_load_workers", constants.RAG_INDEX_LOAD_MAX_WORKERS
+        )
+        self.index_reload_interval = data.get(
+            "index_reload_interval", constants.RAG_INDEX_RELOAD_INTERVAL
+        )
+        self.ready_on_primary_index = data.get("ready_on_primary_index", False)
 
     def __eq__(self, other: object) -> bool:
         """Compare two objects for equality."""
         if isinstance(other, ReferenceContent):
             return (
                 self.indexes == other.indexes
+                and self.reranker == other.reranker
+                and self.hybrid_retrieval == other.hybrid_retrieval
+                and self.deduplicate_chunks == other.deduplicate_chunks
                 and self.embeddings_model_path == other.embeddings_model_path
+                and self.embeddings_backend == other.embeddings_backend
+                and self.embeddings_onnx_file == other.embeddings_onnx_file
+                and self.embeddings_onnx_threads == other.embeddings_onnx_threads
+                and self.memory_map_indexes == other.memory_map_indexes
+                and self.index_load_workers == other.index_load_workers
+                and self.index_reload_interval == other.index_reload_interval
+                and self.ready_on_primary_index == other.ready_on_primary_index
             )
 
         return False
@@ -950,9 +1124,53 @@ class ReferenceContent(BaseModel):
         """Validate reference content config."""
         if self.embeddings_model_path is not None:
             checks.dir_check(self.embeddings_model_path, "Embeddings model path")
+        self._validate_embeddings_backend()
+        if self.embeddings_onnx_threads <= 0:
+            raise checks.InvalidConfigurationError(
+                "embeddings_onnx_threads must be positive"
+            )
+        if self.index_load_workers <= 0:
+            raise checks.InvalidConfigurationError(
+                "index_load_workers must be positive"
+            )
+        if self.index_reload_interval < 0:
+            raise checks.InvalidConfigurationError(
+                "index_reload_interval must not be negative"
+            )
         if self.indexes is not None:
             for index in self.indexes:
                 index.validate_yaml()
+        self._validate_reranker()
+
+    def _validate_embeddings_backend(self) -> None:
+        """Validate embeddings backend and its ONNX model file."""
+        valid_embeddings_backends = list(constants.EmbeddingsBackend)
+        if self.embeddings_backend not in valid_embeddings_backends:
+            raise checks.InvalidConfigurationError(
+                f"Invalid embeddings backend: {self.embeddings_backend}\n"
+                f"Available options are {valid_embeddings_backends}"
+            )
+        if self.embeddings_backend != constants.EmbeddingsBackend.ONNX:
+            return
+        if self.embeddings_model_path is None:
+            raise checks.InvalidConfigurationError(
+                "embeddings_model_path is required for ONNX embeddings backend"
+            )
+        checks.file_check(
+            os.path.join(self.embeddings_model_path, self.embeddings_onnx_file),
+            "Embeddings model ONNX file",
+        )
+
+    def _validate_reranker(self) -> None:
+        """Validate reranker model path and its ONNX model file."""
+        if self.reranker is None:
+            return
+        checks.dir_check(self.reranker.model_path, "Reranker model path")
+        if self.reranker.onnx_file is not None:
+            checks.file_check(
+                os.path.join(self.reranker.model_path, self.reranker.onnx_file),
+                "Reranker model ONNX file",
+            )
 
 
 class UserDataCollection(BaseModel):
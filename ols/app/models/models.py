@@ -10,7 +10,12 @@ from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 from pydantic import BaseModel, Field, field_validator, model_validator
 from pydantic.dataclasses import dataclass
 
-from ols.constants import MEDIA_TYPE_JSON, MEDIA_TYPE_TEXT
+from ols.constants import (
+    MEDIA_TYPE_JSON,
+    MEDIA_TYPE_TEXT,
+    MESSAGE_TOKEN_COUNT_KEY,
+    IndexLoadState,
+)
 from ols.customize import prompts
 from ols.utils import suid
 
@@ -498,6 +503,7 @@ class ReadinessResponse(BaseModel):
     Attributes:
         ready: The readiness of the service.
         reason: The reason for the readiness.
+        index_states: Loading states of configured indexes, in their order.
 
     Example:
         ```python
@@ -507,6 +513,7 @@ class ReadinessResponse(BaseModel):
 
     ready: bool
     reason: str
+    index_states: Optional[list[IndexLoadState]] = None
 
     # provides examples for /docs endpoint
     model_config = {
@@ -515,7 +522,12 @@ class ReadinessResponse(BaseModel):
                 {
                     "ready": True,
                     "reason": "service is ready",
-                }
+                },
+                {
+                    "ready": True,
+                    "reason": "service is ready",
+                    "index_states": ["loaded", "loading"],
+                },
             ]
         }
     }
@@ -807,6 +819,8 @@ class CacheEntry(BaseModel):
         attachments: List of attachments included in the query.
         tool_calls: List of tool calls made during the response generation.
         tool_results: List of tool results from the tool calls.
+        query_token_count: Number of tokens of the query in conversation history.
+        response_token_count: Number of tokens of the response in conversation history.
     """
 
     query: HumanMessage
@@ -814,6 +828,8 @@ class CacheEntry(BaseModel):
     attachments: list[Attachment] = []
     tool_calls: list[dict] = []
     tool_results: list[dict] = []
+    query_token_count: Optional[int] = None
+    response_token_count: Optional[int] = None
 
     @field_validator("response")
     @classmethod
@@ -823,6 +839,14 @@ class CacheEntry(BaseModel):
             return AIMessage("")
         return v
 
+    def token_counts(self) -> dict[str, int]:
+        """Return token counts that are known, keyed by their attribute names."""
+        counts = {
+            "query_token_count": self.query_token_count,
+            "response_token_count": self.response_token_count,
+        }
+        return {key: count for key, count in counts.items() if count is not None}
+
     def to_dict(self) -> dict:
         """Convert the cache entry to a dictionary."""
         return {
@@ -831,6 +855,7 @@ class CacheEntry(BaseModel):
             "attachments": [attachment.model_dump() for attachment in self.attachments],
             "tool_calls": self.tool_calls,
             "tool_results": self.tool_results,
+            **self.token_counts(),
         }
 
     @classmethod
@@ -844,6 +869,8 @@ class CacheEntry(BaseModel):
             ],
             tool_calls=data.get("tool_calls", []),
             tool_results=data.get("tool_results", []),
+            query_token_count=data.get("query_token_count"),
+            response_token_count=data.get("response_token_count"),
         )
 
     @staticmethod
@@ -855,6 +882,15 @@ class CacheEntry(BaseModel):
         for entry in cache_entries:
             entry.query.content = entry.query.content.strip()
             entry.response.content = entry.response.content.strip()
+            # token counts stored with the entry are used for history truncation
+            if entry.query_token_count is not None:
+                entry.query.response_metadata[MESSAGE_TOKEN_COUNT_KEY] = (
+                    entry.query_token_count
+                )
+            if entry.response_token_count is not None:
+                entry.response.response_metadata[MESSAGE_TOKEN_COUNT_KEY] = (
+                    entry.response_token_count
+                )
             history.append(entry.query)
             # the real response or empty string when response is not recorded
             history.append(entry.response)
@@ -899,6 +935,7 @@ class MessageEncoder(json.JSONEncoder):
                 "attachments": o.attachments,
                 "tool_calls": o.tool_calls,
                 "tool_results": o.tool_results,
+                **o.token_counts(),
             }
         return super().default(o)
 
@@ -943,6 +980,8 @@ class MessageDecoder(json.JSONDecoder):
                 attachments=dct["attachments"],
                 tool_calls=dct.get("tool_calls", []),
                 tool_results=dct.get("tool_results", []),
+                query_token_count=dct.get("query_token_count"),
+                response_token_count=dct.get("response_token_count"),
             )
         if "type" in dct:
             message: Union[HumanMessage, AIMessage]
@@ -40,6 +40,11 @@ SUPPORTED_PROVIDER_TYPES = frozenset(
 )
 DEFAULT_AZURE_API_VERSION = "2024-02-15-preview"
 
+# size of HTTP connection pool used to communicate with LLM provider
+# (the same values as HTTPX defaults)
+DEFAULT_LLM_MAX_CONNECTIONS = 100
+DEFAULT_LLM_MAX_KEEPALIVE_CONNECTIONS = 20
+
 
 # models
 class ModelFamily(StrEnum):
@@ -85,6 +90,25 @@ DEFAULT_TOKENIZER_MODEL = "cl100k_base"
 # Example: 1.05 means we increase by 5%.
 TOKEN_BUFFER_WEIGHT = 1.1
 
+# Token counts of recently counted texts are remembered (keyed by hash of
+# the text), so the same prompt parts are not tokenized again and again
+TOKEN_COUNT_CACHE_MAX_ENTRIES = 10000
+
+# Key of message response metadata that holds the number of tokens of the
+# message as it is used in conversation history; the value is computed when
+# the message is stored into conversation cache
+MESSAGE_TOKEN_COUNT_KEY = "ols_token_count"  # noqa: S105
+
+# Metadata key of RAG chunk that holds the number of tokens (counted by the
+# default tokenizer model) of the chunk formatted for the prompt; the value is
+# computed when the index is loaded, unless the index already contains it
+RAG_CHUNK_TOKEN_COUNT_KEY = "ols_token_count"  # noqa: S105
+
+# Metadata key of RAG chunk that holds SimHash signature of its text, used to
+# detect near-duplicate chunks (e.g. the same paragraph in docs of more product
+# versions); the value is computed when the index is loaded
+RAG_CHUNK_SIMHASH_KEY = "ols_simhash"
+
 # Tool output token limits
 # Maximum tokens for a single tool output before truncation
 DEFAULT_MAX_TOKENS_PER_TOOL_OUTPUT = 8000
@@ -116,6 +140,92 @@ RAG_CONTENT_LIMIT = 5
 # Range: 0 to 1
 RAG_SIMILARITY_CUTOFF = 0.3
 
+# Name of the file (within the index directory) with the FAISS index, as it is
+# written by llama_index FAISS vector store
+RAG_INDEX_VECTOR_STORE_FILE = "default__vector_store.json"
+
+# Whether FAISS indexes are memory mapped instead of being read into memory.
+# Memory mapped index is shared by all processes (uvicorn workers) through the
+# OS page cache and pages are loaded only when they are searched.
+RAG_INDEX_MEMORY_MAP = False
+
+
+# Backends running the embedding model
+class EmbeddingsBackend(StrEnum):
+    """Possible options for embedding model backend."""
+
+    TORCH = "torch"
+    ONNX = "onnx"
+
+
+# ONNX export of the embedding model (relative to the model directory) used
+# by ONNX backend; int8 quantized export for CPUs with AVX2 instructions, as
+# written by sentence-transformers export_dynamic_quantized_onnx_model
+DEFAULT_EMBEDDINGS_ONNX_FILE = "onnx/model_qint8_avx2.onnx"
+
+# Number of threads used by ONNX Runtime to embed a query
+DEFAULT_EMBEDDINGS_ONNX_THREADS = 2
+
+# Reranking of retrieved chunks by cross-encoder model: number of retrieved
+# candidates that are scored, time budget for scoring them (in seconds) and
+# number of threads used by ONNX Runtime
+DEFAULT_RERANKER_TOP_N = 20
+DEFAULT_RERANKER_TIMEOUT = 0.5
+DEFAULT_RERANKER_ONNX_THREADS = 2
+# Maximum number of queries reranked at the same time; the other queries
+# keep the original order of retrieved chunks
+RERANKER_MAX_WORKERS = 2
+
+# Maximum number of RAG indexes that are loaded concurrently
+RAG_INDEX_LOAD_MAX_WORKERS = 4
+
+# Interval in seconds of checking RAG index directories for changes; changed
+# indexes are loaded again without restarting the service (0 disables it)
+RAG_INDEX_RELOAD_INTERVAL = 0
+
+# Maximum number of threads searching RAG indexes concurrently (shared by all
+# requests)
+RAG_RETRIEVAL_MAX_WORKERS = 8
+
+# Maximum number of query embeddings kept in cache (one embedding takes
+# a few KiB)
+RAG_QUERY_EMBEDDING_CACHE_MAX_ENTRIES = 1000
+
+# Retrieval results (IDs and scores of retrieved chunks) are cached for the
+# given time in seconds (0 disables the cache)
+RAG_RETRIEVAL_CACHE_TTL = 300
+RAG_RETRIEVAL_CACHE_MAX_ENTRIES = 1000
+
+# Name of the file (within the index directory) with the BM25 (sparse) index
+# of chunks used by hybrid retrieval
+RAG_INDEX_BM25_FILE = "bm25_index.npz"
+
+# BM25 parameters used by hybrid retrieval
+RAG_BM25_K1 = 1.2
+RAG_BM25_B = 0.75
+
+# Hybrid retrieval fuses dense and sparse results by reciprocal rank fusion,
+# chunk at rank r (starting from 1) gets score `weight / (k + r)`
+DEFAULT_HYBRID_RETRIEVAL_RRF_K = 60
+DEFAULT_HYBRID_RETRIEVAL_DENSE_WEIGHT = 1.0
+DEFAULT_HYBRID_RETRIEVAL_SPARSE_WEIGHT = 1.0
+
+# Whether near-duplicate chunks are left out of the RAG context; retrieved
+# chunks whose SimHash signatures differ in at most the given number of bits
+# (of 64) are near-duplicates
+RAG_DEDUPLICATE_CHUNKS = True
+RAG_NEAR_DUPLICATE_MAX_DISTANCE = 12
+
+
+# States of RAG index loading
+class IndexLoadState(StrEnum):
+    """Possible states of RAG index loading."""
+
+    LOADING = "loading"
+    LOADED = "loaded"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
 
 # cache constants
 CACHE_TYPE_MEMORY = "memory"
@@ -127,6 +237,29 @@ POSTGRES_CACHE_DBNAME = "cache"
 POSTGRES_CACHE_USER = "postgres"
 POSTGRES_CACHE_MAX_ENTRIES = 1000
 
+# maximum number of entries of conversation history loaded from the cache for
+# a query; the history is further truncated to fit into the prompt
+CONVERSATION_HISTORY_MAX_ENTRIES = 1000
+
+# storage schema used by Postgres cache:
+# - "blob": whole conversation history is stored as one JSON value
+# - "messages": every message is stored as a separate row (append only)
+POSTGRES_CACHE_SCHEMA_BLOB = "blob"
+POSTGRES_CACHE_SCHEMA_MESSAGES = "messages"
+POSTGRES_CACHE_SCHEMA = POSTGRES_CACHE_SCHEMA_BLOB
+
+# number of conversations moved from "cache" table into "cache_messages" table
+# in one migration step
+POSTGRES_CACHE_MIGRATION_BATCH_SIZE = 100
+
+# when Postgres cache capacity is exceeded, this fraction of capacity is
+# evicted in one batch on top of the entries over capacity
+POSTGRES_CACHE_EVICTION_BATCH_RATIO = 0.1
+
+# number of rows of Postgres cache statistics table; every connection updates
+# its own row, so concurrent writers don't wait for each other
+POSTGRES_CACHE_STATS_SHARDS = 16
+
 # look at https://www.postgresql.org/docs/current/libpq-connect.html#LIBPQ-CONNECT-SSLMODE
 # for all possible options
 POSTGRES_CACHE_SSL_MODE = "prefer"
@@ -135,6 +268,15 @@ POSTGRES_CACHE_SSL_MODE = "prefer"
 # for all possible options
 POSTGRES_CACHE_GSSENCMODE = "prefer"
 
+# connection pool shared by all objects connected to the same Postgres database
+POSTGRES_POOL_MIN_SIZE = 1
+POSTGRES_POOL_MAX_SIZE = 10
+# how long to wait for a free connection when all connections are in use (seconds)
+POSTGRES_POOL_TIMEOUT = 30.0
+# connections idle for longer than this (seconds) are checked before they are
+# borrowed again; connections used more recently are borrowed right away
+POSTGRES_POOL_IDLE_CHECK_INTERVAL = 30.0
+
 
 # default indentity for local testing and deployment
 # "nil" UUID is used on purpose, because it will be easier to
@@ -212,6 +354,12 @@ NOOP_WITH_TOKEN_AUTHENTICATION_MODULE = "noop-with-token"  # noqa: S105
 # All supported authentication modules
 SUPPORTED_AUTHENTICATION_MODULES = {"k8s", "noop", "noop-with-token"}
 
+# Cache of K8S TokenReview and SubjectAccessReview outcomes: successful
+# reviews are kept for TTL, rejected tokens and users for negative TTL
+K8S_AUTH_CACHE_TTL = 60  # in seconds
+K8S_AUTH_CACHE_NEGATIVE_TTL = 10  # in seconds
+K8S_AUTH_CACHE_MAX_ENTRIES = 10000
+
 # Default configuration file name
 DEFAULT_CONFIGURATION_FILE = "olsconfig.yaml"
 
@@ -240,6 +388,20 @@ MCP_HTTP_TRANSPORT_DEFAULT_TIMEOUT = 5  # in seconds
 MCP_KUBERNETES_PLACEHOLDER = "kubernetes"
 MCP_CLIENT_PLACEHOLDER = "client"
 
+# MCP tools catalog cache: catalogs older than TTL are still used, but they
+# are refreshed in background; catalogs older than max. age are listed again
+# before they are used
+MCP_TOOLS_CACHE_TTL = 300  # in seconds
+MCP_TOOLS_CACHE_MAX_AGE = 3600  # in seconds
+MCP_TOOLS_CACHE_MAX_ENTRIES = 1000
+
 # timeout value for a single llm with tools round
 # Keeping it really high at this moment (until this is configurable)
 TOOL_CALL_ROUND_TIMEOUT = 300
+
+# BM25 parameters used by tool filtering
+TOOL_FILTERING_BM25_K1 = 1.5
+TOOL_FILTERING_BM25_B = 0.75
+
+# how many tool retrievers (one per distinct tools catalog) are kept
+TOOL_FILTERING_MAX_RETRIEVERS = 100
@@ -1,14 +1,38 @@
 """Reranker for post-processing the Vector DB search results."""
 
 import logging
+from typing import Optional
 
 from llama_index.core.schema import NodeWithScore
 
 logger = logging.getLogger(__name__)
 
 
-def rerank(retrieved_nodes: list[NodeWithScore]) -> list[NodeWithScore]:
-    """Rerank Vector DB search results."""
+def rerank(
+    retrieved_nodes: list[NodeWithScore], query: Optional[str] = None
+) -> tuple[list[NodeWithScore], bool]:
+    """Rerank Vector DB search results.
+
+    Results are reranked by cross-encoder model when reranker is configured
+    in reference content, otherwise they are returned as they are.
+
+    Returns:
+        Results, and False when reranking is configured but the results keep
+        the original order because they could not be reranked.
+    """
     message = f"reranker.rerank() is called with {len(retrieved_nodes)} result(s)."
     logger.debug(message)
-    return retrieved_nodes
+
+    # pylint: disable=C0415
+    # config can't be imported when this module is loaded, as it is loaded
+    # during config initialization
+    from ols import config
+    from ols.src.rag_index.reranker import get_reranker
+
+    reference_content = config.ols_config.reference_content
+    reranker = get_reranker(
+        reference_content.reranker if reference_content is not None else None
+    )
+    if reranker is None or query is None:
+        return retrieved_nodes, True
+    return reranker.rerank(query, retrieved_nodes)
@@ -1,6 +1,11 @@
 """Manage authentication flow for FastAPI endpoints with K8S/OCP."""
 
+import hashlib
 import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional, Self
 
@@ -8,6 +13,7 @@ import kubernetes.client
 from fastapi import HTTPException, Request
 from kubernetes.client.rest import ApiException
 from kubernetes.config import ConfigException
+from prometheus_client import Counter
 
 from ols import config
 from ols.constants import (
@@ -24,6 +30,17 @@ logger = logging.getLogger(__name__)
 
 CLUSTER_ID_LOCAL = "local"
 
+# Metrics are defined here and not in ols.app.metrics, because the metrics
+# module itself depends on this module for its authentication dependency.
+k8s_auth_cache_hits_total = Counter(
+    "ols_k8s_auth_cache_hits_total",
+    "Requests authorized by cached TokenReview and SubjectAccessReview outcome",
+)
+k8s_auth_cache_misses_total = Counter(
+    "ols_k8s_auth_cache_misses_total",
+    "Requests that needed TokenReview and SubjectAccessReview calls",
+)
+
 
 class ClusterIDUnavailableError(Exception):
     """Cluster ID is not available."""
@@ -225,6 +242,88 @@ def _extract_bearer_token(header: str) -> str:
         return ""
 
 
+@dataclass(frozen=True)
+class ReviewOutcome:
+    """Outcome of TokenReview and SubjectAccessReview for one token and path.
+
+    Successful outcome holds user ID and user name, rejected one holds the
+    HTTP status code and detail to respond with.
+    """
+
+    user_id: Optional[str] = None
+    username: Optional[str] = None
+    status_code: Optional[int] = None
+    detail: Optional[str] = None
+
+    @property
+    def allowed(self) -> bool:
+        """Check if the user was authenticated and authorized."""
+        return self.status_code is None
+
+    def raise_for_status(self) -> None:
+        """Raise HTTP exception when the user was rejected."""
+        if not self.allowed:
+            raise HTTPException(status_code=self.status_code, detail=self.detail)
+
+
+class ReviewCache:
+    """Thread-safe LRU cache of review outcomes with expiration.
+
+    Entries are keyed by SHA-256 digest of the bearer token and by the
+    virtual path, so raw tokens are never stored in the cache.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty cache."""
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str], tuple[float, ReviewOutcome]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        """Return the number of cached outcomes."""
+        return len(self._entries)
+
+    @staticmethod
+    def key(token: str, virtual_path: str) -> tuple[str, str]:
+        """Construct cache key for given token and virtual path."""
+        return hashlib.sha256(token.encode("utf-8")).hexdigest(), virtual_path
+
+    def get(self, key: tuple[str, str]) -> Optional[ReviewOutcome]:
+        """Return cached outcome, or None when it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, outcome = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    k8s_auth_cache_hits_total.inc()
+                    return outcome
+                del self._entries[key]
+        k8s_auth_cache_misses_total.inc()
+        return None
+
+    def put(
+        self, key: tuple[str, str], outcome: ReviewOutcome, ttl: int, max_entries: int
+    ) -> None:
+        """Store outcome for `ttl` seconds, evicting least recently used ones."""
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, outcome)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached outcomes."""
+        with self._lock:
+            self._entries.clear()
+
+
+review_cache = ReviewCache()
+
+
 class AuthDependency(AuthDependencyInterface):
     """Create an AuthDependency Class that allows customizing the acces Scope path to check."""
 
@@ -239,6 +338,8 @@ class AuthDependency(AuthDependencyInterface):
 
         Validates the bearer token from the request,
         performs access control checks using Kubernetes TokenReview and SubjectAccessReview.
+        Outcomes of the checks are cached for the configured time, so the API
+        server is not asked again for every request with the same token.
 
         Args:
             request: The FastAPI request object.
@@ -274,9 +375,36 @@ class AuthDependency(AuthDependencyInterface):
                 status_code=401,
                 detail="Unauthorized: Bearer token not found or invalid",
             )
+        auth_config = config.ols_config.authentication_config
+        key = ReviewCache.key(token, self.virtual_path)
+        outcome = review_cache.get(key)
+        if outcome is None:
+            outcome = self._review(token)
+            review_cache.put(
+                key,
+                outcome,
+                (
+                    auth_config.review_cache_ttl
+                    if outcome.allowed
+                    else auth_config.review_cache_negative_ttl
+                ),
+                auth_config.review_cache_max_entries,
+            )
+        outcome.raise_for_status()
+        return outcome.user_id, outcome.username, False, token
+
+    def _review(self, token: str) -> ReviewOutcome:
+        """Authenticate and authorize token by TokenReview and SubjectAccessReview.
+
+        Returns:
+            Outcome of both reviews that can be cached.
+
+        Raises:
+            HTTPException: If the reviews could not be performed.
+        """
         user_info = get_user_info(token)
         if user_info is None:
-            raise HTTPException(
+            return ReviewOutcome(
                 status_code=403, detail="Forbidden: Invalid or expired token"
             )
         if user_info.user.username == "kube:admin":
@@ -294,12 +422,14 @@ class AuthDependency(AuthDependencyInterface):
         )
         try:
             response = authorization_api.create_subject_access_review(sar)
-            if not response.status.allowed:
-                raise HTTPException(
-                    status_code=403, detail="Forbidden: User does not have access"
-                )
         except ApiException as e:
             logger.error("API exception during SubjectAccessReview: %s", e)
             raise HTTPException(status_code=403, detail="Internal server error") from e
+        if not response.status.allowed:
+            return ReviewOutcome(
+                status_code=403, detail="Forbidden: User does not have access"
+            )
 
-        return user_info.user.uid, user_info.user.username, False, token
+        return ReviewOutcome(
+            user_id=user_info.user.uid, username=user_info.user.username
+        )
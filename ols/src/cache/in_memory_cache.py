@@ -4,8 +4,8 @@ from __future__ import annotations
 
 import threading
 import time
-from collections import deque
-from typing import TYPE_CHECKING, Any
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, Any, Optional
 
 from ols.app.models.models import CacheEntry, ConversationData
 
@@ -16,7 +16,13 @@ from ols.src.cache.cache import Cache
 
 
 class InMemoryCache(Cache):
-    """An in-memory LRU cache implementation in O(1) time."""
+    """An in-memory LRU cache implementation in O(1) time.
+
+    Conversations are kept in an ordered dictionary where the least recently
+    used conversation is at the beginning and the most recently used one is
+    at the end. Touching, appending, evicting and deleting a conversation
+    therefore never needs to scan other conversations.
+    """
 
     _instance = None
     _lock = threading.Lock()
@@ -34,13 +40,20 @@ class InMemoryCache(Cache):
         # pylint: disable=W0201
         self.capacity: int = int(config.max_entries)
         self.total_entries: int = 0
-        self.deque: deque[str] = deque()
-        self.cache: dict[str, list[dict[str, Any]]] = {}
+        # conversations ordered from least recently used to most recently used
+        self.cache: OrderedDict[str, deque[dict[str, Any]]] = OrderedDict()
         # Conversations metadata storage
         self._conversations: dict[str, ConversationData] = {}
+        # Per-user index of conversation keys ordered by last message timestamp
+        # (oldest first), maintained together with conversations metadata
+        self._user_conversations: dict[str, OrderedDict[str, None]] = {}
 
     def get(
-        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+        self,
+        user_id: str,
+        conversation_id: str,
+        skip_user_id_check: bool = False,
+        limit: Optional[int] = None,
     ) -> list[CacheEntry]:
         """Get the value associated with the given key.
 
@@ -48,18 +61,21 @@ class InMemoryCache(Cache):
           user_id: User identification.
           conversation_id: Conversation ID unique for given user.
           skip_user_id_check: Skip user_id suid check.
+          limit: Return only the last `limit` entries when specified.
 
         Returns:
           The value associated with the key, or `None` if the key is not present.
         """
         key = super().construct_key(user_id, conversation_id, skip_user_id_check)
 
-        if key not in self.cache:
-            return None
+        with self._lock:
+            if key not in self.cache:
+                return None
 
-        self.deque.remove(key)
-        self.deque.appendleft(key)
-        value = self.cache[key].copy()
+            self.cache.move_to_end(key)
+            value = list(self.cache[key])
+        if limit is not None:
+            value = value[-limit:] if limit > 0 else []
         return [CacheEntry.from_dict(cache_entry) for cache_entry in value]
 
     def insert_or_append(
@@ -74,8 +90,8 @@ class InMemoryCache(Cache):
         Eviction policy:
           - Capacity is treated as number of message entries across all conversations.
           - When inserting causes total entries to exceed capacity, evict the oldest
-            message(s) from the least-recently-used conversation(s) (tail of deque)
-            until total_entries <= capacity.
+            message(s) from the least-recently-used conversation(s) (head of the
+            ordered dictionary) until total_entries <= capacity.
 
         Args:
             user_id: User identification.
@@ -87,47 +103,86 @@ class InMemoryCache(Cache):
         value = cache_entry.to_dict()
 
         with self._lock:
-            if key not in self.cache:
-                self.cache[key] = [value]
+            entries = self.cache.get(key)
+            if entries is None:
+                self.cache[key] = deque([value])
             else:
-                self.deque.remove(key)
-                self.cache[key].append(value)
-            self.deque.appendleft(key)
+                entries.append(value)
+                self.cache.move_to_end(key)
             self.total_entries += 1
 
             # Update conversations metadata
             current_time = time.time()
             if key in self._conversations:
                 conv_data = self._conversations[key]
-                self._conversations[key] = ConversationData(
-                    conversation_id=conversation_id,
-                    topic_summary=conv_data.topic_summary,
-                    last_message_timestamp=current_time,
-                    message_count=conv_data.message_count + 1,
+                self._store_conversation_data(
+                    user_id,
+                    key,
+                    ConversationData(
+                        conversation_id=conversation_id,
+                        topic_summary=conv_data.topic_summary,
+                        last_message_timestamp=current_time,
+                        message_count=conv_data.message_count + 1,
+                    ),
                 )
             else:
-                self._conversations[key] = ConversationData(
-                    conversation_id=conversation_id,
-                    topic_summary="",
-                    last_message_timestamp=current_time,
-                    message_count=1,
+                self._store_conversation_data(
+                    user_id,
+                    key,
+                    ConversationData(
+                        conversation_id=conversation_id,
+                        topic_summary="",
+                        last_message_timestamp=current_time,
+                        message_count=1,
+                    ),
                 )
 
             # Evict oldest messages until we're within capacity
-            if self.total_entries > self.capacity and self.deque:
-                oldest_key = self.deque[-1]
-                oldest_list = self.cache.get(oldest_key, [])
-                del oldest_list[0]
-                self.total_entries -= 1
-
-                if len(oldest_list) == 0:
-                    del self.cache[oldest_key]
-                    self.deque.pop()
-                    # Also remove from conversations metadata
-                    if oldest_key in self._conversations:
-                        del self._conversations[oldest_key]
-                else:
-                    self.cache[oldest_key] = oldest_list
+            while self.total_entries > self.capacity and self.cache:
+                self._evict_oldest_entry()
+
+    def _evict_oldest_entry(self) -> None:
+        """Evict the oldest message from the least recently used conversation.
+
+        Must be called with the lock held.
+        """
+        oldest_key = next(iter(self.cache))
+        oldest_entries = self.cache[oldest_key]
+        oldest_entries.popleft()
+        self.total_entries -= 1
+
+        if not oldest_entries:
+            del self.cache[oldest_key]
+            # Also remove from conversations metadata
+            self._remove_conversation_data(oldest_key)
+
+    def _store_conversation_data(
+        self, user_id: str, key: str, conv_data: ConversationData
+    ) -> None:
+        """Store conversation metadata and mark it as the user's latest conversation.
+
+        Must be called with the lock held.
+        """
+        self._conversations[key] = conv_data
+        user_conversations = self._user_conversations.setdefault(user_id, OrderedDict())
+        user_conversations[key] = None
+        user_conversations.move_to_end(key)
+
+    def _remove_conversation_data(self, key: str) -> None:
+        """Remove conversation metadata and its entry in per-user index.
+
+        Must be called with the lock held.
+        """
+        if self._conversations.pop(key, None) is None:
+            return
+        # conversation ID never contains the separator, user ID might
+        user_id = key.rpartition(Cache.COMPOUND_KEY_SEPARATOR)[0]
+        user_conversations = self._user_conversations.get(user_id)
+        if user_conversations is None:
+            return
+        user_conversations.pop(key, None)
+        if not user_conversations:
+            del self._user_conversations[user_id]
 
     def delete(
         self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
@@ -148,13 +203,9 @@ class InMemoryCache(Cache):
             if key not in self.cache:
                 return False
 
-            # Remove from both cache and deque
-            self.total_entries -= len(self.cache[key])
-            del self.cache[key]
-            self.deque.remove(key)
+            self.total_entries -= len(self.cache.pop(key))
             # Also remove from conversations metadata
-            if key in self._conversations:
-                del self._conversations[key]
+            self._remove_conversation_data(key)
             return True
 
     def list(
@@ -170,20 +221,15 @@ class InMemoryCache(Cache):
             A list of ConversationData objects containing conversation_id,
             topic_summary, last_message_timestamp, and message_count.
         """
-        conversations: list[ConversationData] = []
         super()._check_user_id(user_id, skip_user_id_check)
-        prefix = f"{user_id}{Cache.COMPOUND_KEY_SEPARATOR}"
 
         with self._lock:
-            conversations.extend(
-                conv
-                for key, conv in self._conversations.items()
-                if key.startswith(prefix)
-            )
-
-        # Sort by last_message_timestamp descending
-        conversations.sort(key=lambda x: x.last_message_timestamp, reverse=True)
-        return conversations
+            user_conversations = self._user_conversations.get(user_id)
+            if user_conversations is None:
+                return []
+            # per-user index is already ordered by last_message_timestamp
+            # (oldest first), so newest conversations go first without sorting
+            return [self._conversations[key] for key in reversed(user_conversations)]
 
     def set_topic_summary(
         self,
@@ -206,18 +252,26 @@ class InMemoryCache(Cache):
             current_time = time.time()
             if key in self._conversations:
                 conv_data = self._conversations[key]
-                self._conversations[key] = ConversationData(
-                    conversation_id=conversation_id,
-                    topic_summary=topic_summary,
-                    last_message_timestamp=current_time,
-                    message_count=conv_data.message_count,
+                self._store_conversation_data(
+                    user_id,
+                    key,
+                    ConversationData(
+                        conversation_id=conversation_id,
+                        topic_summary=topic_summary,
+                        last_message_timestamp=current_time,
+                        message_count=conv_data.message_count,
+                    ),
                 )
             else:
-                self._conversations[key] = ConversationData(
-                    conversation_id=conversation_id,
-                    topic_summary=topic_summary,
-                    last_message_timestamp=current_time,
-                    message_count=0,
+                self._store_conversation_data(
+                    user_id,
+                    key,
+                    ConversationData(
+                        conversation_id=conversation_id,
+                        topic_summary=topic_summary,
+                        last_message_timestamp=current_time,
+                        message_count=0,
+                    ),
                 )
 
     def ready(self) -> bool:
@@ -2,10 +2,11 @@
 
 import json
 import logging
-from typing import Any
+from typing import Any, List, Optional
 
 import psycopg2
 
+from ols import constants
 from ols.app.models.config import PostgresConfig
 from ols.app.models.models import (
     CacheEntry,
@@ -16,11 +17,12 @@ from ols.app.models.models import (
 from ols.src.cache.cache import Cache
 from ols.src.cache.cache_error import CacheError
 from ols.utils.connection_decorator import connection
+from ols.utils.connection_pool import PooledConnectable
 
 logger = logging.getLogger(__name__)
 
 
-class PostgresCache(Cache):
+class PostgresCache(Cache, PooledConnectable):
     """Cache that uses Postgres to store cached values.
 
     The cache itself is stored in following tables:
@@ -38,6 +40,50 @@ class PostgresCache(Cache):
         "timestamps" btree (updated_at)
     ```
 
+    Cache messages table (used when schema mode is set to "messages"):
+    ```
+         Column      |            Type             | Nullable | Default | Storage  |
+    -----------------+-----------------------------+----------+---------+----------+
+     user_id         | text                        | not null |         | extended |
+     conversation_id | text                        | not null |         | extended |
+     seq             | bigint                      | not null |         | plain    |
+     value           | bytea                       |          |         | extended |
+     created_at      | timestamp without time zone |          |         | plain    |
+    Indexes:
+        "cache_messages_pkey" PRIMARY KEY, btree (user_id, conversation_id, seq)
+        "cache_messages_timestamps" btree (created_at)
+    ```
+
+    Cache statistics table:
+    ```
+         Column      |  Type   | Nullable | Default |
+    -----------------+---------+----------+---------+
+     id              | integer | not null |         |
+     total_entries   | bigint  | not null | 0       |
+    Indexes:
+        "cache_stats_pkey" PRIMARY KEY, btree (id)
+    ```
+
+    Rows of cache statistics table sum up to the total number of entries
+    stored in "cache" and "cache_messages" tables. They are maintained by
+    triggers in the same transaction that modifies these tables, so
+    capacity checks do not need to scan the whole cache. Every connection
+    updates the row selected by its backend process ID, so concurrent
+    writers do not wait for the same row lock. When capacity is exceeded,
+    the oldest entries are evicted in one batch that makes room for more
+    new entries: in "cache" table, oldest messages are trimmed from the
+    least recently updated conversations, and conversations without
+    messages left are deleted.
+
+    In "messages" schema mode every cache entry is stored in its own row, so
+    appending to conversation is a single INSERT and it is possible to read
+    just the last N messages. Messages are ordered by sequence numbers taken
+    from "cache_messages_seq" sequence. When messages are evicted, message
+    counts of their conversations are lowered, and metadata of conversations
+    without any message left are deleted. Conversations stored in the "cache" table
+    are moved into "cache_messages" table in batches when the cache is
+    initialized, and on demand when the conversation is read.
+
     Conversations metadata table:
     ```
          Column                 |            Type             | Nullable | Default |
@@ -78,6 +124,26 @@ class PostgresCache(Cache):
             ON cache (updated_at)
         """
 
+    CREATE_CACHE_MESSAGES_TABLE = """
+        CREATE TABLE IF NOT EXISTS cache_messages (
+            user_id         text NOT NULL,
+            conversation_id text NOT NULL,
+            seq             bigint NOT NULL,
+            value           bytea,
+            created_at      timestamp,
+            PRIMARY KEY(user_id, conversation_id, seq)
+        );
+        """
+
+    CREATE_CACHE_MESSAGES_SEQUENCE = """
+        CREATE SEQUENCE IF NOT EXISTS cache_messages_seq
+        """
+
+    CREATE_CACHE_MESSAGES_INDEX = """
+        CREATE INDEX IF NOT EXISTS cache_messages_timestamps
+            ON cache_messages (created_at)
+        """
+
     SELECT_CONVERSATION_HISTORY_STATEMENT = """
         SELECT value
           FROM cache
@@ -101,12 +167,152 @@ class PostgresCache(Cache):
                (SELECT user_id, conversation_id FROM cache ORDER BY updated_at LIMIT
         """
 
+    CREATE_CACHE_STATS_TABLE = """
+        CREATE TABLE IF NOT EXISTS cache_stats (
+            id            integer PRIMARY KEY,
+            total_entries bigint NOT NULL DEFAULT 0
+        );
+        """
+
+    # the function is used by statement level triggers, so the statistics
+    # row is updated just once even when many rows are inserted or deleted
+    _CACHE_STATS_FUNCTION_TEMPLATE = """
+        CREATE OR REPLACE FUNCTION update_cache_stats() RETURNS trigger AS $$
+        DECLARE
+            delta bigint := 0;
+        BEGIN
+            IF TG_TABLE_NAME = 'cache_messages' THEN
+                IF TG_OP = 'INSERT' THEN
+                    SELECT COUNT(*) INTO delta FROM new_rows;
+                ELSE
+                    SELECT -COUNT(*) INTO delta FROM old_rows;
+                END IF;
+            ELSE
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    delta := delta + (
+                        SELECT COALESCE(SUM(json_array_length(
+                                   convert_from(value, 'utf-8')::json)), 0)
+                          FROM new_rows);
+                END IF;
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    delta := delta - (
+                        SELECT COALESCE(SUM(json_array_length(
+                                   convert_from(value, 'utf-8')::json)), 0)
+                          FROM old_rows);
+                END IF;
+            END IF;
+            IF delta <> 0 THEN
+                INSERT INTO cache_stats AS stats(id, total_entries)
+                VALUES (pg_backend_pid() % {shards}, delta)
+                ON CONFLICT (id)
+                DO UPDATE SET total_entries = stats.total_entries + EXCLUDED.total_entries;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+
+    CREATE_CACHE_STATS_FUNCTION = _CACHE_STATS_FUNCTION_TEMPLATE.format(
+        shards=constants.POSTGRES_CACHE_STATS_SHARDS
+    )
+
+    CREATE_CACHE_STATS_TRIGGERS = """
+        DO $$
+        DECLARE
+            trigger_definition text[];
+        BEGIN
+            FOREACH trigger_definition SLICE 1 IN ARRAY ARRAY[
+                ['cache_stats_insert', 'INSERT', 'cache', 'NEW TABLE AS new_rows'],
+                ['cache_stats_update', 'UPDATE', 'cache',
+                 'OLD TABLE AS old_rows NEW TABLE AS new_rows'],
+                ['cache_stats_delete', 'DELETE', 'cache', 'OLD TABLE AS old_rows'],
+                ['cache_messages_stats_insert', 'INSERT', 'cache_messages',
+                 'NEW TABLE AS new_rows'],
+                ['cache_messages_stats_delete', 'DELETE', 'cache_messages',
+                 'OLD TABLE AS old_rows']
+            ]
+            LOOP
+                IF NOT EXISTS (SELECT 1 FROM pg_trigger
+                                WHERE tgname = trigger_definition[1]) THEN
+                    EXECUTE format(
+                        'CREATE TRIGGER %I AFTER %s ON %I REFERENCING %s '
+                        'FOR EACH STATEMENT EXECUTE FUNCTION update_cache_stats()',
+                        trigger_definition[1], trigger_definition[2],
+                        trigger_definition[3], trigger_definition[4]);
+                END IF;
+            END LOOP;
+        END;
+        $$;
+        """
+
+    # statistics are computed from scratch only when there are no rows yet,
+    # i.e. when the cache is initialized for the first time
+    INITIALIZE_CACHE_STATS_STATEMENT = """
+        INSERT INTO cache_stats(id, total_entries)
+        SELECT 0,
+               (SELECT COALESCE(SUM(json_array_length(convert_from(value, 'utf-8')::json)), 0)
+                  FROM cache)
+               + (SELECT COUNT(*) FROM cache_messages)
+         WHERE NOT EXISTS (SELECT 1 FROM cache_stats)
+        ON CONFLICT (id) DO NOTHING
+        """
+
     QUERY_TOTAL_ENTRIES = """
-        SELECT COALESCE(SUM(json_array_length(convert_from(value, 'utf-8')::json)), 0) FROM cache;
+        SELECT SUM(total_entries) FROM cache_stats;
         """
 
-    SELECT_OLDEST_ROW = """
-        SELECT user_id, conversation_id, value FROM cache ORDER BY updated_at LIMIT 1;
+    # oldest messages are evicted from the least recently updated
+    # conversations until the requested number of entries is evicted;
+    # conversations without messages left are deleted, the others keep
+    # their last update time, and their metadata are updated accordingly
+    TRIM_OLDEST_CONVERSATIONS_STATEMENT = """
+        WITH candidates AS (
+            SELECT user_id, conversation_id, entries,
+                   LEAST(entries, %s - (running_total - entries)) AS evicted
+              FROM (SELECT user_id, conversation_id, entries,
+                           SUM(entries) OVER (ORDER BY updated_at, user_id, conversation_id)
+                               AS running_total
+                      FROM (SELECT user_id, conversation_id, updated_at,
+                                   json_array_length(convert_from(value, 'utf-8')::json)
+                                       AS entries
+                              FROM cache
+                             ORDER BY updated_at
+                             LIMIT %s) AS oldest) AS running
+             WHERE running_total - entries < %s
+        ),
+        deleted AS (
+            DELETE FROM cache
+             USING candidates
+             WHERE cache.user_id = candidates.user_id
+               AND cache.conversation_id = candidates.conversation_id
+               AND candidates.evicted >= candidates.entries
+        ),
+        trimmed AS (
+            UPDATE cache
+               SET value = convert_to(
+                       (SELECT json_agg(message.value ORDER BY message.position)::text
+                          FROM json_array_elements(convert_from(cache.value, 'utf-8')::json)
+                                   WITH ORDINALITY AS message(value, position)
+                         WHERE message.position > candidates.evicted),
+                       'utf-8')
+              FROM candidates
+             WHERE cache.user_id = candidates.user_id
+               AND cache.conversation_id = candidates.conversation_id
+               AND candidates.evicted < candidates.entries
+        ),
+        metadata_deleted AS (
+            DELETE FROM conversations
+             USING candidates
+             WHERE conversations.user_id = candidates.user_id
+               AND conversations.conversation_id = candidates.conversation_id
+               AND candidates.evicted >= candidates.entries
+        )
+        UPDATE conversations
+           SET message_count = GREATEST(conversations.message_count - candidates.evicted, 0)
+          FROM candidates
+         WHERE conversations.user_id = candidates.user_id
+           AND conversations.conversation_id = candidates.conversation_id
+           AND candidates.evicted < candidates.entries
         """
 
     DELETE_SINGLE_CONVERSATION_STATEMENT = """
@@ -150,54 +356,113 @@ class PostgresCache(Cache):
         SELECT pg_advisory_xact_lock(hashtext(%s || %s))
     """
 
+    # message sequence number is taken after the conversation message counter
+    # is incremented, the row lock on conversation metadata serializes
+    # concurrent appends into the same conversation, so their sequence
+    # numbers follow the order of appends
+    APPEND_MESSAGE_STATEMENT = """
+        WITH conversation AS (
+            INSERT INTO conversations
+                (user_id, conversation_id, topic_summary, last_message_timestamp, message_count)
+            VALUES (%s, %s, '', CURRENT_TIMESTAMP, 1)
+            ON CONFLICT (user_id, conversation_id)
+            DO UPDATE SET last_message_timestamp = CURRENT_TIMESTAMP,
+                          message_count = conversations.message_count + 1
+            RETURNING user_id, conversation_id
+        )
+        INSERT INTO cache_messages(user_id, conversation_id, seq, value, created_at)
+        SELECT user_id, conversation_id, nextval('cache_messages_seq'), %s,
+               CURRENT_TIMESTAMP
+          FROM conversation
+        """
+
+    # LIMIT NULL means no limit in Postgres
+    SELECT_LAST_MESSAGES_STATEMENT = """
+        SELECT value
+          FROM (SELECT seq, value
+                  FROM cache_messages
+                 WHERE user_id=%s AND conversation_id=%s
+                 ORDER BY seq DESC
+                 LIMIT %s) AS last_messages
+         ORDER BY seq
+        """
+
+    DELETE_CONVERSATION_MESSAGES_STATEMENT = """
+        DELETE FROM cache_messages
+         WHERE user_id=%s AND conversation_id=%s
+        """
+
+    # conversations metadata are updated in the same statement; all parts of
+    # the statement see the same snapshot, so conversations without messages
+    # left are found by comparing their message counts with evicted messages
+    DELETE_OLDEST_MESSAGES_STATEMENT = """
+        WITH evicted AS (
+            DELETE FROM cache_messages
+             WHERE (user_id, conversation_id, seq) IN
+                   (SELECT user_id, conversation_id, seq
+                      FROM cache_messages
+                     ORDER BY created_at, seq
+                     LIMIT %s)
+            RETURNING user_id, conversation_id
+        ),
+        evicted_counts AS (
+            SELECT user_id, conversation_id, COUNT(*) AS evicted
+              FROM evicted
+             GROUP BY user_id, conversation_id
+        ),
+        updated AS (
+            UPDATE conversations
+               SET message_count = conversations.message_count - evicted_counts.evicted
+              FROM evicted_counts
+             WHERE conversations.user_id = evicted_counts.user_id
+               AND conversations.conversation_id = evicted_counts.conversation_id
+               AND conversations.message_count > evicted_counts.evicted
+        )
+        DELETE FROM conversations
+         USING evicted_counts
+         WHERE conversations.user_id = evicted_counts.user_id
+           AND conversations.conversation_id = evicted_counts.conversation_id
+           AND conversations.message_count <= evicted_counts.evicted
+        """
+
+    # conversations moved from the "cache" table get non-positive sequence
+    # numbers, so they are always ordered before messages appended later
+    _MIGRATE_STATEMENT_TEMPLATE = """
+        WITH moved AS (
+            DELETE FROM cache
+             WHERE {condition}
+            RETURNING user_id, conversation_id, value, updated_at
+        )
+        INSERT INTO cache_messages(user_id, conversation_id, seq, value, created_at)
+        SELECT moved.user_id, moved.conversation_id,
+               message.position - json_array_length(convert_from(moved.value, 'utf-8')::json),
+               convert_to(message.value::text, 'utf-8'),
+               moved.updated_at
+          FROM moved,
+               json_array_elements(convert_from(moved.value, 'utf-8')::json)
+                   WITH ORDINALITY AS message(value, position)
+        ON CONFLICT DO NOTHING
+        """
+
+    MIGRATE_CONVERSATIONS_BATCH_STATEMENT = _MIGRATE_STATEMENT_TEMPLATE.format(
+        condition="""(user_id, conversation_id) IN
+                   (SELECT user_id, conversation_id FROM cache
+                     LIMIT %s FOR UPDATE SKIP LOCKED)"""
+    )
+
+    MIGRATE_CONVERSATION_STATEMENT = _MIGRATE_STATEMENT_TEMPLATE.format(
+        condition="user_id=%s AND conversation_id=%s"
+    )
+
     def __init__(self, config: PostgresConfig) -> None:
         """Create a new instance of Postgres cache."""
         self.postgres_config = config
+        self.schema_mode = config.schema_mode
 
-        # initialize connection to DB
-        self.connect()
+        # attach to connection pool and initialize tables
+        self.connect(config, self.initialize_cache)
         self.capacity = config.max_entries
 
-    # pylint: disable=W0201
-    def connect(self) -> None:
-        """Initialize connection to database."""
-        logger.info("Connecting to storage")
-        # make sure the connection will have known state
-        # even if PG is not alive
-        self.connection = None
-        config = self.postgres_config
-        self.connection = psycopg2.connect(
-            host=config.host,
-            port=config.port,
-            user=config.user,
-            password=config.password,
-            dbname=config.dbname,
-            sslmode=config.ssl_mode,
-            sslrootcert=config.ca_cert_path,
-            gssencmode=config.gss_encmode,
-        )
-        try:
-            self.initialize_cache()
-        except Exception as e:
-            self.connection.close()
-            logger.exception("Error initializing Postgres cache:\n%s", e)
-            raise
-        self.connection.autocommit = True
-
-    def connected(self) -> bool:
-        """Check if connection to cache is alive."""
-        if self.connection is None:
-            logger.warning("Not connected, need to reconnect later")
-            return False
-        try:
-            with self.connection.cursor() as cursor:
-                cursor.execute("SELECT 1")
-            logger.info("Connection to storage is ok")
-            return True
-        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
-            logger.error("Disconnected from storage: %s", e)
-            return False
-
     def initialize_cache(self) -> None:
         """Initialize cache - clean it up etc."""
         # cursor as context manager is not used there on purpose
@@ -214,12 +479,63 @@ class PostgresCache(Cache):
         logger.info("Initializing index for cache")
         cursor.execute(PostgresCache.CREATE_INDEX)
 
+        logger.info("Initializing table for cache messages")
+        cursor.execute(PostgresCache.CREATE_CACHE_MESSAGES_TABLE)
+
+        cursor.execute(PostgresCache.CREATE_CACHE_MESSAGES_SEQUENCE)
+
+        logger.info("Initializing index for cache messages")
+        cursor.execute(PostgresCache.CREATE_CACHE_MESSAGES_INDEX)
+
+        logger.info("Initializing table for cache statistics")
+        cursor.execute(PostgresCache.CREATE_CACHE_STATS_TABLE)
+        cursor.execute(PostgresCache.CREATE_CACHE_STATS_FUNCTION)
+        cursor.execute(PostgresCache.CREATE_CACHE_STATS_TRIGGERS)
+        cursor.execute(PostgresCache.INITIALIZE_CACHE_STATS_STATEMENT)
+
         cursor.close()
         self.connection.commit()
 
+        if self.schema_mode == constants.POSTGRES_CACHE_SCHEMA_MESSAGES:
+            self.migrate_legacy_cache()
+
+    @connection
+    def migrate_legacy_cache(
+        self, batch_size: int = constants.POSTGRES_CACHE_MIGRATION_BATCH_SIZE
+    ) -> int:
+        """Move conversations from "cache" table into "cache_messages" table.
+
+        Conversations are moved in batches, each batch in its own transaction,
+        so the migration can run while other service instances use the cache.
+
+        Args:
+            batch_size: Number of conversations moved in one transaction.
+
+        Returns:
+            Number of migrated messages.
+        """
+        migrated = 0
+        with self.connection.cursor() as cursor:
+            while True:
+                cursor.execute(
+                    PostgresCache.MIGRATE_CONVERSATIONS_BATCH_STATEMENT, (batch_size,)
+                )
+                moved = cursor.rowcount
+                self.connection.commit()
+                if moved <= 0:
+                    break
+                migrated += moved
+        if migrated:
+            logger.info("Migrated %d messages into cache messages table", migrated)
+        return migrated
+
     @connection
     def get(
-        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+        self,
+        user_id: str,
+        conversation_id: str,
+        skip_user_id_check: bool = False,
+        limit: Optional[int] = None,
     ) -> list[CacheEntry]:
         """Get the value associated with the given key.
 
@@ -227,6 +543,7 @@ class PostgresCache(Cache):
             user_id: User identification.
             conversation_id: Conversation ID unique for given user.
             skip_user_id_check: Skip user_id suid check.
+            limit: Return only the last `limit` entries when specified.
 
         Returns:
             The value associated with the key, or None if not found.
@@ -236,7 +553,14 @@ class PostgresCache(Cache):
 
         with self.connection.cursor() as cursor:
             try:
-                value = PostgresCache._select(cursor, user_id, conversation_id)
+                if self.schema_mode == constants.POSTGRES_CACHE_SCHEMA_MESSAGES:
+                    value = PostgresCache._select_messages(
+                        cursor, user_id, conversation_id, limit
+                    )
+                else:
+                    value = PostgresCache._select(cursor, user_id, conversation_id)
+                    if value is not None and limit is not None:
+                        value = value[-limit:] if limit > 0 else []
                 if value is None:
                     return []
                 history = [CacheEntry.from_dict(cache_entry) for cache_entry in value]
@@ -263,6 +587,9 @@ class PostgresCache(Cache):
 
         """
         value = cache_entry.to_dict()
+        if self.schema_mode == constants.POSTGRES_CACHE_SCHEMA_MESSAGES:
+            self._append_message(user_id, conversation_id, value)
+            return
         # the whole operation is run in one transaction
         with self.connection.cursor() as cursor:
             try:
@@ -297,6 +624,25 @@ class PostgresCache(Cache):
                 logger.error("PostgresCache.insert_or_append: %s", e)
                 raise CacheError("PostgresCache.insert_or_append", e) from e
 
+    def _append_message(
+        self, user_id: str, conversation_id: str, value: dict[str, Any]
+    ) -> None:
+        """Append one message into cache messages table."""
+        with self.connection.cursor() as cursor:
+            try:
+                cursor.execute(
+                    PostgresCache.APPEND_MESSAGE_STATEMENT,
+                    (
+                        user_id,
+                        conversation_id,
+                        json.dumps(value, cls=MessageEncoder).encode("utf-8"),
+                    ),
+                )
+                PostgresCache._cleanup_messages(cursor, self.capacity)
+            except psycopg2.DatabaseError as e:
+                logger.error("PostgresCache.insert_or_append: %s", e)
+                raise CacheError("PostgresCache.insert_or_append", e) from e
+
     @connection
     def delete(
         self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
@@ -315,6 +661,12 @@ class PostgresCache(Cache):
         with self.connection.cursor() as cursor:
             try:
                 deleted = PostgresCache._delete(cursor, user_id, conversation_id)
+                if self.schema_mode == constants.POSTGRES_CACHE_SCHEMA_MESSAGES:
+                    cursor.execute(
+                        PostgresCache.DELETE_CONVERSATION_MESSAGES_STATEMENT,
+                        (user_id, conversation_id),
+                    )
+                    deleted = cursor.rowcount > 0 or deleted
                 # Also delete from conversations metadata table
                 cursor.execute(
                     PostgresCache.DELETE_CONVERSATION_METADATA_STATEMENT,
@@ -386,21 +738,13 @@ class PostgresCache(Cache):
     def ready(self) -> bool:
         """Check if the cache is ready.
 
-        Postgres cache checks if the connection is alive.
+        Postgres cache checks if a working connection can be borrowed
+        from the connection pool, reconnecting to the database if needed.
 
         Returns:
             True if the cache is ready, False otherwise.
         """
-        # TODO: when the connection is closed and the database is back online,
-        # we need to reestablish the connection => implement this
-        if not self.connection or self.connection.closed == 1:
-            return False
-        try:
-            return self.connection.poll() == psycopg2.extensions.POLL_OK
-        except (psycopg2.OperationalError, psycopg2.InterfaceError):
-            # OperationalError - the once alive connection is closed
-            # InterfaceError - cannot reach the database server
-            return False
+        return self.connection_pool.ready()
 
     @staticmethod
     def _select(
@@ -431,6 +775,36 @@ class PostgresCache(Cache):
         # try to deserialize the value
         return deserialized
 
+    @staticmethod
+    def _select_messages(
+        cursor: psycopg2.extensions.cursor,
+        user_id: str,
+        conversation_id: str,
+        limit: Optional[int] = None,
+    ) -> Optional[List[Any]]:
+        """Select last messages for given user_id and conversation_id."""
+        cursor.execute(
+            PostgresCache.SELECT_LAST_MESSAGES_STATEMENT,
+            (user_id, conversation_id, limit),
+        )
+        rows = cursor.fetchall()
+
+        if not rows:
+            # the conversation might still be stored in the "cache" table
+            cursor.execute(
+                PostgresCache.MIGRATE_CONVERSATION_STATEMENT,
+                (user_id, conversation_id),
+            )
+            if cursor.rowcount <= 0:
+                return None
+            cursor.execute(
+                PostgresCache.SELECT_LAST_MESSAGES_STATEMENT,
+                (user_id, conversation_id, limit),
+            )
+            rows = cursor.fetchall()
+
+        return [json.loads(str(row[0], "utf-8"), cls=MessageDecoder) for row in rows]
+
     @staticmethod
     def _update(
         cursor: psycopg2.extensions.cursor,
@@ -458,8 +832,13 @@ class PostgresCache(Cache):
         )
 
     @staticmethod
-    def _cleanup(cursor: psycopg2.extensions.cursor, capacity: int) -> None:
-        """Perform cleanup by evicting oldest messages until total_entries <= capacity."""
+    def _entries_to_evict(cursor: psycopg2.extensions.cursor, capacity: int) -> int:
+        """Compute how many entries need to be evicted to keep the cache within capacity.
+
+        Total number of entries is read from cache statistics table. When
+        capacity is exceeded, enough entries are evicted to make room for next
+        entries too, so eviction does not need to run on every insert.
+        """
         cursor.execute(PostgresCache.QUERY_TOTAL_ENTRIES)
         result = cursor.fetchone()
         if result is None:
@@ -471,22 +850,29 @@ class PostgresCache(Cache):
             except (TypeError, ValueError):
                 total_entries = 0
 
-        if total_entries > capacity:
-            cursor.execute(PostgresCache.SELECT_OLDEST_ROW)
-            row = cursor.fetchone()
-            if not row:
-                return
-            user_id, conversation_id, value_bytes = row
-            text_value = str(value_bytes, "utf-8")
-            value = json.loads(text_value, cls=MessageDecoder)
-
-            if len(value) > 1:
-                value.pop(0)
-                new_value_bytes = json.dumps(value, cls=MessageEncoder).encode("utf-8")
-                PostgresCache._update(cursor, user_id, conversation_id, new_value_bytes)
-            else:
-                PostgresCache._delete(cursor, user_id, conversation_id)
-            total_entries -= 1
+        if total_entries <= capacity:
+            return 0
+        batch = max(1, int(capacity * constants.POSTGRES_CACHE_EVICTION_BATCH_RATIO))
+        return total_entries - capacity + batch
+
+    @staticmethod
+    def _cleanup(cursor: psycopg2.extensions.cursor, capacity: int) -> None:
+        """Perform cleanup by evicting oldest messages when capacity is exceeded."""
+        to_evict = PostgresCache._entries_to_evict(cursor, capacity)
+        if to_evict > 0:
+            # every conversation has at least one entry, so the number of
+            # entries limits the number of conversations to be trimmed
+            cursor.execute(
+                PostgresCache.TRIM_OLDEST_CONVERSATIONS_STATEMENT,
+                (to_evict, to_evict, to_evict),
+            )
+
+    @staticmethod
+    def _cleanup_messages(cursor: psycopg2.extensions.cursor, capacity: int) -> None:
+        """Perform cleanup by evicting oldest messages when capacity is exceeded."""
+        to_evict = PostgresCache._entries_to_evict(cursor, capacity)
+        if to_evict > 0:
+            cursor.execute(PostgresCache.DELETE_OLDEST_MESSAGES_STATEMENT, (to_evict,))
 
     @staticmethod
     def _delete(
@@ -1,6 +1,9 @@
 """LLM backend libraries loader."""
 
 import logging
+import threading
+import time
+from collections.abc import Callable
 from typing import Any, Optional
 
 from langchain_core.language_models.llms import LLM
@@ -28,6 +31,93 @@ class ModelConfigMissingError(LLMConfigurationError):
     """No configuration exists for the requested model name."""
 
 
+class LLMCache:
+    """Thread-safe cache of loaded LLMs shared by all requests.
+
+    Loaded LLM keeps its HTTP clients, so connections to LLM provider (and
+    TLS sessions) are reused across requests. Cached LLMs are valid only for
+    the configuration they were loaded with, the whole cache is dropped when
+    the configuration is reloaded. LLMs loaded with expiring credentials
+    (e.g. Azure AD token) are loaded again once the credentials expire.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty cache."""
+        self._lock = threading.Lock()
+        # key -> (LLM, time when it expires or None)
+        self._llms: dict[tuple, tuple[Any, Optional[float]]] = {}
+        self._configuration: tuple = ()
+
+    @staticmethod
+    def key(provider: str, model: str, generic_llm_params: dict) -> tuple:
+        """Construct cache key from provider, model and generic LLM parameters."""
+        params = sorted((str(k), repr(v)) for k, v in generic_llm_params.items())
+        return provider, model, tuple(params)
+
+    def get_or_load(
+        self,
+        key: tuple,
+        configuration: tuple,
+        load: Callable[[], tuple[Any, Optional[float]]],
+    ) -> Any:
+        """Return cached LLM or load it if not cached for given configuration yet.
+
+        `load` returns the LLM and the time (as returned by `time.time()`)
+        when it expires, or None when it does not expire.
+
+        LLM is loaded outside of the cache lock, so slow provider initialization
+        does not block requests for other (already loaded) LLMs. When two
+        threads load the same LLM concurrently, the first stored instance wins
+        and is returned to both of them.
+        """
+        with self._lock:
+            self._check_configuration(configuration)
+            llm = self._get_valid(key)
+        if llm is not None:
+            return llm
+
+        loaded, expires_at = load()
+
+        with self._lock:
+            self._check_configuration(configuration)
+            llm = self._get_valid(key)
+            if llm is None:
+                llm = loaded
+                self._llms[key] = (llm, expires_at)
+            return llm
+
+    def _get_valid(self, key: tuple) -> Any:
+        """Return cached LLM that has not expired yet, must hold the lock."""
+        entry = self._llms.get(key)
+        if entry is None:
+            return None
+        llm, expires_at = entry
+        if expires_at is not None and time.time() >= expires_at:
+            logger.debug("credentials of loaded LLM have expired, loading it again")
+            del self._llms[key]
+            return None
+        return llm
+
+    def _check_configuration(self, configuration: tuple) -> None:
+        """Drop all loaded LLMs when configuration changed, must hold the lock."""
+        if len(configuration) != len(self._configuration) or any(
+            current is not cached
+            for current, cached in zip(configuration, self._configuration)
+        ):
+            logger.debug("configuration changed, dropping all loaded LLMs")
+            self._llms.clear()
+            self._configuration = configuration
+
+    def clear(self) -> None:
+        """Drop all loaded LLMs."""
+        with self._lock:
+            self._llms.clear()
+            self._configuration = ()
+
+
+llm_cache = LLMCache()
+
+
 def resolve_provider_config(
     provider: str, model: str, providers_config: LLMProviders
 ) -> ProviderConfig:
@@ -59,6 +149,10 @@ def load_llm(
 ) -> LLM | Any:  # Temporarily using Any, as mypy gives error for missing bind_tools
     """Load LLM according to input provider and model.
 
+    Loaded LLMs are cached, so the same instance (including its HTTP clients)
+    is returned for the same provider, model and parameters until the
+    configuration is reloaded or credentials the LLM was loaded with expire.
+
     Args:
         provider: The provider name.
         model: The model name.
@@ -93,7 +187,17 @@ def load_llm(
             f"Unsupported LLM provider type '{provider_config.type}'."
         )
 
-    logger.debug("loading LLM model '%s' from provider '%s'", model, provider)
-
+    generic_llm_params = generic_llm_params or {}
     llm_provider = llm_providers_reg.llm_providers[provider_config.type]
-    return llm_provider(model, provider_config, generic_llm_params or {}).load()
+
+    def load() -> tuple[LLM | Any, Optional[float]]:
+        logger.debug("loading LLM model '%s' from provider '%s'", model, provider)
+        loaded_provider = llm_provider(model, provider_config, generic_llm_params)
+        return loaded_provider.load(), loaded_provider.expires_at
+
+    # LLM parameters depend on providers configuration as well as on other
+    # parts of the configuration (proxy, dev overrides)
+    configuration = (config.config, providers_config)
+    return llm_cache.get_or_load(
+        LLMCache.key(provider, model, generic_llm_params), configuration, load
+    )
@@ -92,6 +92,9 @@ class AzureOpenAI(LLMProvider):
             # client_id and client_secret)
             access_token = self.resolve_access_token(azure_config)
             default_parameters["azure_ad_token"] = access_token
+            # loaded LLM keeps the token, so it is loaded again with a new
+            # token once this one expires (or right away without a token)
+            self.expires_at = TOKEN_CACHE.expires_on if access_token else 0
         logger.info("Created Azure default parameters %s", default_parameters)
         return default_parameters
 
@@ -214,6 +214,10 @@ class AbstractLLMProvider(abc.ABC):
 class LLMProvider(AbstractLLMProvider):
     """LLM provider base class."""
 
+    # time (as returned by time.time()) when credentials used by the loaded
+    # LLM expire and it has to be loaded again, None when they don't expire
+    expires_at: Optional[float] = None
+
     def __init__(
         self,
         model: str,
@@ -370,6 +374,13 @@ class LLMProvider(AbstractLLMProvider):
                 for host in config.ols_config.proxy_config.no_proxy_hosts
             }
 
+        # clients are kept for the whole lifetime of loaded LLM (see llm_loader),
+        # so keep-alive connections are reused across requests
+        limits = httpx.Limits(
+            max_connections=self.provider_config.max_connections,
+            max_keepalive_connections=self.provider_config.max_keepalive_connections,
+        )
+
         sec_profile = self.provider_config.tls_security_profile
         logger.info("Security profile %s", sec_profile)
 
@@ -391,8 +402,12 @@ class LLMProvider(AbstractLLMProvider):
                 "No security profiles. creating httpx.Client with verify %s", verify
             )
             if use_async:
-                return httpx.AsyncClient(verify=verify, proxies=proxy, mounts=mounts)
-            return httpx.Client(verify=verify, proxies=proxy, mounts=mounts)
+                return httpx.AsyncClient(
+                    verify=verify, proxies=proxy, mounts=mounts, limits=limits
+                )
+            return httpx.Client(
+                verify=verify, proxies=proxy, mounts=mounts, limits=limits
+            )
 
         # security profile is set -> we need to retrieve SSL version and list of allowed ciphers
         ciphers = tls.ciphers_as_string(sec_profile.ciphers, sec_profile.profile_type)
@@ -420,5 +435,5 @@ class LLMProvider(AbstractLLMProvider):
             "With security profile, creating httpx.Client with verify %s", context
         )
         if use_async:
-            return httpx.AsyncClient(verify=context, proxies=proxy)
-        return httpx.Client(verify=context, proxies=proxy)
+            return httpx.AsyncClient(verify=context, proxies=proxy, limits=limits)
+        return httpx.Client(verify=context, proxies=proxy, limits=limits)
@@ -4,6 +4,7 @@
 import asyncio
 import json
 import logging
+from functools import lru_cache
 from typing import Any, AsyncGenerator, Callable, Optional
 
 from langchain_core.globals import set_debug
@@ -11,6 +12,7 @@ from langchain_core.messages import AIMessage, BaseMessage
 from langchain_core.messages.ai import AIMessageChunk
 from langchain_core.prompts import ChatPromptTemplate
 from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import NodeWithScore
 
 from ols import config, constants
 from ols.app.metrics import TokenMetricUpdater
@@ -20,6 +22,13 @@ from ols.constants import MAX_ITERATIONS, GenericLLMParameters
 from ols.customize import reranker
 from ols.src.prompts.prompt_generator import GeneratePrompt
 from ols.src.query_helpers.query_helper import QueryHelper
+from ols.src.rag_index.near_duplicates import suppress_near_duplicates
+from ols.src.rag_index.retrieval_cache import (
+    rag_retrieval_cache_hits_total,
+    rag_retrieval_cache_misses_total,
+    retrieval_cache,
+)
+from ols.src.tools.tool_filtering import get_tool_filter
 from ols.src.tools.tools import execute_tool_calls
 from ols.utils.mcp_utils import build_mcp_config, gather_mcp_tools
 from ols.utils.token_handler import TokenHandler
@@ -27,6 +36,70 @@ from ols.utils.token_handler import TokenHandler
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=128)
+def prompt_template_token_count(
+    model: str,
+    system_prompt: str,
+    tool_calling_enabled: bool,
+    with_context: bool,
+    with_history: bool,
+) -> int:
+    """Count tokens of the prompt without query, RAG chunks and history.
+
+    The count depends only on the arguments, so the prompt template is
+    generated and tokenized once for every combination of them.
+    """
+    prompt, prompt_input = GeneratePrompt(
+        "",
+        [""] if with_context else [],
+        [AIMessage("")] if with_history else [],
+        system_prompt,
+        tool_calling_enabled,
+    ).generate_prompt(model)
+    return TokenHandler().count_tokens(prompt.format(**prompt_input))
+
+
+def retrieve_nodes(query: str, rag_retriever: BaseRetriever) -> list[NodeWithScore]:
+    """Retrieve and rerank RAG chunks for the query.
+
+    Near-duplicates of better ranked chunks are left out before reranking,
+    so the reranked chunks used as context are all distinct.
+
+    Results are deterministic for the given set of indexes, so IDs and
+    scores of the reranked nodes are cached and the same query is then
+    answered without embedding, search, fusion and reranking.
+    """
+    key = retrieval_cache.key(query, rag_retriever)
+    if key is not None:
+        cached_nodes = retrieval_cache.get(key)
+        # only retrievers of loaded indexes can get cached nodes by their IDs
+        get_nodes = getattr(rag_retriever, "get_nodes", None)
+        if cached_nodes is not None and get_nodes is not None:
+            retrieved_nodes = get_nodes(cached_nodes)
+            if retrieved_nodes is not None:
+                rag_retrieval_cache_hits_total.inc()
+                logger.info("Using %d cached documents", len(retrieved_nodes))
+                return retrieved_nodes
+        rag_retrieval_cache_misses_total.inc()
+
+    retrieved_nodes = rag_retriever.retrieve(query)
+    logger.info("Retrieved %d documents from indexes", len(retrieved_nodes))
+
+    retrieved_nodes = suppress_near_duplicates(retrieved_nodes)
+    logger.info("After near-duplicate removal: %d documents", len(retrieved_nodes))
+
+    retrieved_nodes, reranked = reranker.rerank(retrieved_nodes, query=query)
+    logger.info("After reranking: %d documents", len(retrieved_nodes))
+
+    # results that could not be reranked (e.g. reranker is overloaded) are
+    # not cached, so the query is reranked next time
+    if key is not None and reranked:
+        retrieval_cache.put(
+            key, [(node.node.node_id, node.score) for node in retrieved_nodes]
+        )
+    return retrieved_nodes
+
+
 def skip_special_chunk(
     chunk_text: str,
     chunk_counter: int,
@@ -157,34 +230,31 @@ class DocsSummarizer(QueryHelper):
 
         token_handler = TokenHandler()
 
-        # Use sample text for context/history to get complete prompt
-        # instruction. This is used to calculate available tokens.
-        temp_prompt, temp_prompt_input = GeneratePrompt(
-            # Sample prompt's context/history must be re-structured for the given model,
-            # to ensure the further right available token calculation.
-            query,
-            ["sample"],
-            [AIMessage("sample")],
-            self._system_prompt,
-            self._tool_calling_enabled,
-        ).generate_prompt(self.model)
+        # Prompt is accounted by parts: template with instructions for both
+        # context and history (computed once), query, RAG chunks and history.
+        # The chunks and history are then fitted into the remaining tokens.
+        query_tokens = token_handler.count_tokens(query)
         max_tokens_for_tools = (
             self.model_config.parameters.max_tokens_for_tools if self.mcp_servers else 0
         )
-        available_tokens = token_handler.calculate_and_check_available_tokens(
-            temp_prompt.format(**temp_prompt_input),
+        available_tokens = token_handler.check_available_tokens(
+            prompt_template_token_count(
+                self.model,
+                self._system_prompt,
+                self._tool_calling_enabled,
+                with_context=True,
+                with_history=True,
+            )
+            + query_tokens,
             self.model_config.context_window_size,
             self.model_config.parameters.max_tokens_for_response,
             max_tokens_for_tools,
         )
+        augmentation_tokens = available_tokens
 
         # Retrieve RAG content
         if rag_retriever:
-            retrieved_nodes = rag_retriever.retrieve(query)
-            logger.info("Retrieved %d documents from indexes", len(retrieved_nodes))
-
-            retrieved_nodes = reranker.rerank(retrieved_nodes)
-            logger.info("After reranking: %d documents", len(retrieved_nodes))
+            retrieved_nodes = retrieve_nodes(query, rag_retriever)
 
             # Logging top retrieved candidates with scores
             for i, node in enumerate(retrieved_nodes[:5]):
@@ -220,15 +290,33 @@ class DocsSummarizer(QueryHelper):
             self._tool_calling_enabled,
         ).generate_prompt(self.model)
 
-        # Tokens-check: We trigger the computation of the token count
-        # without care about the return value. This is to ensure that
-        # the query is within the token limit.
-        token_handler.calculate_and_check_available_tokens(
-            final_prompt.format(**llm_input_values),
-            self.model_config.context_window_size,
-            self.model_config.parameters.max_tokens_for_response,
-            max_tokens_for_tools,
-        )
+        # Final prompt fits into the context window by construction, so it
+        # is not tokenized again; its size is derived from counts of parts.
+        if logger.isEnabledFor(logging.DEBUG):
+            history_tokens = sum(
+                TokenHandler.buffered_token_count(
+                    token_handler.history_message_token_count(message)
+                )
+                + 1
+                for message in history
+            )
+            prompt_tokens = TokenHandler.buffered_token_count(
+                prompt_template_token_count(
+                    self.model,
+                    self._system_prompt,
+                    self._tool_calling_enabled,
+                    with_context=bool(rag_context),
+                    with_history=bool(history),
+                )
+                + query_tokens
+            )
+            logger.debug(
+                "Final prompt tokens: %d (template and query: %d, RAG: %d, history: %d)",
+                prompt_tokens + augmentation_tokens - available_tokens + history_tokens,
+                prompt_tokens,
+                augmentation_tokens - available_tokens,
+                history_tokens,
+            )
 
         return final_prompt, llm_input_values, rag_chunks, truncated
 
@@ -268,6 +356,15 @@ class DocsSummarizer(QueryHelper):
         ):
             yield chunk  # type: ignore [misc]
 
+    async def _gather_relevant_tools(self, query: str) -> list:
+        """Gather tools from MCP servers and select those relevant to query."""
+        all_mcp_tools = await gather_mcp_tools(self.mcp_servers)
+        tool_filter = get_tool_filter(config.ols_config.tool_filtering)
+        if tool_filter is None or not all_mcp_tools:
+            return all_mcp_tools
+        # embedding the query is blocking, keep it off the event loop
+        return await asyncio.to_thread(tool_filter.filter_tools, query, all_mcp_tools)
+
     async def iterate_with_tools(  # noqa: C901
         self,
         messages: ChatPromptTemplate,
@@ -288,7 +385,9 @@ class DocsSummarizer(QueryHelper):
             StreamedChunk objects representing parts of the response
         """
         async with asyncio.timeout(constants.TOOL_CALL_ROUND_TIMEOUT * max_rounds):
-            all_mcp_tools = await gather_mcp_tools(self.mcp_servers)
+            all_mcp_tools = await self._gather_relevant_tools(
+                llm_input_values.get("query", "")
+            )
 
             # Track cumulative token usage for tool outputs
             tool_tokens_used = 0
@@ -306,8 +405,8 @@ class DocsSummarizer(QueryHelper):
                         for t in all_mcp_tools
                     ]
                 )
-                tool_definitions_tokens = TokenHandler._get_token_count(
-                    token_handler.text_to_tokens(tool_definitions_text)
+                tool_definitions_tokens = token_handler.approximate_token_count(
+                    tool_definitions_text
                 )
                 tool_tokens_used += tool_definitions_tokens
                 logger.debug(
@@ -372,8 +471,8 @@ class DocsSummarizer(QueryHelper):
                     messages.append(ai_tool_call_message)
 
                     # Count tokens used by the AIMessage with tool calls
-                    ai_message_tokens = TokenHandler._get_token_count(
-                        token_handler.text_to_tokens(json.dumps(tool_calls))
+                    ai_message_tokens = token_handler.approximate_token_count(
+                        json.dumps(tool_calls)
                     )
                     tool_tokens_used += ai_message_tokens
 
@@ -419,11 +518,11 @@ class DocsSummarizer(QueryHelper):
                     messages.extend(tool_calls_messages)
 
                     # Track tokens used by tool outputs
-                    for tool_call_message in tool_calls_messages:
-                        content_tokens = token_handler.text_to_tokens(
-                            str(tool_call_message.content)
+                    tool_tokens_used += sum(
+                        token_handler.count_tokens_batch(
+                            [str(message.content) for message in tool_calls_messages]
                         )
-                        tool_tokens_used += len(content_tokens)
+                    )
 
                     for tool_call_message in tool_calls_messages:
                         was_truncated = tool_call_message.additional_kwargs.get(
@@ -479,9 +578,13 @@ class DocsSummarizer(QueryHelper):
         Yields:
             StreamedChunk objects representing parts of the response
         """
-        final_prompt, llm_input_values, rag_chunks, truncated = self._prepare_prompt(
-            query, rag_retriever, history
-        )
+        # retrieval and tokenization are blocking, keep them off the event loop
+        (
+            final_prompt,
+            llm_input_values,
+            rag_chunks,
+            truncated,
+        ) = await asyncio.to_thread(self._prepare_prompt, query, rag_retriever, history)
         messages = final_prompt.model_copy()
 
         with TokenMetricUpdater(
@@ -506,6 +609,52 @@ class DocsSummarizer(QueryHelper):
             },
         )
 
+    async def create_response_async(
+        self,
+        query: str,
+        rag_retriever: Optional[BaseRetriever] = None,
+        history: Optional[list[BaseMessage]] = None,
+    ) -> SummarizerResponse:
+        """Create a complete response for the given query.
+
+        Args:
+            query: The query to be answered
+            rag_retriever: Retriever for RAG context
+            history: Optional conversation history
+
+        Returns:
+            A SummarizerResponse object containing the complete response
+        """
+        chunks = []
+        response_end: dict[str, Any] = {}
+        tool_calls = []
+        tool_results = []
+        async for chunk in self.generate_response(query, rag_retriever, history):
+            if chunk.type == "end":
+                response_end = chunk.data
+                break
+            if chunk.type == "tool_call":
+                tool_calls.append(chunk.data)
+            elif chunk.type == "tool_result":
+                tool_results.append(chunk.data)
+            elif chunk.type == "text":
+                chunks.append(chunk.text)
+            else:
+                # this "can't" happen as we control what chunk types
+                # are yielded in the generator directly
+                msg = f"Unknown chunk type: {chunk.type}"
+                logger.warning(msg)
+                raise ValueError(msg)
+
+        return SummarizerResponse(
+            response="".join(chunks),
+            rag_chunks=response_end.get("rag_chunks", []),
+            history_truncated=response_end.get("truncated", False),
+            token_counter=response_end.get("token_counter", None),
+            tool_calls=tool_calls,
+            tool_results=tool_results,
+        )
+
     def create_response(
         self,
         query: str,
@@ -514,8 +663,8 @@ class DocsSummarizer(QueryHelper):
     ) -> SummarizerResponse:
         """Create a synchronous response for the given query.
 
-        This method wraps the asynchronous generate_response method to provide
-        a synchronous interface.
+        This method wraps the asynchronous create_response_async method to
+        provide a synchronous interface for callers without an event loop.
 
         Args:
             query: The query to be answered
@@ -525,39 +674,6 @@ class DocsSummarizer(QueryHelper):
         Returns:
             A SummarizerResponse object containing the complete response
         """
-
-        async def drain_generate_response() -> SummarizerResponse:
-            """Inner async function to collect all response chunks."""
-            chunks = []
-            response_end: dict[str, Any] = {}
-            tool_calls = []
-            tool_results = []
-            async for chunk in self.generate_response(query, rag_retriever, history):
-                if chunk.type == "end":
-                    response_end = chunk.data
-                    break
-                if chunk.type == "tool_call":
-                    tool_calls.append(chunk.data)
-                elif chunk.type == "tool_result":
-                    tool_results.append(chunk.data)
-                elif chunk.type == "text":
-                    chunks.append(chunk.text)
-                else:
-                    # this "can't" happen as we control what chunk types
-                    # are yielded in the generator directly
-                    msg = f"Unknown chunk type: {chunk.type}"
-                    logger.warning(msg)
-                    raise ValueError(msg)
-
-            return SummarizerResponse(
-                response="".join(chunks),
-                rag_chunks=response_end.get("rag_chunks", []),
-                history_truncated=response_end.get("truncated", False),
-                token_counter=response_end.get("token_counter", None),
-                tool_calls=tool_calls,
-                tool_results=tool_results,
-            )
-
-        # TODO: if we define the non-streaming endpoint as async, we don't
-        # need to handle any of this, we would just await it
-        return run_async_safely(drain_generate_response())
+        return run_async_safely(
+            self.create_response_async(query, rag_retriever, history)
+        )
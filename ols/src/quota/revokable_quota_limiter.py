@@ -7,11 +7,12 @@ from ols.app.models.config import PostgresConfig
 from ols.src.quota.quota_exceed_error import QuotaExceedError
 from ols.src.quota.quota_limiter import QuotaLimiter
 from ols.utils.connection_decorator import connection
+from ols.utils.connection_pool import PooledConnectable
 
 logger = logging.getLogger(__name__)
 
 
-class RevokableQuotaLimiter(QuotaLimiter):
+class RevokableQuotaLimiter(QuotaLimiter, PooledConnectable):
     """Simple quota limiter where quota can be revoked."""
 
     CREATE_QUOTA_TABLE = """
@@ -156,6 +157,7 @@ class RevokableQuotaLimiter(QuotaLimiter):
         cursor.close()
         self.connection.commit()
 
+    @connection
     def _init_quota(self, subject_id: str = "") -> None:
         """Initialize quota for given ID."""
         # timestamp to be used
@@ -4,15 +4,14 @@ import logging
 from datetime import datetime
 from typing import Optional
 
-import psycopg2
-
 from ols.app.models.config import PostgresConfig
 from ols.utils.connection_decorator import connection
+from ols.utils.connection_pool import PooledConnectable
 
 logger = logging.getLogger(__name__)
 
 
-class TokenUsageHistory:
+class TokenUsageHistory(PooledConnectable):
     """Class with implementation of storage for token usage history."""
 
     CREATE_TOKEN_USAGE_TABLE = """
@@ -47,12 +46,12 @@ class TokenUsageHistory:
 
     def __init__(self, config: PostgresConfig) -> None:
         """Initialize token usage history storage."""
-        # store connection configuration, will be used
-        # by reconnection logic if needed
+        # store connection configuration
         self.connection_config: Optional[PostgresConfig] = config
 
-        # initialize connection to DB
-        self.connect()
+        # attach to connection pool and initialize tables; quota storage is
+        # accessed without CA certificate, like in the quota scheduler
+        self.connect(config, self._initialize_tables, use_ca_cert=False)
 
     @connection
     def consume_tokens(
@@ -88,44 +87,6 @@ class TokenUsageHistory:
                 },
             )
 
-    # pylint: disable=W0201
-    def connect(self) -> None:
-        """Initialize connection to database."""
-        config = self.connection_config
-        # make sure the connection will have known state
-        self.connection = None
-        self.connection = psycopg2.connect(
-            host=config.host,
-            port=config.port,
-            user=config.user,
-            password=config.password,
-            dbname=config.dbname,
-            sslmode=config.ssl_mode,
-            # sslrootcert=config.ca_cert_path,
-            gssencmode=config.gss_encmode,
-        )
-        try:
-            self._initialize_tables()
-        except Exception as e:
-            self.connection.close()
-            logger.exception("Error initializing Postgres database:\n%s", e)
-            raise
-        self.connection.autocommit = True
-
-    def connected(self) -> bool:
-        """Check if connection to cache is alive."""
-        if self.connection is None:
-            logger.warning("Not connected, need to reconnect later")
-            return False
-        try:
-            with self.connection.cursor() as cursor:
-                cursor.execute("SELECT 1")
-            logger.info("Connection to storage is ok")
-            return True
-        except psycopg2.OperationalError as e:
-            logger.error("Disconnected from storage: %s", e)
-            return False
-
     def _initialize_tables(self) -> None:
         """Initialize tables used by quota limiter."""
         logger.info("Initializing tables for token usage history")
@@ -21,6 +21,7 @@ class UserQuotaLimiter(RevokableQuotaLimiter):
         subject = "u"  # user
         super().__init__(initial_quota, increase_by, subject, config)
 
-        # initialize connection to DB
-        # and initialize tables too
-        self.connect()
+        # attach to connection pool
+        # and initialize tables too; quota storage is accessed without
+        # CA certificate, like in the quota scheduler
+        self.connect(config, self._initialize_tables, use_ca_cert=False)
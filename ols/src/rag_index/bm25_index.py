@@ -0,0 +1,197 @@
+"""Sparse BM25 index of RAG chunks used by hybrid retrieval."""
+
+import logging
+import os
+import re
+from collections import Counter
+from typing import Optional
+
+import numpy as np
+
+from ols.constants import RAG_BM25_B, RAG_BM25_K1
+
+logger = logging.getLogger(__name__)
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase terms.
+
+    Identifiers are kept as whole terms (`imagePullPolicy` becomes
+    `imagepullpolicy`), only punctuation splits them (`oc-mirror`).
+    """
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+class BM25Index:
+    """Inverted BM25 index over chunks.
+
+    BM25 weight of every (term, chunk) pair is computed when the index is
+    built and stored in postings lists of terms in compressed sparse column
+    layout, so a query is scored just by summing postings of its terms.
+    """
+
+    def __init__(
+        self,
+        node_ids: np.ndarray,
+        vocabulary: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        weights: np.ndarray,
+        k1: float,
+        b: float,
+    ) -> None:
+        """Initialize index from postings of terms.
+
+        Postings of the i-th term of vocabulary are chunk positions
+        `indices[indptr[i]:indptr[i + 1]]` with weights
+        `weights[indptr[i]:indptr[i + 1]]`.
+        """
+        self.node_ids = node_ids
+        self.vocabulary = vocabulary
+        self.k1 = k1
+        self.b = b
+        self._indptr = indptr
+        self._indices = indices
+        self._weights = weights
+        self._term_ids = {str(term): i for i, term in enumerate(vocabulary)}
+
+    def __len__(self) -> int:
+        """Return the number of indexed chunks."""
+        return len(self.node_ids)
+
+    @classmethod
+    def build(
+        cls, texts: dict[str, str], k1: float = RAG_BM25_K1, b: float = RAG_BM25_B
+    ) -> "BM25Index":
+        """Build index over texts of chunks keyed by node IDs."""
+        term_ids: dict[str, int] = {}
+        rows: list[int] = []
+        columns: list[int] = []
+        frequencies: list[int] = []
+        lengths = np.zeros(len(texts), dtype=np.float32)
+        for row, text in enumerate(texts.values()):
+            terms = tokenize(text)
+            lengths[row] = len(terms)
+            for term, frequency in Counter(terms).items():
+                rows.append(row)
+                columns.append(term_ids.setdefault(term, len(term_ids)))
+                frequencies.append(frequency)
+
+        chunk_ids = np.asarray(rows, dtype=np.int32)
+        term_columns = np.asarray(columns, dtype=np.int32)
+        term_frequencies = np.asarray(frequencies, dtype=np.float32)
+        document_frequencies = np.bincount(term_columns, minlength=len(term_ids))
+        n = len(texts)
+        idf = np.log1p((n - document_frequencies + 0.5) / (document_frequencies + 0.5))
+        average_length = lengths.mean() if n else 0.0
+        length_norm = k1 * (1 - b + b * lengths / (average_length or 1.0))
+        weights = (
+            idf[term_columns]
+            * term_frequencies
+            * (k1 + 1)
+            / (term_frequencies + length_norm[chunk_ids])
+        ).astype(np.float32)
+
+        # group postings by terms
+        order = np.argsort(term_columns, kind="stable")
+        indptr = np.zeros(len(term_ids) + 1, dtype=np.int64)
+        np.cumsum(document_frequencies, out=indptr[1:])
+        return cls(
+            node_ids=np.asarray(list(texts.keys()), dtype=str),
+            vocabulary=np.asarray(list(term_ids.keys()), dtype=str),
+            indptr=indptr,
+            indices=chunk_ids[order],
+            weights=weights[order],
+            k1=k1,
+            b=b,
+        )
+
+    def scores(self, query: str) -> np.ndarray:
+        """Return BM25 score of each chunk for given query."""
+        scores = np.zeros(len(self.node_ids), dtype=np.float32)
+        for term in tokenize(query):
+            i = self._term_ids.get(term)
+            if i is None:
+                continue
+            start, end = self._indptr[i], self._indptr[i + 1]
+            # chunks are unique within postings of one term
+            scores[self._indices[start:end]] += self._weights[start:end]
+        return scores
+
+    def search(self, query: str, top_k: int) -> list[tuple[str, float]]:
+        """Return IDs and scores of at most top_k chunks matching query."""
+        scores = self.scores(query)
+        matching = np.flatnonzero(scores)
+        if len(matching) > top_k:
+            matching = matching[np.argpartition(-scores[matching], top_k - 1)[:top_k]]
+        matching = matching[np.argsort(-scores[matching], kind="stable")]
+        return [(str(self.node_ids[i]), float(scores[i])) for i in matching]
+
+    def save(self, path: str) -> None:
+        """Store index into file, replacing it atomically."""
+        temporary_path = f"{path}.tmp"
+        try:
+            with open(temporary_path, "wb") as f:
+                np.savez_compressed(
+                    f,
+                    node_ids=self.node_ids,
+                    vocabulary=self.vocabulary,
+                    indptr=self._indptr,
+                    indices=self._indices,
+                    weights=self._weights,
+                    parameters=np.asarray([self.k1, self.b]),
+                )
+            os.replace(temporary_path, path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        """Load index stored in file."""
+        with np.load(path, allow_pickle=False) as data:
+            k1, b = data["parameters"].tolist()
+            return cls(
+                node_ids=data["node_ids"],
+                vocabulary=data["vocabulary"],
+                indptr=data["indptr"],
+                indices=data["indices"],
+                weights=data["weights"],
+                k1=k1,
+                b=b,
+            )
+
+
+def load_bm25_index(
+    texts: dict[str, str], path: str, k1: float = RAG_BM25_K1, b: float = RAG_BM25_B
+) -> BM25Index:
+    """Load BM25 index of chunks from file, build it when it is missing or stale.
+
+    Built index is stored into the file, so it is built just once for
+    every index of chunks. Index directories can be read-only, in which
+    case the index is built on every load.
+    """
+    index: Optional[BM25Index] = None
+    if os.path.exists(path):
+        try:
+            index = BM25Index.load(path)
+        except Exception as e:
+            logger.warning("BM25 index %s can't be loaded: %s", path, e)
+        else:
+            # index of chunks has been rebuilt or BM25 parameters changed
+            stale = (index.k1, index.b) != (k1, b)
+            stale = stale or set(index.node_ids.tolist()) != texts.keys()
+            if stale:
+                logger.info("BM25 index %s is stale, it is built again", path)
+                index = None
+    if index is not None:
+        logger.info("BM25 index of %d chunks loaded from %s", len(index), path)
+        return index
+
+    index = BM25Index.build(texts, k1, b)
+    logger.info("BM25 index of %d chunks built", len(index))
+    try:
+        index.save(path)
+    except OSError as e:
+        logger.info("BM25 index can't be stored into %s: %s", path, e)
+    return index
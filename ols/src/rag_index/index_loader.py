@@ -1,11 +1,32 @@
 # type: ignore
 """Module for loading index."""
 
+import itertools
 import logging
-from typing import Any, Optional
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
 
-from ols.app.models.config import ReferenceContent
-from ols.constants import RAG_CONTENT_LIMIT
+import numpy as np
+from prometheus_client import Counter
+
+from ols.app.models.config import ReferenceContent, ReferenceContentIndex
+from ols.constants import (
+    RAG_CHUNK_SIMHASH_KEY,
+    RAG_CHUNK_TOKEN_COUNT_KEY,
+    RAG_CONTENT_LIMIT,
+    RAG_INDEX_BM25_FILE,
+    RAG_INDEX_VECTOR_STORE_FILE,
+    RAG_QUERY_EMBEDDING_CACHE_MAX_ENTRIES,
+    RAG_RETRIEVAL_MAX_WORKERS,
+    RAG_SIMILARITY_CUTOFF,
+    EmbeddingsBackend,
+    IndexLoadState,
+)
+from ols.src.rag_index.retrieval_cache import normalize_query, retrieval_cache
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +35,398 @@ SCORE_DILUTION_WEIGHT = 0.05
 SCORE_DILUTION_DEPTH = 2
 
 
+# shared by all retrievers to search indexes concurrently; FAISS releases
+# GIL while searching
+retrieval_executor = ThreadPoolExecutor(
+    max_workers=RAG_RETRIEVAL_MAX_WORKERS, thread_name_prefix="retrieval"
+)
+
+
+# Metrics are defined here and not in ols.app.metrics, because the metrics
+# module depends on the application configuration that imports this module.
+# They are exposed by the /metrics endpoint all the same.
+rag_query_embedding_cache_hits_total = Counter(
+    "ols_rag_query_embedding_cache_hits_total",
+    "Queries embedded using cached embedding",
+)
+rag_query_embedding_cache_misses_total = Counter(
+    "ols_rag_query_embedding_cache_misses_total",
+    "Queries embedded by embedding model",
+)
+
+
+class QueryEmbeddingCache:
+    """Thread-safe LRU cache of query embeddings.
+
+    Queries are normalized, so questions differing just in letter case or
+    whitespace share the embedding. Embeddings are stored as read-only
+    float32 arrays.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        """Initialize empty cache."""
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._embeddings: OrderedDict[tuple[str, str], np.ndarray] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of cached embeddings."""
+        return len(self._embeddings)
+
+    @staticmethod
+    def key(model_name: str, query: str) -> tuple[str, str]:
+        """Construct cache key for given embedding model and query."""
+        return model_name, normalize_query(query)
+
+    def get(self, key: tuple[str, str]) -> Optional[np.ndarray]:
+        """Return cached embedding, or None when it is not cached."""
+        with self._lock:
+            embedding = self._embeddings.get(key)
+            if embedding is not None:
+                self._embeddings.move_to_end(key)
+            return embedding
+
+    def put(self, key: tuple[str, str], embedding: list[float]) -> np.ndarray:
+        """Store embedding, evicting the least recently used ones."""
+        array = np.asarray(embedding, dtype=np.float32)
+        array.setflags(write=False)
+        with self._lock:
+            self._embeddings[key] = array
+            self._embeddings.move_to_end(key)
+            while len(self._embeddings) > self.max_entries:
+                self._embeddings.popitem(last=False)
+        return array
+
+    def clear(self) -> None:
+        """Remove all cached embeddings."""
+        with self._lock:
+            self._embeddings.clear()
+
+
+query_embedding_cache = QueryEmbeddingCache(RAG_QUERY_EMBEDDING_CACHE_MAX_ENTRIES)
+
+
+# generations of loaded indexes, increased every time indexes are published
+_index_generations = itertools.count()
+
+
+def embed_query(embed_model: Any, texts: list[str]) -> list[float]:
+    """Embed query texts into one (mean) embedding, like llama_index does.
+
+    Repeated queries are not passed through the embedding model again.
+    """
+    model_name = getattr(embed_model, "model_name", None) or type(embed_model).__name__
+    embeddings = []
+    for text in texts:
+        key = query_embedding_cache.key(model_name, text)
+        embedding = query_embedding_cache.get(key)
+        if embedding is None:
+            rag_query_embedding_cache_misses_total.inc()
+            embedding = query_embedding_cache.put(
+                key, embed_model.get_query_embedding(text)
+            )
+        else:
+            rag_query_embedding_cache_hits_total.inc()
+        embeddings.append(embedding)
+    if len(embeddings) == 1:
+        return embeddings[0].tolist()
+    return np.mean(embeddings, axis=0).tolist()
+
+
+def index_metadata(
+    index_configs: Optional[list[Optional[ReferenceContentIndex]]],
+    retriever_index_positions: list[int],
+    i: int,
+) -> tuple[str, str]:
+    """Get ID and origin of index searched by retriever #i."""
+    if i < len(retriever_index_positions):
+        i = retriever_index_positions[i]
+    index_id = ""
+    index_origin = ""
+    if index_configs and i < len(index_configs):
+        index_config = index_configs[i]
+        if index_config is not None:
+            index_id = index_config.product_docs_index_id or ""
+            index_origin = index_config.product_docs_origin or "default"
+    return index_id, index_origin
+
+
+def combine_retrievers(
+    retrievers: list[Any], sparse_retrievers: list[tuple[int, Any]]
+) -> tuple[list[Any], list[int]]:
+    """Combine dense retrievers with (index position, retriever) sparse ones.
+
+    Returns:
+        All retrievers, sparse retrievers following dense ones, and the
+        position of index searched by each retriever.
+    """
+    retriever_index_positions = list(range(len(retrievers))) + [
+        i for i, _ in sparse_retrievers
+    ]
+    return (
+        retrievers + [retriever for _, retriever in sparse_retrievers],
+        retriever_index_positions,
+    )
+
+
+def embed_queries(retrievers: list[Any], queries: list[Any]) -> None:
+    """Compute embeddings of queries once for all retrievers.
+
+    Vector retrievers embed the query only when it has no embedding
+    yet. Retrievers running concurrently would all compute it, so it
+    is computed up front when all retrievers use the same model, and
+    embeddings of already seen queries are taken from cache.
+    """
+    embed_models = {
+        id(getattr(retriever, "_embed_model", None)) for retriever in retrievers
+    }
+    embed_model = getattr(retrievers[0], "_embed_model", None)
+    if embed_model is None or len(embed_models) != 1:
+        return
+    for query in queries:
+        if query.embedding is None and query.embedding_strs:
+            query.embedding = embed_query(embed_model, query.embedding_strs)
+
+
+def retrieve_concurrently(
+    retrievers: list[Any], queries: list[Any]
+) -> Optional[dict[tuple[str, int], list[Any]]]:
+    """Query all retrievers concurrently.
+
+    Returns:
+        Retrieved nodes keyed by query and retriever position, or None when
+        there is just one retriever to query.
+    """
+    tasks = [
+        (query, i, retriever)
+        for query in queries
+        for i, retriever in enumerate(retrievers)
+    ]
+    if len(tasks) <= 1:
+        return None
+
+    futures = [
+        retrieval_executor.submit(retriever.retrieve, query)
+        for query, _, retriever in tasks
+    ]
+    # results are kept in the order of retrievers, as the order
+    # determines weights of retrieved nodes
+    return {
+        (query.query_str, i): future.result()
+        for (query, i, _), future in zip(tasks, futures)
+    }
+
+
+def get_indexed_nodes(
+    retrievers: list[Any],
+    index_metadata: Callable[[int], tuple[str, str]],
+    nodes: list[tuple[str, float]],
+) -> Optional[list[Any]]:
+    """Get nodes with given IDs and scores from document stores of indexes.
+
+    Returns:
+        Nodes with scores, or None when some node is not found.
+    """
+    nodes_with_scores = []
+    for node_id, score in nodes:
+        for i, retriever in enumerate(retrievers):
+            node = retriever._docstore.get_node(node_id, raise_error=False)
+            if node is not None:
+                break
+        else:
+            return None
+        index_id, index_origin = index_metadata(i)
+        node.metadata["index_id"] = index_id
+        node.metadata["index_origin"] = index_origin
+        nodes_with_scores.append(NodeWithScore(node=node, score=score))
+    return nodes_with_scores
+
+
+def select_top_nodes(nodes: list[Any], scores: np.ndarray, top_k: int) -> list[int]:
+    """Get positions of top-k nodes by scores, leaving out duplicates.
+
+    Nodes are duplicates when they have the same ID or the same
+    content (the same chunk in more indexes); the one with the
+    highest score is kept.
+    """
+    if len(scores) > top_k:
+        order = np.argpartition(-scores, top_k - 1)[:top_k]
+        order = order[np.argsort(-scores[order], kind="stable")]
+    else:
+        order = np.argsort(-scores, kind="stable")
+
+    def unique(order: np.ndarray) -> list[int]:
+        selected = []
+        seen: set[Any] = set()
+        for j in order.tolist():
+            node = nodes[j].node
+            keys = (node.node_id, hash(node.get_content()))
+            if seen.isdisjoint(keys):
+                seen.update(keys)
+                selected.append(j)
+                if len(selected) == top_k:
+                    break
+        return selected
+
+    selected = unique(order)
+    if len(selected) < top_k < len(scores):
+        # duplicates took places of other nodes, look at all of them
+        selected = unique(np.argsort(-scores, kind="stable"))
+    return selected
+
+
+def weighted_fusion(
+    results: dict[tuple[str, int], list[Any]],
+    index_weights: np.ndarray,
+    top_k: int,
+    index_metadata: Callable[[int], tuple[str, str]],
+) -> list[Any]:
+    """Fuse results by scores weighted by weights of their indexes.
+
+    Scores of all retrieved nodes are weighted at once and only the top-k
+    nodes are sorted and get metadata of their indexes.
+    """
+    # Note: Index with lower weight still may rank higher, if score gap is enough.
+    # Currently weights are calculated dynamic (until this becomes part of config)
+    # Current dynamic weights marginally penalize the score.
+    nodes = []
+    retriever_ids = []
+    for (_, i), nodes_with_scores in results.items():
+        nodes.extend(nodes_with_scores)
+        retriever_ids.extend([i] * len(nodes_with_scores))
+    if not nodes:
+        return []
+    retriever_positions = np.asarray(retriever_ids)
+    original_scores = np.fromiter(
+        (node.score or 0.0 for node in nodes),
+        dtype=np.float64,
+        count=len(nodes),
+    )
+    weighted_scores = original_scores * index_weights[retriever_positions]
+
+    fused = []
+    for j in select_top_nodes(nodes, weighted_scores, top_k):
+        i = int(retriever_positions[j])
+        index_id, index_origin = index_metadata(i)
+        node_with_score = nodes[j]
+        node_with_score.node.metadata["index_id"] = index_id
+        node_with_score.node.metadata["index_origin"] = index_origin
+        node_with_score.score = float(weighted_scores[j])
+        fused.append(node_with_score)
+
+        logger.debug(
+            "Document from index #%d (%s): original_score=%.4f, weighted_score=%.4f",
+            i,
+            index_origin or index_id or "unknown",
+            original_scores[j],
+            weighted_scores[j],
+        )
+    return fused
+
+
+def hybrid_fusion(
+    results: dict[tuple[str, int], list[Any]],
+    hybrid_retrieval: Any,
+    index_weights: np.ndarray,
+    num_dense_retrievers: int,
+    index_metadata: Callable[[int], tuple[str, str]],
+) -> list[Any]:
+    """Fuse dense and sparse results by weighted reciprocal rank fusion.
+
+    Node at rank r (starting from 1) of a retriever gets
+    `weight / (rrf_k + r)` and nodes are ordered by the sum over all
+    retrievers. Nodes keep their weighted similarity scores, nodes
+    below the similarity cutoff are left out, as they would be cut
+    off from the context anyway. Duplicates with the same content are
+    left out too.
+    """
+    fused_nodes = {}
+    fused_scores: dict[str, float] = {}
+    for (_, i), nodes_with_scores in results.items():
+        index_id, index_origin = index_metadata(i)
+        index_weight = float(index_weights[i])
+        rank_weight = index_weight * (
+            hybrid_retrieval.dense_weight
+            if i < num_dense_retrievers
+            else hybrid_retrieval.sparse_weight
+        )
+        for rank, node_with_score in enumerate(nodes_with_scores, start=1):
+            weighted_score = (node_with_score.score or 0.0) * index_weight
+            if weighted_score < RAG_SIMILARITY_CUTOFF:
+                continue
+            node_id = node_with_score.node.node_id
+            fused_scores[node_id] = fused_scores.get(node_id, 0.0) + rank_weight / (
+                hybrid_retrieval.rrf_k + rank
+            )
+            if node_id not in fused_nodes:
+                node_with_score.node.metadata["index_id"] = index_id
+                node_with_score.node.metadata["index_origin"] = index_origin
+                node_with_score.score = weighted_score
+                fused_nodes[node_id] = node_with_score
+
+    # the same chunk in more indexes is kept just once, like in weighted fusion
+    nodes = list(fused_nodes.values())
+    scores = np.fromiter(
+        (fused_scores[node.node.node_id] for node in nodes),
+        dtype=np.float64,
+        count=len(nodes),
+    )
+    return [nodes[j] for j in select_top_nodes(nodes, scores, len(nodes))]
+
+
+def faiss_vector_ids(index: Any) -> dict[str, int]:
+    """Get FAISS vector IDs of nodes of vector index."""
+    return {
+        node_id: int(vector_id)
+        for vector_id, node_id in index.index_struct.nodes_dict.items()
+    }
+
+
+def embedding_similarities(
+    index: Any, vector_ids: list[int], query_embedding: list[float]
+) -> list[Optional[float]]:
+    """Get inner products of embeddings of indexed chunks and query."""
+    try:
+        vectors = index.vector_store.client.reconstruct_batch(
+            np.asarray(vector_ids, dtype=np.int64)
+        )
+    except RuntimeError as e:
+        # the type of FAISS index does not keep vectors
+        logger.warning("Chunks found by BM25 index can't be scored: %s", e)
+        return [None] * len(vector_ids)
+    return (vectors @ np.asarray(query_embedding, dtype=np.float32)).tolist()
+
+
+def retrieve_by_terms(
+    index: Any,
+    bm25_index: Any,
+    vector_ids: dict[str, int],
+    query_bundle: Any,
+    top_k: int,
+) -> list[Any]:
+    """Retrieve chunks of index matching query terms by BM25 index.
+
+    Chunks are ranked by BM25 scores, but they are scored by similarity
+    of their embeddings (taken from the FAISS index) to the query, like
+    chunks retrieved by vector retriever, so the scores are comparable
+    and the similarity cutoff applies to them.
+    """
+    matches = bm25_index.search(query_bundle.query_str, top_k)
+    if not matches:
+        return []
+    node_ids = [node_id for node_id, _ in matches]
+    query_embedding = query_bundle.embedding
+    if query_embedding is None:
+        query_embedding = embed_query(index._embed_model, query_bundle.embedding_strs)
+    similarities = embedding_similarities(
+        index, [vector_ids[node_id] for node_id in node_ids], query_embedding
+    )
+    return [
+        NodeWithScore(node=node, score=score)
+        for node, score in zip(index.docstore.get_nodes(node_ids), similarities)
+    ]
+
+
 # delay import of llama_index dependencies
 BaseIndex = Any
 BaseRetriever = Any
@@ -36,6 +449,7 @@ def load_llama_index_deps() -> None:
     global resolve_llm
     global FaissVectorStore
     global QueryFusionRetriever
+    global NodeWithScore
     from llama_index.core import (
         Settings,
         StorageContext,
@@ -45,6 +459,7 @@ def load_llama_index_deps() -> None:
     from llama_index.core.indices.base import BaseIndex
     from llama_index.core.llms.utils import resolve_llm
     from llama_index.core.retrievers import BaseRetriever, QueryFusionRetriever
+    from llama_index.core.schema import NodeWithScore
     from llama_index.vector_stores.faiss import FaissVectorStore
 
     # Set custom query fusion class to override existing normalized weighted score.
@@ -59,83 +474,339 @@ def load_llama_index_deps() -> None:
             # Extract custom parameters before passing to parent
             retriever_weights = kwargs.pop("retriever_weights", None)
             index_configs = kwargs.pop("index_configs", None)
+            index_generation = kwargs.pop("index_generation", None)
+            hybrid_retrieval = kwargs.pop("hybrid_retrieval", None)
+            # (index position, retriever) pairs of BM25 retrievers
+            sparse_retrievers = kwargs.pop("sparse_retrievers", None) or []
             retrievers = kwargs.get("retrievers", [])
+            kwargs["retrievers"], retriever_index_positions = combine_retrievers(
+                retrievers, sparse_retrievers
+            )
 
             super().__init__(**kwargs)
 
-            if not retriever_weights:
-                retriever_weights = [1.0] * len(retrievers)
-            self._custom_retriever_weights = retriever_weights
+            self._custom_retriever_weights = retriever_weights or [1.0] * len(
+                retrievers
+            )
             self._index_configs = index_configs
+            self.index_generation = index_generation
+            self._hybrid_retrieval = hybrid_retrieval
+            self._num_dense_retrievers = len(retrievers)
+            self._retriever_index_positions = retriever_index_positions
+
+        def _index_metadata(self, i):
+            """Get ID and origin of index searched by retriever #i."""
+            return index_metadata(
+                self._index_configs, self._retriever_index_positions, i
+            )
+
+        def get_nodes(self, nodes):
+            """Get nodes with given IDs and scores from document stores of indexes."""
+            return get_indexed_nodes(self._retrievers, self._index_metadata, nodes)
+
+        def _run_sync_queries(self, queries):
+            """Override internal method and query all retrievers concurrently."""
+            embed_queries(self._retrievers, queries)
+            return retrieve_concurrently(
+                self._retrievers, queries
+            ) or super()._run_sync_queries(queries)
+
+        def _index_weights(self):
+            """Get weight of scores of nodes retrieved by each retriever."""
+            # weighted_score = node_with_score.score * self._custom_retriever_weights[i]
+            # Uncomment above and delete below, if we decide weights to be set from config.
+            positions = np.asarray(self._retriever_index_positions, dtype=np.float64)
+            return 1 - np.minimum(positions, SCORE_DILUTION_DEPTH - 1) * (
+                SCORE_DILUTION_WEIGHT
+            )
 
         def _simple_fusion(self, results):
             """Override internal method and apply weighted score."""
             # Overriding one of the method is okay, we just need to add our custom logic.
+            if self._hybrid_retrieval is not None:
+                return hybrid_fusion(
+                    results,
+                    self._hybrid_retrieval,
+                    self._index_weights(),
+                    self._num_dense_retrievers,
+                    self._index_metadata,
+                )
+            return weighted_fusion(
+                results,
+                self._index_weights(),
+                self.similarity_top_k,
+                self._index_metadata,
+            )
 
-            # Note: Index with lower weight still may rank higher, if score gap is enough.
-            # Currently weights are calculated dynamic (until this becomes part of config)
-            # Current dynamic weights marginally penalize the score.
-            all_nodes = {}
-            for i, nodes_with_scores in enumerate(results.values()):
-                # Getting index metadata based on available index configs
-                index_id = ""
-                index_origin = ""
-                if self._index_configs and i < len(self._index_configs):
-                    index_config = self._index_configs[i]
-                    if index_config is not None:
-                        index_id = index_config.product_docs_index_id or ""
-                        index_origin = index_config.product_docs_origin or "default"
-
-                for j, node_with_score in enumerate(nodes_with_scores):
-                    # Add index metadata to node
-                    node_with_score.node.metadata["index_id"] = index_id
-                    node_with_score.node.metadata["index_origin"] = index_origin
-
-                    node_index_id = f"{i}_{j}"
-                    all_nodes[node_index_id] = node_with_score
-                    # weighted_score = node_with_score.score * self._custom_retriever_weights[i]
-                    # Uncomment above and delete below, if we decide weights to be set from config.
-                    original_score = node_with_score.score
-                    weighted_score = original_score * (
-                        1 - min(i, SCORE_DILUTION_DEPTH - 1) * SCORE_DILUTION_WEIGHT
-                    )
-                    all_nodes[node_index_id].score = weighted_score
+    global BM25Retriever  # pylint: disable=W0601
 
-                    logger.debug(
-                        "Document from index #%d (%s): original_score=%.4f, weighted_score=%.4f",
-                        i,
-                        index_origin or index_id or "unknown",
-                        original_score,
-                        weighted_score,
-                    )
+    class BM25Retriever(BaseRetriever):  # pylint: disable=W0612
+        """Retriever of chunks matching query terms by BM25 index."""
+
+        def __init__(self, index, bm25_index, similarity_top_k):
+            """Initialize retriever of chunks of given vector index."""
+            super().__init__()
+            self._index = index
+            self._bm25_index = bm25_index
+            self.similarity_top_k = similarity_top_k
+            self._docstore = index.docstore
+            self._embed_model = index._embed_model
+            self._vector_ids = faiss_vector_ids(index)
 
-            return sorted(
-                all_nodes.values(), key=lambda x: x.score or 0.0, reverse=True
+        def _retrieve(self, query_bundle):
+            """Retrieve nodes matching query terms."""
+            return retrieve_by_terms(
+                self._index,
+                self._bm25_index,
+                self._vector_ids,
+                query_bundle,
+                self.similarity_top_k,
             )
 
 
+def store_hidden_metadata(
+    docstore: Any, nodes: list[Any], key: str, values: list[Any]
+) -> None:
+    """Store metadata values of nodes, hidden from LLM and embedding model."""
+    for node, value in zip(nodes, values):
+        node.metadata[key] = value
+        for excluded_keys in (
+            node.excluded_embed_metadata_keys,
+            node.excluded_llm_metadata_keys,
+        ):
+            if key not in excluded_keys:
+                excluded_keys.append(key)
+    # document store keeps serialized nodes, so they need to be stored again
+    docstore.add_documents(nodes, allow_update=True)
+
+
+def attach_token_counts(index: BaseIndex) -> int:
+    """Store token counts of index chunks into their metadata.
+
+    Retrieved chunks are static, so they are tokenized just once, when the
+    index is loaded, and not for every query that retrieves them. Chunks
+    that already have the count stored (by the tool that built the index)
+    are kept as they are. The count is hidden from LLM and embedding model.
+
+    Returns:
+        Number of chunks with newly computed token count.
+    """
+    # pylint: disable=C0415
+    from ols.utils.token_handler import TokenHandler
+
+    docstore = index.docstore
+    nodes = [
+        node
+        for node in docstore.docs.values()
+        if RAG_CHUNK_TOKEN_COUNT_KEY not in node.metadata
+    ]
+    if not nodes:
+        return 0
+
+    counts = TokenHandler().chunk_token_counts([node.get_content() for node in nodes])
+    store_hidden_metadata(docstore, nodes, RAG_CHUNK_TOKEN_COUNT_KEY, counts)
+    return len(nodes)
+
+
+def attach_simhashes(index: BaseIndex) -> int:
+    """Store SimHash signatures of index chunks into their metadata.
+
+    Signatures are used to leave near-duplicate chunks out of the RAG
+    context, so they are computed once, when the index is loaded. Like
+    token counts, signatures already stored in the index are kept and they
+    are hidden from LLM and embedding model.
+
+    Returns:
+        Number of chunks with newly computed signature.
+    """
+    # pylint: disable=C0415
+    from ols.src.rag_index.near_duplicates import simhash
+
+    docstore = index.docstore
+    nodes = [
+        node
+        for node in docstore.docs.values()
+        if RAG_CHUNK_SIMHASH_KEY not in node.metadata
+    ]
+    if not nodes:
+        return 0
+
+    signatures = [simhash(node.get_content()) for node in nodes]
+    store_hidden_metadata(docstore, nodes, RAG_CHUNK_SIMHASH_KEY, signatures)
+    return len(nodes)
+
+
+def load_vector_store(persist_dir: str, memory_map: bool = False) -> Any:
+    """Load FAISS vector store from index directory.
+
+    Memory mapped index is not read into the process memory. Its pages are
+    loaded by the OS when they are searched and they are shared by all
+    processes that map the same file, so the vectors are held in memory
+    just once no matter how many workers serve the requests. The index is
+    mapped read-only, as it is never modified by the service.
+    """
+    if not memory_map:
+        return FaissVectorStore.from_persist_dir(persist_dir)
+
+    import faiss  # pylint: disable=C0415
+
+    persist_path = os.path.join(persist_dir, RAG_INDEX_VECTOR_STORE_FILE)
+    flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+    # flat indexes (the ones built by our tooling) are memory mapped only by
+    # FAISS versions that have this flag, older ones read them into memory
+    flags |= getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+    logger.info("Memory mapping FAISS index %s", persist_path)
+    return FaissVectorStore(faiss_index=faiss.read_index(persist_path, flags))
+
+
+def onnx_model_kwargs(reference_content: ReferenceContent) -> dict[str, Any]:
+    """Get arguments of ONNX Runtime session running the embedding model.
+
+    Session runs (usually int8 quantized) export of the same model, so its
+    embeddings are compatible with the indexes. Number of threads is fixed,
+    so workers do not compete for all CPUs to embed a single query.
+    """
+    import onnxruntime  # pylint: disable=C0415
+
+    session_options = onnxruntime.SessionOptions()
+    session_options.intra_op_num_threads = reference_content.embeddings_onnx_threads
+    session_options.inter_op_num_threads = 1
+    logger.info(
+        "Using ONNX export %s of embedding model with %d threads",
+        reference_content.embeddings_onnx_file,
+        reference_content.embeddings_onnx_threads,
+    )
+    return {
+        "file_name": reference_content.embeddings_onnx_file,
+        "provider": "CPUExecutionProvider",
+        "session_options": session_options,
+    }
+
+
+def embeddings_agreement(
+    embed_model: Any, other_embed_model: Any, texts: list[str]
+) -> float:
+    """Get the lowest cosine similarity of embeddings of texts by two models.
+
+    Used to check that embeddings by other backend (or export) of the model
+    can be searched in indexes built with the original model.
+    """
+    embeddings = np.asarray(embed_model.get_text_embedding_batch(texts))
+    other_embeddings = np.asarray(other_embed_model.get_text_embedding_batch(texts))
+    similarities = np.sum(embeddings * other_embeddings, axis=1) / (
+        np.linalg.norm(embeddings, axis=1) * np.linalg.norm(other_embeddings, axis=1)
+    )
+    return float(similarities.min())
+
+
+def index_fingerprint(persist_dir: str) -> Optional[tuple]:
+    """Get names, sizes and modification times of files of index directory.
+
+    BM25 index stored into the directory by the service itself is left out.
+
+    Returns:
+        Fingerprint that changes with the index, None when the directory
+        can't be read.
+    """
+    files = []
+    try:
+        with os.scandir(persist_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and not entry.name.startswith(RAG_INDEX_BM25_FILE):
+                    stat = entry.stat()
+                    files.append((entry.name, stat.st_size, stat.st_mtime_ns))
+    except OSError:
+        return None
+    return tuple(sorted(files))
+
+
+def watch_indexes(
+    loader_ref: weakref.ref, interval: float, stop_watching: threading.Event
+) -> None:
+    """Reload indexes whose directories have changed, every interval seconds.
+
+    Loader is referenced weakly, so watching stops when the loader is not
+    used anymore (e.g. configuration has been reloaded).
+    """
+    while not stop_watching.wait(interval):
+        loader = loader_ref()
+        if loader is None:
+            return
+        try:
+            changed = loader.changed_indexes()
+            if changed:
+                logger.info("Directories of indexes %s have changed.", changed)
+                loader.reload_indexes(changed)
+        except Exception as err:
+            logger.exception("Reloading of changed indexes failed: %s", err)
+        del loader
+
+
 class IndexLoader:
-    """Load index from local file storage."""
+    """Load index from local file storage.
+
+    Configured indexes are loaded concurrently. When `ready_on_primary_index`
+    is set, the loader is constructed as soon as the primary (first) index
+    is loaded and the remaining indexes are added when they are loaded in
+    the background.
+
+    Indexes can be loaded again while the service is running, either on
+    request or when their directories change. The new generation of indexes
+    replaces the current one at once; requests that already got a retriever
+    finish with the previous generation, which is released when the last
+    of them is done.
+    """
 
     def __init__(self, index_config: Optional[ReferenceContent]) -> None:
         """Initialize loader."""
         load_llama_index_deps()
         self._indexes = None
+        self._loaded_indexes: dict[int, BaseIndex] = {}
         self._retriever = None
         self._loaded_index_configs = None
+        self._index_generation = None
+        self._index_states: list[IndexLoadState] = []
+        # BM25 indexes used by hybrid retrieval, keyed by ID of vector index
+        self._bm25_indexes: dict[int, Any] = {}
+        self._lock = threading.Lock()
+        self._loading_finished = threading.Event()
+        self._reload_lock = threading.Lock()
+        self._index_fingerprints: dict[int, Optional[tuple]] = {}
+        self._changed_fingerprints: dict[int, tuple] = {}
+        self._stop_watching = threading.Event()
 
         self._index_config = index_config
         logger.debug("Config used for index load: %s", str(self._index_config))
 
         if self._index_config is None:
             logger.warning("Config for reference content is not set.")
+            self._loading_finished.set()
         elif self._index_config.indexes is None or len(self._index_config.indexes) == 0:
             logger.warning("Indexes are not set in the config for reference content.")
+            self._loading_finished.set()
         else:
 
             self._embed_model_path = self._index_config.embeddings_model_path
             self._embed_model = self._get_embed_model()
+            # fingerprints are taken before loading, so changes made while
+            # the indexes are being loaded are picked up
+            self._index_fingerprints = {
+                i: index_fingerprint(index_config.product_docs_index_path)
+                for i, index_config in enumerate(self._index_config.indexes)
+                if index_config.product_docs_index_path is not None
+            }
             self._load_index()
+            if self._index_config.index_reload_interval > 0:
+                threading.Thread(
+                    target=watch_indexes,
+                    args=(
+                        weakref.ref(self),
+                        self._index_config.index_reload_interval,
+                        self._stop_watching,
+                    ),
+                    name="index-watcher",
+                    daemon=True,
+                ).start()
 
     def _get_embed_model(self) -> Any:
         """Get embed model according to configuration."""
@@ -146,6 +817,12 @@ class IndexLoader:
             logger.debug(
                 "Loading embedding model info from path %s", self._embed_model_path
             )
+            if self._index_config.embeddings_backend == EmbeddingsBackend.ONNX:
+                return HuggingFaceEmbedding(
+                    model_name=self._embed_model_path,
+                    backend=EmbeddingsBackend.ONNX.value,
+                    model_kwargs=onnx_model_kwargs(self._index_config),
+                )
             return HuggingFaceEmbedding(model_name=self._embed_model_path)
 
         logger.warning("Embedding model path is not set.")
@@ -153,60 +830,274 @@ class IndexLoader:
         return "local:sentence-transformers/all-mpnet-base-v2"
 
     def _load_index(self) -> None:
-        """Load vector index."""
+        """Load vector indexes in a pool of threads."""
         logger.debug("Using %s as embedding model for index", str(self._embed_model))
         logger.info("Setting up settings for index load...")
         Settings.embed_model = self._embed_model
         Settings.llm = resolve_llm(None)
 
-        indexes = []
-        loaded_configs = []
-        for i, index_config in enumerate(self._index_config.indexes):
-            if index_config.product_docs_index_path is None:
+        index_configs = self._index_config.indexes
+        self._index_states = [
+            (
+                IndexLoadState.SKIPPED
+                if index_config.product_docs_index_path is None
+                else IndexLoadState.LOADING
+            )
+            for index_config in index_configs
+        ]
+        to_load = []
+        for i, state in enumerate(self._index_states):
+            if state == IndexLoadState.SKIPPED:
                 logger.warning("Index path is not set for index #%d, skip loading.", i)
-                continue
+            else:
+                to_load.append(i)
+        if not to_load:
+            self._finish_loading({})
+            return
+
+        executor = ThreadPoolExecutor(
+            max_workers=min(self._index_config.index_load_workers, len(to_load)),
+            thread_name_prefix="index-loader",
+        )
+        futures = {
+            i: executor.submit(self._load_single_index, i, index_configs[i])
+            for i in to_load
+        }
+        # already submitted loads are finished even after shutdown
+        executor.shutdown(wait=False)
+
+        primary = to_load[0]
+        if (
+            self._index_config.ready_on_primary_index
+            and len(to_load) > 1
+            and futures[primary].result() is not None
+        ):
+            self._publish_indexes({primary: futures[primary].result()})
+            logger.info(
+                "Primary index #%d is loaded, remaining indexes are loading.", primary
+            )
+            threading.Thread(
+                target=self._finish_loading, args=(futures,), daemon=True
+            ).start()
+        else:
+            self._finish_loading(futures)
+
+    def _load_single_index(
+        self, i: int, index_config: ReferenceContentIndex
+    ) -> Optional[BaseIndex]:
+        """Load one vector index, return None when it can't be loaded."""
+        try:
+            index = self._read_index(i, index_config)
+        except Exception as err:
+            logger.exception("Error loading vector index #%d:\n%s, skipped.", i, err)
+            self._index_states[i] = IndexLoadState.FAILED
+            return None
+        self._index_states[i] = IndexLoadState.LOADED
+        return index
+
+    def _read_index(self, i: int, index_config: ReferenceContentIndex) -> BaseIndex:
+        """Read vector index from its directory and prepare it for retrieval."""
+        logger.info("Setting up storage context for index #%d...", i)
+        storage_context = StorageContext.from_defaults(
+            vector_store=load_vector_store(
+                index_config.product_docs_index_path,
+                self._index_config.memory_map_indexes,
+            ),
+            persist_dir=index_config.product_docs_index_path,
+        )
+        logger.info(
+            "Loading vector index #%d%s...",
+            i,
+            (
+                f" from {index_config.product_docs_origin}"
+                if index_config.product_docs_origin
+                else ""
+            ),
+        )
+        index = load_index_from_storage(
+            storage_context=storage_context,
+            index_id=index_config.product_docs_index_id,
+        )
+        logger.info("Vector index #%d is loaded.", i)
+        try:
+            count = attach_token_counts(index)
+            logger.info("Token counts computed for %d chunks of index #%d.", count, i)
+        except Exception as err:
+            # index is still usable, chunks will be tokenized on retrieval
+            logger.warning("Token counts not computed for index #%d: %s", i, err)
+        if self._index_config.deduplicate_chunks:
             try:
-                # pylint: disable=W0201
-                logger.info("Setting up storage context for index #%d...", i)
-                storage_context = StorageContext.from_defaults(
-                    vector_store=FaissVectorStore.from_persist_dir(
-                        index_config.product_docs_index_path
-                    ),
-                    persist_dir=index_config.product_docs_index_path,
-                )
-                logger.info(
-                    "Loading vector index #%d%s...",
-                    i,
-                    (
-                        f" from {index_config.product_docs_origin}"
-                        if index_config.product_docs_origin
-                        else ""
-                    ),
-                )
-                index = load_index_from_storage(
-                    storage_context=storage_context,
-                    index_id=index_config.product_docs_index_id,
-                )
-                indexes.append(index)
-                loaded_configs.append(index_config)
-                logger.info("Vector index #%d is loaded.", i)
+                count = attach_simhashes(index)
+                logger.info("Signatures computed for %d chunks of index #%d.", count, i)
             except Exception as err:
-                logger.exception(
-                    "Error loading vector index #%d:\n%s, skipped.", i, err
-                )
-        if len(indexes) == 0:
-            logger.warning("No indexes are loaded.")
-            self._loaded_index_configs = loaded_configs
+                # index is still usable, its chunks are just not deduplicated
+                logger.warning("Signatures not computed for index #%d: %s", i, err)
+        if self._index_config.hybrid_retrieval is not None:
+            self._load_bm25_index(i, index, index_config)
+        return index
+
+    def _load_bm25_index(
+        self, i: int, index: BaseIndex, index_config: ReferenceContentIndex
+    ) -> None:
+        """Load BM25 index of chunks of vector index, stored next to it."""
+        # pylint: disable=C0415
+        from ols.src.rag_index.bm25_index import load_bm25_index
+
+        try:
+            bm25_index = load_bm25_index(
+                {
+                    node_id: node.get_content()
+                    for node_id, node in index.docstore.docs.items()
+                },
+                os.path.join(index_config.product_docs_index_path, RAG_INDEX_BM25_FILE),
+            )
+        except Exception as err:
+            # vector index is still usable by dense retrieval
+            logger.warning("BM25 index not loaded for index #%d: %s", i, err)
             return
-        if len(indexes) < len(self._index_config.indexes):
+        with self._lock:
+            self._bm25_indexes[id(index)] = bm25_index
+
+    def _finish_loading(self, futures: dict[int, Future]) -> None:
+        """Wait for all indexes and publish them in the configured order."""
+        index_configs = self._index_config.indexes
+        loaded = {}
+        for i, future in futures.items():
+            index = future.result()
+            if index is not None:
+                loaded[i] = index
+        if len(loaded) == 0:
+            logger.warning("No indexes are loaded.")
+        elif len(loaded) < len(index_configs):
             logger.warning(
                 "Some indexes are not loaded. "
                 "Check the logs for details about the errors."
             )
         else:
             logger.info("All indexes are loaded.")
-        self._indexes = indexes
-        self._loaded_index_configs = loaded_configs
+        self._publish_indexes(loaded)
+        self._loading_finished.set()
+
+    def _publish_indexes(self, loaded: dict[int, BaseIndex]) -> None:
+        """Make loaded indexes (keyed by their positions) available for retrieval."""
+        positions = sorted(loaded)
+        with self._lock:
+            self._loaded_indexes = dict(loaded)
+            self._indexes = [loaded[i] for i in positions] or None
+            self._loaded_index_configs = [
+                self._index_config.indexes[i] for i in positions
+            ]
+            self._index_generation = next(_index_generations)
+            # retriever has to be created again for the new set of indexes
+            self._retriever = None
+        # results retrieved from previous indexes are not used anymore
+        retrieval_cache.clear()
+
+    def reload_indexes(self, positions: Optional[list[int]] = None) -> bool:
+        """Load indexes again and replace the ones used for retrieval.
+
+        Only indexes at given positions (all indexes by default) are loaded
+        again, the other ones are kept. Index that can't be loaded keeps its
+        previous version.
+
+        Returns:
+            True if the reloaded indexes are used for retrieval.
+        """
+        if self._index_config is None or not self._index_config.indexes:
+            return False
+        index_configs = self._index_config.indexes
+        if positions is None:
+            positions = list(self._index_fingerprints)
+        positions = [
+            i for i in positions if index_configs[i].product_docs_index_path is not None
+        ]
+        if not positions:
+            return False
+
+        with self._reload_lock:
+            # indexes being loaded for the first time would be published later
+            self._loading_finished.wait()
+            logger.info("Reloading indexes %s...", positions)
+            # fingerprints are taken before loading, so changes made while
+            # the indexes are being loaded are picked up
+            fingerprints = {
+                i: index_fingerprint(index_configs[i].product_docs_index_path)
+                for i in positions
+            }
+            with ThreadPoolExecutor(
+                max_workers=min(self._index_config.index_load_workers, len(positions)),
+                thread_name_prefix="index-reloader",
+            ) as executor:
+                futures = {
+                    i: executor.submit(self._read_index, i, index_configs[i])
+                    for i in positions
+                }
+            reloaded = {}
+            for i, future in futures.items():
+                try:
+                    reloaded[i] = future.result()
+                except Exception as err:
+                    logger.exception(
+                        "Error reloading vector index #%d:\n%s, previous version kept.",
+                        i,
+                        err,
+                    )
+            if not reloaded:
+                return False
+
+            with self._lock:
+                loaded = dict(self._loaded_indexes)
+            replaced = [loaded[i] for i in reloaded if i in loaded]
+            loaded.update(reloaded)
+            for i in reloaded:
+                self._index_states[i] = IndexLoadState.LOADED
+                # indexes that failed to load keep previous fingerprints, so
+                # they are reported as changed again
+                self._index_fingerprints[i] = fingerprints[i]
+                self._changed_fingerprints.pop(i, None)
+            self._publish_indexes(loaded)
+            with self._lock:
+                for index in replaced:
+                    self._bm25_indexes.pop(id(index), None)
+            for index in replaced:
+                # memory is released when no retriever uses the index anymore
+                weakref.finalize(index, logger.info, "Previous index is released.")
+            logger.info(
+                "Indexes %s are reloaded, index generation %d is used.",
+                sorted(reloaded),
+                self._index_generation,
+            )
+            return True
+
+    def changed_indexes(self) -> list[int]:
+        """Get positions of indexes whose directories have changed.
+
+        Change is reported once the directory has been the same for two
+        checks in a row, so indexes that are still being copied are not
+        reported. Change is reported on every check until the index is
+        reloaded successfully.
+        """
+        changed = []
+        for i, fingerprint in self._index_fingerprints.items():
+            current = index_fingerprint(
+                self._index_config.indexes[i].product_docs_index_path
+            )
+            if current is None or current == fingerprint:
+                self._changed_fingerprints.pop(i, None)
+            elif self._changed_fingerprints.get(i) == current:
+                changed.append(i)
+            else:
+                self._changed_fingerprints[i] = current
+        return changed
+
+    def stop_watching(self) -> None:
+        """Stop reloading indexes whose directories change."""
+        self._stop_watching.set()
+
+    @property
+    def index_states(self) -> list[IndexLoadState]:
+        """Get loading state of each configured index."""
+        return list(self._index_states)
 
     @property
     def vector_indexes(self) -> Optional[list[BaseIndex]]:
@@ -218,44 +1109,72 @@ class IndexLoader:
             )
         return self._indexes
 
-    def get_retriever(
-        self, similarity_top_k=RAG_CONTENT_LIMIT
-    ) -> Optional[BaseRetriever]:
-        """Get QueryFusionRetriever from indexes."""
-        if self._indexes is None:
+    def get_retriever(self, similarity_top_k=None) -> Optional[BaseRetriever]:
+        """Get QueryFusionRetriever from indexes.
+
+        By default, the number of retrieved nodes is the number of nodes
+        reranked by the configured reranker, or `RAG_CONTENT_LIMIT`.
+        """
+        if similarity_top_k is None:
+            reranker_config = (
+                self._index_config.reranker if self._index_config else None
+            )
+            similarity_top_k = (
+                reranker_config.top_n if reranker_config else RAG_CONTENT_LIMIT
+            )
+        with self._lock:
+            indexes = self._indexes
+            loaded_index_configs = self._loaded_index_configs
+            index_generation = self._index_generation
+            retriever = self._retriever
+        if indexes is None:
             logger.error("Cannot get retriever. Indexes are not loaded or empty.")
             return None
-        if (
-            self._retriever is not None
-            and self._retriever.similarity_top_k == similarity_top_k
-        ):
-            return self._retriever
+        if retriever is not None and retriever.similarity_top_k == similarity_top_k:
+            return retriever
 
         # Log index information
         index_info = [
             f"{i}: {cfg.product_docs_origin or cfg.product_docs_index_id or 'unknown'}"
-            for i, cfg in enumerate(self._loaded_index_configs or [])
+            for i, cfg in enumerate(loaded_index_configs or [])
         ]
         logger.info(
             "Creating retriever for %d indexes (similarity_top_k=%d): %s",
-            len(self._indexes),
+            len(indexes),
             similarity_top_k,
             index_info,
         )
 
+        hybrid_retrieval = self._index_config.hybrid_retrieval
+        sparse_retrievers = []
+        if hybrid_retrieval is not None:
+            with self._lock:
+                bm25_indexes = [self._bm25_indexes.get(id(index)) for index in indexes]
+            sparse_retrievers = [
+                (i, BM25Retriever(index, bm25_index, similarity_top_k))
+                for i, (index, bm25_index) in enumerate(zip(indexes, bm25_indexes))
+                if bm25_index is not None
+            ]
+
         # Note: we are using a custom retriever, based on our need
         retriever = QueryFusionRetrieverCustom(
             retrievers=[
                 index.as_retriever(similarity_top_k=similarity_top_k)
-                for index in self._indexes
+                for index in indexes
             ],
             similarity_top_k=similarity_top_k,
             retriever_weights=None,  # Setting as None, until this gets added to config
-            index_configs=self._loaded_index_configs,
+            index_configs=loaded_index_configs,
+            index_generation=index_generation,
+            hybrid_retrieval=hybrid_retrieval,
+            sparse_retrievers=sparse_retrievers,
             mode="simple",  # Don't modify this as we are adding our own logic
             num_queries=1,  # set this to 1 to disable query generation
             use_async=False,
             verbose=False,
         )
-        self._retriever = retriever
-        return self._retriever
+        with self._lock:
+            # indexes might have been published meanwhile
+            if self._indexes is indexes:
+                self._retriever = retriever
+        return retriever
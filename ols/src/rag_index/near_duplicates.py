@@ -0,0 +1,80 @@
+"""Detection of near-duplicate RAG chunks by SimHash signatures."""
+
+import hashlib
+import logging
+import re
+from functools import lru_cache
+
+import numpy as np
+from llama_index.core.schema import NodeWithScore
+
+from ols.constants import RAG_CHUNK_SIMHASH_KEY, RAG_NEAR_DUPLICATE_MAX_DISTANCE
+
+logger = logging.getLogger(__name__)
+
+# multipliers combining hashes of words into hash of shingle and finalizer
+# constant mixing its bits (from splitmix64)
+_SHINGLE_MULTIPLIERS = (np.uint64(0x9E3779B97F4A7C15), np.uint64(0xC2B2AE3D27D4EB4F))
+_MIX_MULTIPLIER = np.uint64(0x94D049BB133111EB)
+
+
+@lru_cache(maxsize=2**16)
+def _word_hash(word: str) -> int:
+    """Get stable 64-bit hash of word."""
+    digest = hashlib.blake2b(word.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def simhash(text: str) -> int:
+    """Compute 64-bit SimHash signature of text.
+
+    Signature is computed from hashes of all 3-word shingles of the text,
+    so texts differing in a few words have signatures differing in a few
+    bits, while signatures of unrelated texts differ in about half of them.
+    """
+    words = re.findall(r"\w+", text.lower())
+    if not words:
+        return 0
+    hashes = np.fromiter(
+        (_word_hash(word) for word in words), dtype=np.uint64, count=len(words)
+    )
+    if len(hashes) >= 3:
+        first, second = _SHINGLE_MULTIPLIERS
+        hashes = hashes[:-2] * first + hashes[1:-1] * second + hashes[2:]
+        hashes ^= hashes >> np.uint64(31)
+        hashes *= _MIX_MULTIPLIER
+        hashes ^= hashes >> np.uint64(29)
+    bits = np.unpackbits(hashes.view(np.uint8)).reshape(-1, 64)
+    majority = bits.sum(axis=0) * 2 > len(hashes)
+    return int.from_bytes(np.packbits(majority).tobytes(), "big")
+
+
+def suppress_near_duplicates(
+    retrieved_nodes: list[NodeWithScore],
+    max_distance: int = RAG_NEAR_DUPLICATE_MAX_DISTANCE,
+) -> list[NodeWithScore]:
+    """Leave out nodes that are near-duplicates of better ranked nodes.
+
+    Nodes are near-duplicates when their SimHash signatures (computed when
+    the index is loaded) differ in at most `max_distance` bits. Nodes are
+    ordered from the most relevant, so the highest-scored copy is kept.
+    Nodes without signature are always kept.
+    """
+    kept_nodes = []
+    kept_signatures: list[int] = []
+    for node in retrieved_nodes:
+        signature = node.metadata.get(RAG_CHUNK_SIMHASH_KEY)
+        if signature is not None:
+            if any(
+                (signature ^ kept).bit_count() <= max_distance
+                for kept in kept_signatures
+            ):
+                logger.debug(
+                    "Document '%s' (index: %s) left out as near-duplicate",
+                    node.metadata.get("title", "unknown"),
+                    node.metadata.get("index_origin", "unknown"),
+                )
+                continue
+            kept_signatures.append(signature)
+        kept_nodes.append(node)
+    return kept_nodes
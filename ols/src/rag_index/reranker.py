@@ -0,0 +1,188 @@
+"""Reranking of retrieved chunks by cross-encoder model."""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Optional
+
+from llama_index.core.schema import NodeWithScore
+
+from ols.app.models.config import RerankerConfig
+from ols.constants import RAG_SIMILARITY_CUTOFF, RERANKER_MAX_WORKERS
+
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """Rerank retrieved chunks by relevance to query scored by cross-encoder.
+
+    Cross-encoder scores the query together with each chunk, which is more
+    precise than similarity of their embeddings, so fewer chunks need to be
+    retrieved to get the relevant ones. All candidates are scored in one
+    batch. When the model can't be loaded, or scoring does not finish in the
+    time budget or fails, chunks keep their original order.
+    """
+
+    def __init__(self, reranker_config: RerankerConfig) -> None:
+        """Initialize reranker, model is loaded on first use."""
+        self.config = reranker_config
+        self._lock = threading.Lock()
+        self._model: Any = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=RERANKER_MAX_WORKERS, thread_name_prefix="reranker"
+        )
+        # scoring that timed out keeps running, so the number of queries
+        # being scored is limited to not queue them behind slow ones
+        self._scoring_lock = threading.Lock()
+        self._scoring = 0
+
+    def _get_model(self) -> Any:
+        """Load cross-encoder model according to configuration."""
+        with self._lock:
+            if self._model is None:
+                # pylint: disable=C0415
+                from sentence_transformers import CrossEncoder
+
+                logger.info(
+                    "Loading reranker model from path %s", self.config.model_path
+                )
+                if self.config.onnx_file is None:
+                    self._model = CrossEncoder(self.config.model_path)
+                else:
+                    import onnxruntime
+
+                    session_options = onnxruntime.SessionOptions()
+                    session_options.intra_op_num_threads = self.config.onnx_threads
+                    session_options.inter_op_num_threads = 1
+                    self._model = CrossEncoder(
+                        self.config.model_path,
+                        backend="onnx",
+                        model_kwargs={
+                            "file_name": self.config.onnx_file,
+                            "provider": "CPUExecutionProvider",
+                            "session_options": session_options,
+                        },
+                    )
+            return self._model
+
+    def _reserve_slot(self) -> bool:
+        """Reserve slot for scoring, False when all slots are used."""
+        with self._scoring_lock:
+            if self._scoring >= RERANKER_MAX_WORKERS:
+                return False
+            self._scoring += 1
+            return True
+
+    def _release_slot(self) -> None:
+        """Release slot reserved for scoring."""
+        with self._scoring_lock:
+            self._scoring -= 1
+
+    def shutdown(self) -> None:
+        """Stop accepting new queries, scoring in progress is left to finish."""
+        self._executor.shutdown(wait=False)
+
+    def _score(self, model: Any, query: str, texts: list[str]) -> list[float]:
+        """Score relevance of texts to query in one batch."""
+        scores = model.predict(
+            [(query, text) for text in texts],
+            batch_size=len(texts),
+            show_progress_bar=False,
+        )
+        return [float(score) for score in scores]
+
+    def _relevance_scores(
+        self, query: str, candidates: list[NodeWithScore]
+    ) -> Optional[list[float]]:
+        """Score relevance of candidates to query in the time budget.
+
+        Returns:
+            Scores of candidates, or None when they can't be scored.
+        """
+        try:
+            # model is loaded outside of the time budget
+            model = self._get_model()
+        except Exception as e:
+            logger.error(
+                "Loading reranker model failed, keeping original order of documents: %s",
+                e,
+            )
+            return None
+        if not self._reserve_slot():
+            logger.warning("Reranker is busy, keeping original order of documents")
+            return None
+        try:
+            future = self._executor.submit(
+                self._score, model, query, [node.get_content() for node in candidates]
+            )
+        except RuntimeError as e:
+            # reranker has been shut down, as the configuration was reloaded
+            self._release_slot()
+            logger.warning("Reranker is shut down, keeping original order: %s", e)
+            return None
+        future.add_done_callback(lambda _: self._release_slot())
+        try:
+            return future.result(timeout=self.config.timeout)
+        except FutureTimeoutError:
+            logger.warning(
+                "Reranking exceeded %.2f seconds, keeping original order of documents",
+                self.config.timeout,
+            )
+        except Exception as e:
+            logger.error("Reranking failed, keeping original order of documents: %s", e)
+        return None
+
+    def rerank(
+        self, query: str, retrieved_nodes: list[NodeWithScore]
+    ) -> tuple[list[NodeWithScore], bool]:
+        """Return `top_k` nodes most relevant to query.
+
+        Only the first `top_n` nodes that pass the similarity cutoff are
+        reranked; nodes keep their similarity scores, so the cutoff can be
+        applied to them again.
+
+        Returns:
+            Nodes, and False when they keep the original order only because
+            they could not be scored (overload, timeout or failure).
+        """
+        candidates = []
+        for node in retrieved_nodes[: self.config.top_n]:
+            if node.get_score(raise_error=False) < RAG_SIMILARITY_CUTOFF:
+                break
+            candidates.append(node)
+        if len(candidates) <= 1:
+            return retrieved_nodes[: self.config.top_k], True
+
+        scores = self._relevance_scores(query, candidates)
+        if scores is None:
+            return retrieved_nodes[: self.config.top_k], False
+
+        ranked = sorted(range(len(candidates)), key=lambda i: scores[i], reverse=True)
+        for rank, i in enumerate(ranked[: self.config.top_k]):
+            logger.debug(
+                "Reranked doc #%d: was #%d, relevance=%.4f", rank + 1, i + 1, scores[i]
+            )
+        return [candidates[i] for i in ranked[: self.config.top_k]], True
+
+
+_rerankers: dict[int, CrossEncoderReranker] = {}
+_rerankers_lock = threading.Lock()
+
+
+def get_reranker(
+    reranker_config: Optional[RerankerConfig],
+) -> Optional[CrossEncoderReranker]:
+    """Return reranker shared by all requests, None when reranking is disabled."""
+    if reranker_config is None:
+        return None
+    with _rerankers_lock:
+        reranker = _rerankers.get(id(reranker_config))
+        if reranker is None or reranker.config is not reranker_config:
+            # configuration has been reloaded
+            for replaced_reranker in _rerankers.values():
+                replaced_reranker.shutdown()
+            _rerankers.clear()
+            reranker = CrossEncoderReranker(reranker_config)
+            _rerankers[id(reranker_config)] = reranker
+        return reranker
@@ -0,0 +1,92 @@
+"""Cache of results of retrieval from RAG indexes."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from prometheus_client import Counter
+
+from ols.constants import RAG_RETRIEVAL_CACHE_MAX_ENTRIES, RAG_RETRIEVAL_CACHE_TTL
+
+# Metrics are defined here and not in ols.app.metrics, because the metrics
+# module depends on the application configuration that imports the index
+# loader using this module. They are exposed by the /metrics endpoint all
+# the same.
+rag_retrieval_cache_hits_total = Counter(
+    "ols_rag_retrieval_cache_hits_total",
+    "Queries answered by cached retrieval results",
+)
+rag_retrieval_cache_misses_total = Counter(
+    "ols_rag_retrieval_cache_misses_total",
+    "Queries that needed retrieval from indexes",
+)
+
+
+def normalize_query(query: str) -> str:
+    """Normalize letter case and whitespace of query."""
+    return " ".join(query.casefold().split())
+
+
+class RetrievalCache:
+    """Thread-safe LRU cache of retrieval results with limited lifetime.
+
+    Only IDs and scores of retrieved nodes are stored; the nodes are taken
+    from the index again. Results are keyed by normalized query, number of
+    retrieved nodes and generation of indexes, so results retrieved from
+    previously loaded indexes are never used.
+    """
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        """Initialize empty cache."""
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._results: OrderedDict[
+            tuple[str, int, int], tuple[float, list[tuple[str, float]]]
+        ] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of cached results."""
+        return len(self._results)
+
+    @staticmethod
+    def key(query: str, retriever: Any) -> Optional[tuple[str, int, int]]:
+        """Construct cache key, or None when results of retriever can't be cached."""
+        index_generation = getattr(retriever, "index_generation", None)
+        if index_generation is None:
+            return None
+        return normalize_query(query), retriever.similarity_top_k, index_generation
+
+    def get(self, key: tuple[str, int, int]) -> Optional[list[tuple[str, float]]]:
+        """Return IDs and scores of cached nodes, or None when not cached."""
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None:
+                return None
+            expires_at, nodes = entry
+            if expires_at <= time.monotonic():
+                del self._results[key]
+                return None
+            self._results.move_to_end(key)
+            return nodes
+
+    def put(self, key: tuple[str, int, int], nodes: list[tuple[str, float]]) -> None:
+        """Store IDs and scores of nodes, evicting the least recently used ones."""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._results[key] = (time.monotonic() + self.ttl, nodes)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached results."""
+        with self._lock:
+            self._results.clear()
+
+
+retrieval_cache = RetrievalCache(
+    RAG_RETRIEVAL_CACHE_TTL, RAG_RETRIEVAL_CACHE_MAX_ENTRIES
+)
@@ -0,0 +1,201 @@
+"""Selection of tools relevant to query using hybrid (dense + sparse) retrieval."""
+
+import logging
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+from langchain_core.tools.structured import StructuredTool
+
+from ols import constants
+from ols.app.models.config import ToolFilteringConfig
+from ols.src.rag_index.bm25_index import BM25Index
+
+logger = logging.getLogger(__name__)
+
+
+def tool_document(tool: StructuredTool) -> str:
+    """Return text describing the tool that is used for retrieval."""
+    return f"{tool.name}\n{tool.description or ''}"
+
+
+def normalize(vector: list[float]) -> list[float]:
+    """Scale vector to unit length."""
+    norm = math.sqrt(sum(x * x for x in vector))
+    if norm == 0:
+        return vector
+    return [x / norm for x in vector]
+
+
+class ToolRetriever:
+    """Hybrid retriever over one catalog of tools.
+
+    Dense (cosine similarity of embeddings) and sparse (BM25) scores are
+    both scaled to <0, 1> and combined as
+    `alpha * dense + (1 - alpha) * sparse`.
+    """
+
+    def __init__(
+        self,
+        tools: list[StructuredTool],
+        filtering_config: ToolFilteringConfig,
+        embeddings: Optional[list[list[float]]] = None,
+    ) -> None:
+        """Build sparse index over tools, dense embeddings are optional."""
+        self.tools = tools
+        self.config = filtering_config
+        # tool names are split into terms on underscores
+        self._bm25 = BM25Index.build(
+            {str(i): tool_document(tool) for i, tool in enumerate(tools)},
+            k1=constants.TOOL_FILTERING_BM25_K1,
+            b=constants.TOOL_FILTERING_BM25_B,
+        )
+        self._embeddings = embeddings
+
+    def retrieve(
+        self, query: str, query_embedding: Optional[list[float]] = None
+    ) -> list[StructuredTool]:
+        """Return at most top_k tools relevant to query, the most relevant first."""
+        sparse = [float(score) for score in self._bm25.scores(query)]
+        max_sparse = max(sparse, default=0.0)
+        if max_sparse > 0:
+            sparse = [score / max_sparse for score in sparse]
+
+        if self._embeddings is None or query_embedding is None:
+            scores = sparse
+        else:
+            alpha = self.config.alpha
+            scores = [
+                alpha * max(0.0, sum(q * t for q, t in zip(query_embedding, tool)))
+                + (1 - alpha) * sparse_score
+                for tool, sparse_score in zip(self._embeddings, sparse)
+            ]
+
+        ranked = sorted(range(len(self.tools)), key=lambda i: scores[i], reverse=True)
+        return [
+            self.tools[i]
+            for i in ranked[: self.config.top_k]
+            if scores[i] >= self.config.threshold
+        ]
+
+
+class ToolFilter:
+    """Select tools relevant to query before they are bound to LLM.
+
+    Retrievers are built once per tools catalog (catalogs are cached by the
+    MCP tools cache, so the same tool objects are returned until the catalog
+    is refreshed) and tool embeddings are computed once per tool description.
+    """
+
+    def __init__(self, filtering_config: ToolFilteringConfig) -> None:
+        """Initialize tool filter, embedding model is loaded on first use."""
+        self.config = filtering_config
+        self._lock = threading.Lock()
+        self._embed_model: Any = None
+        self._embed_model_loaded = False
+        self._embeddings: dict[str, list[float]] = {}
+        # catalog key -> retriever, least recently used first
+        self._retrievers: OrderedDict[tuple[int, ...], ToolRetriever] = OrderedDict()
+
+    def _get_embed_model(self) -> Any:
+        """Load embedding model according to configuration."""
+        if not self._embed_model_loaded:
+            self._embed_model_loaded = True
+            if self.config.embed_model_path is None:
+                logger.warning(
+                    "Embedding model path for tool filtering is not set, "
+                    "using sparse retrieval only"
+                )
+            else:
+                from llama_index.embeddings.huggingface import (  # pylint: disable=C0415
+                    HuggingFaceEmbedding,
+                )
+
+                logger.info(
+                    "Loading tool filtering embedding model from path %s",
+                    self.config.embed_model_path,
+                )
+                self._embed_model = HuggingFaceEmbedding(
+                    model_name=self.config.embed_model_path
+                )
+        return self._embed_model
+
+    def _embed_tools(self, documents: list[str]) -> Optional[list[list[float]]]:
+        """Return embeddings of tool documents, computing only the missing ones."""
+        embed_model = self._get_embed_model()
+        if embed_model is None:
+            return None
+        missing = [
+            document for document in documents if document not in self._embeddings
+        ]
+        if missing:
+            embeddings = embed_model.get_text_embedding_batch(missing)
+            for document, embedding in zip(missing, embeddings):
+                self._embeddings[document] = normalize(embedding)
+        return [self._embeddings[document] for document in documents]
+
+    def get_retriever(self, tools: list[StructuredTool]) -> ToolRetriever:
+        """Return retriever for given tools catalog, build it if needed."""
+        key = tuple(id(tool) for tool in tools)
+        with self._lock:
+            retriever = self._retrievers.get(key)
+            # retriever keeps references to tools, so their IDs can't be reused
+            if retriever is not None:
+                self._retrievers.move_to_end(key)
+                return retriever
+
+            embeddings = self._embed_tools([tool_document(tool) for tool in tools])
+            retriever = ToolRetriever(tools, self.config, embeddings)
+            self._retrievers[key] = retriever
+            while len(self._retrievers) > constants.TOOL_FILTERING_MAX_RETRIEVERS:
+                self._retrievers.popitem(last=False)
+            return retriever
+
+    def filter_tools(
+        self, query: str, tools: list[StructuredTool]
+    ) -> list[StructuredTool]:
+        """Return tools relevant to query, all tools when filtering fails."""
+        if len(tools) <= self.config.top_k:
+            return tools
+        try:
+            retriever = self.get_retriever(tools)
+            query_embedding = None
+            if self._embed_model is not None:
+                query_embedding = normalize(
+                    self._embed_model.get_query_embedding(query)
+                )
+            selected = retriever.retrieve(query, query_embedding)
+        except Exception as e:
+            logger.error("Tool filtering failed, using all tools: %s", e)
+            return tools
+        if not selected:
+            logger.info("No tool is relevant to query, using all tools")
+            return tools
+        logger.info(
+            "Selected %d of %d tools: %s",
+            len(selected),
+            len(tools),
+            [tool.name for tool in selected],
+        )
+        return selected
+
+
+_tool_filters: dict[int, ToolFilter] = {}
+_tool_filters_lock = threading.Lock()
+
+
+def get_tool_filter(
+    filtering_config: Optional[ToolFilteringConfig],
+) -> Optional[ToolFilter]:
+    """Return tool filter shared by all requests, None when filtering is disabled."""
+    if filtering_config is None:
+        return None
+    with _tool_filters_lock:
+        tool_filter = _tool_filters.get(id(filtering_config))
+        if tool_filter is None or tool_filter.config is not filtering_config:
+            # configuration has been reloaded
+            _tool_filters.clear()
+            tool_filter = ToolFilter(filtering_config)
+            _tool_filters[id(filtering_config)] = tool_filter
+        return tool_filter
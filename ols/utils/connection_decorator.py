@@ -1,10 +1,15 @@
-"""Decocator that makes sure the object is 'connected' according to it's connected predicate."""
+"""Decocator that borrows a connection from the object's connection pool for the call."""
 
 from typing import Any, Callable
 
 
 def connection(f: Callable) -> Callable:
-    """Decocator that makes sure the object is 'connected' according to it's connected predicate.
+    """Decocator that borrows a connection from the object's connection pool for the call.
+
+    The borrowed connection is available as `connection` attribute of the
+    object in the calling thread and it is returned into the pool when the
+    call finishes. Nested calls of decorated methods reuse the connection
+    that is already borrowed.
 
     Example:
     ```python
@@ -15,8 +20,13 @@ def connection(f: Callable) -> Callable:
     """
 
     def wrapper(connectable: Any, *args: Any, **kwargs: Any) -> Callable:
-        if not connectable.connected():
-            connectable.connect()
-        return f(connectable, *args, **kwargs)
+        if connectable.connection is not None:
+            return f(connectable, *args, **kwargs)
+        with connectable.connection_pool.connection() as borrowed:
+            connectable.connection = borrowed
+            try:
+                return f(connectable, *args, **kwargs)
+            finally:
+                connectable.connection = None
 
     return wrapper
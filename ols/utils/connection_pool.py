@@ -0,0 +1,305 @@
+"""Pool of connections to Postgres database shared by all storage classes."""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Optional
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+from prometheus_client import Gauge, Histogram
+
+from ols.constants import POSTGRES_POOL_IDLE_CHECK_INTERVAL
+
+if TYPE_CHECKING:
+    from ols.app.models.config import PostgresConfig
+
+logger = logging.getLogger(__name__)
+
+# Metrics are defined here and not in ols.app.metrics, because the metrics
+# module depends on the application configuration that (indirectly) imports
+# this module. They are exposed by the /metrics endpoint all the same.
+postgres_pool_wait_seconds = Histogram(
+    "ols_postgres_pool_wait_seconds",
+    "Time spent waiting for a free connection in Postgres connection pool",
+)
+postgres_pool_connections = Gauge(
+    "ols_postgres_pool_connections",
+    "Number of connections in Postgres connection pools",
+    ["state"],
+)
+
+
+class ConnectionPool:
+    """Thread-safe pool of connections to Postgres database.
+
+    At most `pool_max_size` connections are open at the same time. When all
+    of them are in use, borrowing a connection waits up to `pool_timeout`
+    seconds for a connection to be returned. Connections idle for longer
+    than `POSTGRES_POOL_IDLE_CHECK_INTERVAL` seconds are checked before they
+    are borrowed again and broken connections are transparently replaced by
+    new ones. Connections broken while borrowed are closed when returned.
+
+    The server certificate is verified against `ca_cert_path` only when
+    `use_ca_cert` is set.
+    """
+
+    def __init__(self, config: "PostgresConfig", use_ca_cert: bool = True) -> None:
+        """Initialize the pool and open `pool_min_size` connections."""
+        self.config = config
+        self.use_ca_cert = use_ca_cert
+        self.timeout = config.pool_timeout
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(config.pool_max_size)
+        # idle connections together with the time they were returned
+        self._idle: list[tuple[Any, float]] = []
+        self._open = 0
+
+        for _ in range(config.pool_min_size):
+            self._idle.append((self._connect(), time.monotonic()))
+
+    @property
+    def size(self) -> int:
+        """Return the number of open connections."""
+        return self._open
+
+    def _connect(self) -> Any:
+        """Open new connection to database."""
+        logger.info("Connecting to storage")
+        config = self.config
+        connection = psycopg2.connect(
+            host=config.host,
+            port=config.port,
+            user=config.user,
+            password=config.password,
+            dbname=config.dbname,
+            sslmode=config.ssl_mode,
+            # connection parameters set to None are not used
+            sslrootcert=config.ca_cert_path if self.use_ca_cert else None,
+            gssencmode=config.gss_encmode,
+        )
+        connection.autocommit = True
+        with self._lock:
+            self._open += 1
+        postgres_pool_connections.labels("open").inc()
+        return connection
+
+    def _discard(self, connection: Any) -> None:
+        """Close the connection and forget it."""
+        try:
+            connection.close()
+        except psycopg2.Error as e:
+            logger.warning("Error closing connection to storage: %s", e)
+        with self._lock:
+            self._open -= 1
+        postgres_pool_connections.labels("open").dec()
+
+    @staticmethod
+    def _alive(connection: Any) -> bool:
+        """Check if connection to database is alive."""
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            logger.error("Disconnected from storage: %s", e)
+            return False
+
+    @staticmethod
+    def _reusable(connection: Any, error: BaseException) -> bool:
+        """Check if connection can be reused after an error in the borrowing block.
+
+        Transaction left open by the block is rolled back. Errors not
+        related to the connection (e.g. invalid data) keep it open.
+        """
+        if connection.closed or isinstance(
+            error, (psycopg2.OperationalError, psycopg2.InterfaceError)
+        ):
+            return False
+        try:
+            if (
+                connection.get_transaction_status()
+                != psycopg2.extensions.TRANSACTION_STATUS_IDLE
+            ):
+                connection.rollback()
+            connection.autocommit = True
+        except psycopg2.Error as e:
+            logger.warning("Connection to storage can't be reused: %s", e)
+            return False
+        return True
+
+    def _acquire(self) -> Any:
+        """Get alive idle connection or open a new one."""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                connection, returned_at = self._idle.pop()
+            # the most recently returned connection is borrowed first, so
+            # just connections not used for a while need to be checked
+            if time.monotonic() - returned_at < POSTGRES_POOL_IDLE_CHECK_INTERVAL:
+                return connection
+            try:
+                if self._alive(connection):
+                    return connection
+            except Exception:
+                self._discard(connection)
+                raise
+            self._discard(connection)
+        return self._connect()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Borrow a connection from the pool for the duration of the block.
+
+        Connection is returned into the pool when the block finishes. When
+        the connection is broken in the block, it is closed instead.
+
+        Raises:
+            psycopg2.pool.PoolError: No connection was returned into the pool
+                in `pool_timeout` seconds.
+        """
+        start = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            raise psycopg2.pool.PoolError(
+                f"No free connection in pool after {self.timeout} seconds"
+            )
+        postgres_pool_wait_seconds.observe(time.monotonic() - start)
+
+        try:
+            connection = self._acquire()
+            postgres_pool_connections.labels("in_use").inc()
+            try:
+                yield connection
+            except BaseException as e:
+                if not self._reusable(connection, e):
+                    self._discard(connection)
+                    raise
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+                raise
+            else:
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+            finally:
+                postgres_pool_connections.labels("in_use").dec()
+        finally:
+            self._slots.release()
+
+    def ready(self) -> bool:
+        """Check if a working connection to database can be borrowed."""
+        try:
+            with self.connection() as connection:
+                return self._alive(connection)
+        except psycopg2.Error as e:
+            logger.error("Storage is not ready: %s", e)
+            return False
+
+    def close(self) -> None:
+        """Close all idle connections.
+
+        Borrowed connections are closed when they are returned to the pool
+        with an error, otherwise they are kept open.
+        """
+        with self._lock:
+            idle = self._idle
+            self._idle = []
+        for connection, _ in idle:
+            self._discard(connection)
+
+
+_pools: dict[tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_key(config: "PostgresConfig", use_ca_cert: bool) -> tuple:
+    """Return key identifying the pool for given configuration."""
+    return (
+        use_ca_cert,
+        config.host,
+        config.port,
+        config.dbname,
+        config.user,
+        config.password,
+        config.ssl_mode,
+        config.ca_cert_path,
+        config.gss_encmode,
+        config.pool_min_size,
+        config.pool_max_size,
+        config.pool_timeout,
+    )
+
+
+def get_connection_pool(
+    config: "PostgresConfig", use_ca_cert: bool = True
+) -> ConnectionPool:
+    """Return connection pool shared by all users of the same database."""
+    key = _pool_key(config, use_ca_cert)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(config, use_ca_cert)
+            _pools[key] = pool
+        return pool
+
+
+def close_connection_pools() -> None:
+    """Close and forget all shared connection pools."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+class PooledConnectable:
+    """Base class for objects that use connections from shared connection pool.
+
+    Methods decorated by `ols.utils.connection_decorator.connection` borrow
+    a connection from the pool for the duration of the call, and the
+    connection is available as `self.connection` in the calling thread.
+    """
+
+    connection_pool: ConnectionPool
+    _borrowed: threading.local
+
+    @property
+    def connection(self) -> Any:
+        """Return connection borrowed by the current thread, if any."""
+        return getattr(self._borrowed, "connection", None)
+
+    @connection.setter
+    def connection(self, connection: Any) -> None:
+        """Set connection borrowed by the current thread."""
+        self._borrowed.connection = connection
+
+    # pylint: disable=W0201
+    def connect(
+        self,
+        config: "PostgresConfig",
+        initialize: Optional[Callable[[], None]],
+        use_ca_cert: bool = True,
+    ) -> None:
+        """Attach to shared connection pool and initialize database objects.
+
+        Initialization runs in one transaction, so tables, indexes etc. are
+        either all created or none of them are.
+        """
+        self._borrowed = threading.local()
+        self.connection_pool = get_connection_pool(config, use_ca_cert)
+        if initialize is None:
+            return
+        with self.connection_pool.connection() as connection:
+            connection.autocommit = False
+            self.connection = connection
+            try:
+                initialize()
+            except Exception as e:
+                logger.exception("Error initializing Postgres database:\n%s", e)
+                raise
+            finally:
+                self.connection = None
+            connection.autocommit = True
@@ -1,6 +1,12 @@
 """Utilities for parsing and validating MCP client headers."""
 
+import asyncio
+import hashlib
+import json
 import logging
+import threading
+import time
+from collections import OrderedDict
 from typing import Any, Optional
 
 from langchain_mcp_adapters.client import MultiServerMCPClient
@@ -131,11 +137,152 @@ def resolve_server_headers(
     return headers
 
 
+class MCPToolsCache:
+    """Cache of tools listed from MCP servers shared by all requests.
+
+    Tools are cached per server and per resolved server configuration (URL,
+    headers with user credentials etc.), because listed tools keep the
+    configuration they are called with. Catalogs older than `ttl` are still
+    used, but they are refreshed in background; catalogs older than
+    `max_age` are listed again before they are used.
+    """
+
+    def __init__(
+        self,
+        ttl: float = constants.MCP_TOOLS_CACHE_TTL,
+        max_age: float = constants.MCP_TOOLS_CACHE_MAX_AGE,
+        max_entries: int = constants.MCP_TOOLS_CACHE_MAX_ENTRIES,
+    ) -> None:
+        """Initialize empty cache."""
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # cache key -> (time when tools were listed, tools), LRU first
+        self._entries: OrderedDict[str, tuple[float, list]] = OrderedDict()
+        self._refreshing: set[str] = set()
+        self._background_tasks: set[asyncio.Task] = set()
+
+    @staticmethod
+    def key(server_name: str, server_config: dict[str, Any]) -> str:
+        """Construct cache key for server that does not contain credentials."""
+        serialized = json.dumps(
+            [server_name, server_config], sort_keys=True, default=str
+        )
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def clear(self) -> None:
+        """Drop all cached tools."""
+        with self._lock:
+            self._entries.clear()
+            self._refreshing.clear()
+
+    async def get_tools(self, mcp_servers: dict[str, Any]) -> list:
+        """Get tools from MCP servers, listing only servers not cached yet.
+
+        Args:
+            mcp_servers: Dictionary mapping server names to their configurations.
+
+        Returns:
+            List of tools from all servers that are cached or successfully listed.
+        """
+        now = time.monotonic()
+        tools_by_server: dict[str, list] = {}
+        missing: dict[str, Any] = {}
+        stale: dict[str, Any] = {}
+
+        with self._lock:
+            for server_name, server_config in mcp_servers.items():
+                key = self.key(server_name, server_config)
+                entry = self._entries.get(key)
+                if entry is None or now - entry[0] > self.max_age:
+                    missing[server_name] = server_config
+                    continue
+                self._entries.move_to_end(key)
+                tools_by_server[server_name] = entry[1]
+                if now - entry[0] > self.ttl and key not in self._refreshing:
+                    self._refreshing.add(key)
+                    stale[server_name] = server_config
+
+        if stale:
+            self._refresh_in_background(stale)
+        if missing:
+            tools_by_server.update(await self._list_tools(missing))
+
+        # keep the order of servers from configuration
+        return [
+            tool
+            for server_name in mcp_servers
+            for tool in tools_by_server.get(server_name, [])
+        ]
+
+    async def _list_tools(self, mcp_servers: dict[str, Any]) -> dict[str, list]:
+        """List tools from all given MCP servers concurrently.
+
+        Servers are listed individually so that if one server is unreachable,
+        tools from other servers are still available.
+        """
+        mcp_client = MultiServerMCPClient(mcp_servers)
+
+        async def list_server_tools(server_name: str) -> Optional[list]:
+            try:
+                server_tools = await mcp_client.get_tools(server_name=server_name)
+            except Exception as e:
+                logger.error(
+                    "Failed to get tools from MCP server '%s': %s", server_name, e
+                )
+                return None
+            logger.info(
+                "Loaded %d tools from MCP server '%s'",
+                len(server_tools),
+                server_name,
+            )
+            self._store(self.key(server_name, mcp_servers[server_name]), server_tools)
+            return server_tools
+
+        results = await asyncio.gather(
+            *(list_server_tools(server_name) for server_name in mcp_servers)
+        )
+        return {
+            server_name: server_tools
+            for server_name, server_tools in zip(mcp_servers, results)
+            if server_tools is not None
+        }
+
+    def _store(self, key: str, tools: list) -> None:
+        """Store listed tools and evict least recently used catalogs."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), tools)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _refresh_in_background(self, mcp_servers: dict[str, Any]) -> None:
+        """List tools from given MCP servers again without waiting for result."""
+        keys = [self.key(name, server) for name, server in mcp_servers.items()]
+
+        async def refresh() -> None:
+            try:
+                await self._list_tools(mcp_servers)
+            finally:
+                with self._lock:
+                    self._refreshing.difference_update(keys)
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        # keep reference to the task, otherwise it might be garbage collected
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+
+mcp_tools_cache = MCPToolsCache()
+
+
 async def gather_mcp_tools(mcp_servers: dict[str, Any]) -> list:
     """Gather tools from multiple MCP servers with failure isolation.
 
-    Load tools from each MCP server individually so that if one server
-    is unreachable, tools from other servers are still available.
+    Tools are taken from the shared MCP tools cache, servers that are not
+    cached yet are listed concurrently. If one server is unreachable, tools
+    from other servers are still available.
 
     Args:
         mcp_servers: Dictionary mapping server names to their configurations.
@@ -143,22 +290,7 @@ async def gather_mcp_tools(mcp_servers: dict[str, Any]) -> list:
     Returns:
         List of tools from all successfully connected servers.
     """
-    all_tools: list = []
-    mcp_client = MultiServerMCPClient(mcp_servers)
-
-    for server_name in mcp_servers:
-        try:
-            server_tools = await mcp_client.get_tools(server_name=server_name)
-            all_tools.extend(server_tools)
-            logger.info(
-                "Loaded %d tools from MCP server '%s'",
-                len(server_tools),
-                server_name,
-            )
-        except Exception as e:
-            logger.error("Failed to get tools from MCP server '%s': %s", server_name, e)
-
-    return all_tools
+    return await mcp_tools_cache.get_tools(mcp_servers)
 
 
 def build_mcp_config(
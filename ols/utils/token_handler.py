@@ -1,18 +1,26 @@
 """Utility to handle tokens."""
 
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+from functools import cache
 from math import ceil
+from typing import Optional
 
 from langchain_core.messages import BaseMessage
 from llama_index.core.schema import NodeWithScore
-from tiktoken import get_encoding
+from tiktoken import Encoding, get_encoding
 
 from ols.app.models.models import RagChunk
 from ols.constants import (
     DEFAULT_TOKENIZER_MODEL,
+    MESSAGE_TOKEN_COUNT_KEY,
     MINIMUM_CONTEXT_TOKEN_LIMIT,
+    RAG_CHUNK_TOKEN_COUNT_KEY,
     RAG_SIMILARITY_CUTOFF,
     TOKEN_BUFFER_WEIGHT,
+    TOKEN_COUNT_CACHE_MAX_ENTRIES,
 )
 from ols.src.prompts.prompt_generator import format_retrieved_chunk
 
@@ -23,6 +31,62 @@ class PromptTooLongError(Exception):
     """Prompt is too long."""
 
 
+@cache
+def _get_encoder(encoding_name: str) -> Encoding:
+    """Return encoder shared by all token handlers in the process."""
+    return get_encoding(encoding_name)
+
+
+class TokenCountCache:
+    """Thread-safe LRU cache of token counts.
+
+    Counts are keyed by digest of the text, so the cache does not keep
+    (possibly long) texts alive.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        """Initialize empty cache."""
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._counts: OrderedDict[tuple[str, bytes], int] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of cached counts."""
+        return len(self._counts)
+
+    @staticmethod
+    def key(encoding_name: str, text: str) -> tuple[str, bytes]:
+        """Construct cache key for given tokenizer model and text."""
+        digest = hashlib.blake2b(
+            text.encode("utf-8", "surrogatepass"), digest_size=16
+        ).digest()
+        return encoding_name, digest
+
+    def get(self, key: tuple[str, bytes]) -> Optional[int]:
+        """Return cached count, or None when it is not cached."""
+        with self._lock:
+            count = self._counts.get(key)
+            if count is not None:
+                self._counts.move_to_end(key)
+            return count
+
+    def put(self, key: tuple[str, bytes], count: int) -> None:
+        """Store count, evicting the least recently used ones."""
+        with self._lock:
+            self._counts[key] = count
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached counts."""
+        with self._lock:
+            self._counts.clear()
+
+
+token_count_cache = TokenCountCache(TOKEN_COUNT_CACHE_MAX_ENTRIES)
+
+
 class TokenHandler:
     """This class handles tokens.
 
@@ -36,7 +100,11 @@ class TokenHandler:
         # Note: We need an approximate tokens count.
         # For different models, exact tokens may vary due to different tokenizer.
         # Also the provider may add model specific tags.
-        self._encoder = get_encoding(encoding_name)
+        self._encoding_name = encoding_name
+        self._encoder = _get_encoder(encoding_name)
+        # precomputed token counts of RAG chunks are valid only for the
+        # tokenizer model they were counted with
+        self._use_chunk_token_counts = encoding_name == DEFAULT_TOKENIZER_MODEL
 
     def text_to_tokens(self, text: str) -> list[int]:
         """Convert text to tokens.
@@ -60,13 +128,78 @@ class TokenHandler:
         """
         return self._encoder.decode(tokens)
 
+    def count_tokens(self, text: str, memoize: bool = True) -> int:
+        """Count tokens of text, using the count remembered for the same text.
+
+        Args:
+            text: context text, ex: "This is my doc"
+            memoize: use and remember the count in the shared cache; turn it
+                off for text that is not going to be counted again
+
+        Returns:
+            Exact (not approximated) token count, ex: 4
+        """
+        if not memoize:
+            return len(self._encoder.encode(text))
+        key = TokenCountCache.key(self._encoding_name, text)
+        count = token_count_cache.get(key)
+        if count is None:
+            count = len(self._encoder.encode(text))
+            token_count_cache.put(key, count)
+        return count
+
+    def count_tokens_batch(self, texts: list[str], memoize: bool = True) -> list[int]:
+        """Count tokens of many texts, encoding the uncounted ones in one batch.
+
+        Args:
+            texts: texts to count tokens for
+            memoize: use and remember counts in the shared cache; turn it off
+                for many texts that are not going to be counted again
+
+        Returns:
+            Exact (not approximated) token count for every text.
+        """
+        if not memoize:
+            return [len(tokens) for tokens in self._encoder.encode_batch(texts)]
+
+        keys = [TokenCountCache.key(self._encoding_name, text) for text in texts]
+        counts = [token_count_cache.get(key) for key in keys]
+        missing = [i for i, count in enumerate(counts) if count is None]
+        if missing:
+            encoded = self._encoder.encode_batch([texts[i] for i in missing])
+            for i, tokens in zip(missing, encoded):
+                counts[i] = len(tokens)
+                token_count_cache.put(keys[i], counts[i])
+        return counts
+
+    def approximate_token_count(self, text: str) -> int:
+        """Get approximate tokens count of text, see `buffered_token_count`."""
+        return TokenHandler.buffered_token_count(self.count_tokens(text))
+
+    def chunk_token_counts(self, texts: list[str]) -> list[int]:
+        """Count tokens of RAG chunks formatted for the prompt.
+
+        Args:
+            texts: texts of RAG chunks
+
+        Returns:
+            Exact (not approximated) token count for every chunk.
+        """
+        formatted = [format_retrieved_chunk(text) for text in texts]
+        return self.count_tokens_batch(formatted, memoize=False)
+
     @staticmethod
-    def _get_token_count(tokens: list[int]) -> int:
-        """Get approximate tokens count."""
+    def buffered_token_count(token_count: int) -> int:
+        """Get approximate tokens count from exact count."""
         # Note: As we get approximate tokens count, we want to have enough
         # buffer so that there is less chance of under-estimation.
         # We increase by certain percentage to nearest integer (ceil).
-        return ceil(len(tokens) * TOKEN_BUFFER_WEIGHT)
+        return ceil(token_count * TOKEN_BUFFER_WEIGHT)
+
+    @staticmethod
+    def _get_token_count(tokens: list[int]) -> int:
+        """Get approximate tokens count."""
+        return TokenHandler.buffered_token_count(len(tokens))
 
     def calculate_and_check_available_tokens(
         self,
@@ -84,6 +217,31 @@ class TokenHandler:
             max_tokens_for_tools: tokens reserved for tool outputs (only when MCP
                 servers are configured, default 0 means no reservation)
 
+        Returns:
+            available_tokens: int, tokens that can be used for augmentation.
+        """
+        return self.check_available_tokens(
+            self.count_tokens(prompt),
+            context_window_size,
+            max_tokens_for_response,
+            max_tokens_for_tools,
+        )
+
+    def check_available_tokens(
+        self,
+        prompt_token_count: int,
+        context_window_size: int,
+        max_tokens_for_response: int,
+        max_tokens_for_tools: int = 0,
+    ) -> int:
+        """Get available tokens for prompt with already counted tokens.
+
+        Args:
+            prompt_token_count: exact (not approximated) prompt tokens count
+            context_window_size: context window size of LLM
+            max_tokens_for_response: max tokens allowed for response (estimation)
+            max_tokens_for_tools: tokens reserved for tool outputs
+
         Returns:
             available_tokens: int, tokens that can be used for augmentation.
         """
@@ -94,7 +252,7 @@ class TokenHandler:
             max_tokens_for_tools,
         )
 
-        prompt_token_count = TokenHandler._get_token_count(self.text_to_tokens(prompt))
+        prompt_token_count = TokenHandler.buffered_token_count(prompt_token_count)
         logger.debug("Prompt tokens: %d", prompt_token_count)
 
         # The context_window_size is the maximum number of tokens that
@@ -154,10 +312,19 @@ class TokenHandler:
                 )
                 break
 
-            node_text = node.get_text()
-            node_text = format_retrieved_chunk(node_text)
-            tokens = self.text_to_tokens(node_text)
-            tokens_count = TokenHandler._get_token_count(tokens)
+            node_text = format_retrieved_chunk(node.get_text())
+            # chunks from index have token count precomputed, so the text
+            # needs to be encoded only when it has to be truncated
+            exact_count = (
+                node.metadata.get(RAG_CHUNK_TOKEN_COUNT_KEY)
+                if self._use_chunk_token_counts
+                else None
+            )
+            tokens = None
+            if exact_count is None:
+                tokens = self.text_to_tokens(node_text)
+                exact_count = len(tokens)
+            tokens_count = TokenHandler.buffered_token_count(exact_count)
             tokens_count += 1  # for new-line char
             logger.debug("RAG content tokens count: %d", tokens_count)
 
@@ -192,7 +359,10 @@ class TokenHandler:
                 max_tokens - available_tokens,
             )
 
-            node_text = self.tokens_to_text(tokens[:available_tokens])
+            if exact_count > available_tokens:
+                if tokens is None:
+                    tokens = self.text_to_tokens(node_text)
+                node_text = self.tokens_to_text(tokens[:available_tokens])
             rag_chunks.append(
                 RagChunk(
                     text=node_text,
@@ -208,6 +378,33 @@ class TokenHandler:
         )
         return rag_chunks, max_tokens
 
+    def history_message_token_counts(self, messages: list[BaseMessage]) -> list[int]:
+        """Count tokens of messages as they are used in conversation history.
+
+        Args:
+            messages: messages to be stored into conversation history
+
+        Returns:
+            Exact (not approximated) token count for every message.
+        """
+        return self.count_tokens_batch(
+            [f"{message.type}: {str(message.content).strip()}" for message in messages]
+        )
+
+    def history_message_token_count(self, message: BaseMessage) -> int:
+        """Get tokens count of history message, counted when it was stored if possible.
+
+        Args:
+            message: message from conversation history
+
+        Returns:
+            Exact (not approximated) token count.
+        """
+        count = message.response_metadata.get(MESSAGE_TOKEN_COUNT_KEY)
+        if count is None:
+            count = self.count_tokens(f"{message.type}: {str(message.content).strip()}")
+        return count
+
     def limit_conversation_history(
         self, history: list[BaseMessage], limit: int = 0
     ) -> tuple[list[BaseMessage], bool]:
@@ -215,9 +412,11 @@ class TokenHandler:
         total_length = 0
         index = 0
 
+        # messages from conversation cache have their count stored, so this
+        # is just a sum of integers from the newest message to the oldest one
         for message in reversed(history):
-            message_length = TokenHandler._get_token_count(
-                self.text_to_tokens(f"{message.type}: {message.content}")
+            message_length = TokenHandler.buffered_token_count(
+                self.history_message_token_count(message)
             )
             total_length += message_length + 1  # 1 for new-line char
 
@@ -247,8 +446,8 @@ class TokenHandler:
             Tuple of (output_text, was_truncated) where was_truncated indicates
             if truncation occurred
         """
-        tokens = self.text_to_tokens(text)
-        token_count = TokenHandler._get_token_count(tokens)
+        # the count is remembered, so counting the returned output again is cheap
+        token_count = self.approximate_token_count(text)
 
         if token_count <= max_tokens:
             return text, False
@@ -261,10 +460,9 @@ class TokenHandler:
             "\n\n[OUTPUT TRUNCATED - The tool returned more data than can be "
             "processed. Please ask a more specific question to get complete results.]"
         )
-        warning_tokens = TokenHandler._get_token_count(
-            self.text_to_tokens(warning_message)
-        )
+        warning_tokens = self.approximate_token_count(warning_message)
 
+        tokens = self.text_to_tokens(text)
         truncated_tokens = tokens[: max_tokens - warning_tokens]
         truncated_text = self.tokens_to_text(truncated_tokens)
 
@@ -0,0 +1,92 @@
+"""Benchmarks for the in-memory conversation cache."""
+
+# pylint: disable=W0621
+
+from collections import deque
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from ols.app.models.config import InMemoryCacheConfig
+from ols.app.models.models import CacheEntry
+from ols.src.cache.in_memory_cache import InMemoryCache
+from ols.utils import suid
+
+user_id = suid.get_suid()
+
+cache_entry = CacheEntry(
+    query=HumanMessage("How do I scale a deployment?"),
+    response=AIMessage("Use the oc scale command."),
+)
+
+# number of conversations stored in cache before the benchmark is started
+# the latency of cache operations should not depend on this number
+CONVERSATION_COUNTS = (100, 1000, 10000, 100000)
+
+
+def prepare_cache(conversations):
+    """Prepare in-memory cache filled with given number of conversations."""
+    config = InMemoryCacheConfig({"max_entries": str(conversations * 2)})
+    cache = InMemoryCache(config)
+    cache.initialize_cache(config)
+
+    conversation_ids = deque(suid.get_suid() for _ in range(conversations))
+    for conversation_id in conversation_ids:
+        cache.insert_or_append(user_id, conversation_id, cache_entry)
+    return cache, conversation_ids
+
+
+@pytest.fixture(params=CONVERSATION_COUNTS)
+def filled_cache(request):
+    """In-memory cache filled with conversations."""
+    return prepare_cache(request.param)
+
+
+def test_get_least_recently_used(benchmark, filled_cache):
+    """Benchmark reading the least recently used conversation."""
+    cache, conversation_ids = filled_cache
+
+    def get_lru():
+        # each read moves the conversation to the other end of LRU order
+        conversation_id = conversation_ids.popleft()
+        cache.get(user_id, conversation_id)
+        conversation_ids.append(conversation_id)
+
+    benchmark(get_lru)
+
+
+def test_append_to_least_recently_used(benchmark, filled_cache):
+    """Benchmark appending to the least recently used conversation."""
+    cache, conversation_ids = filled_cache
+
+    def append_lru():
+        conversation_id = conversation_ids.popleft()
+        cache.insert_or_append(user_id, conversation_id, cache_entry)
+        conversation_ids.append(conversation_id)
+
+    benchmark(append_lru)
+
+
+def test_insert_with_eviction(benchmark, filled_cache):
+    """Benchmark inserting new conversations into full cache."""
+    cache, _ = filled_cache
+    # make the cache full so each insert evicts the oldest message
+    cache.capacity = cache.total_entries
+
+    def insert_new():
+        cache.insert_or_append(user_id, suid.get_suid(), cache_entry)
+
+    benchmark(insert_new)
+
+
+def test_delete_and_insert(benchmark, filled_cache):
+    """Benchmark deleting and re-creating the least recently used conversation."""
+    cache, conversation_ids = filled_cache
+
+    def delete_lru():
+        conversation_id = conversation_ids.popleft()
+        cache.delete(user_id, conversation_id)
+        cache.insert_or_append(user_id, conversation_id, cache_entry)
+        conversation_ids.append(conversation_id)
+
+    benchmark(delete_lru)
@@ -101,3 +101,19 @@ def test_limit_conversation_history_huge_history(benchmark):
     ] * 10000
 
     benchmark_limit_conversation_history(benchmark, history)
+
+
+def test_count_tokens_repeated_text(benchmark):
+    """Benchmark counting tokens of text that was counted before."""
+    token_handler = TokenHandler()
+    text = "What is Kubernetes?" * 1000
+
+    benchmark(token_handler.count_tokens, text)
+
+
+def test_count_tokens_batch(benchmark):
+    """Benchmark counting tokens of many texts in one batch."""
+    token_handler = TokenHandler()
+    texts = [f"document #{i}: " + "What is Kubernetes?" * 100 for i in range(100)]
+
+    benchmark(token_handler.count_tokens_batch, texts, memoize=False)
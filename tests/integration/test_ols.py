@@ -126,7 +126,7 @@ def test_post_question_on_generic_response_type_summarize_error(_setup, endpoint
             return_value=answer,
         ),
         patch(
-            "ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response",
+            "ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response_async",
             side_effect=Exception("summarizer error"),
         ),
         patch(
@@ -1203,7 +1203,7 @@ def test_tool_calling(_setup, caplog) -> None:
         ) as mock_invoke,
         patch(
             "ols.src.query_helpers.docs_summarizer.TokenHandler"
-            ".calculate_and_check_available_tokens",
+            ".check_available_tokens",
             return_value=1000,
         ),
         patch(
@@ -14,8 +14,9 @@ from ols.app.endpoints.health import (
     llm_is_ready,
     readiness_probe_get_method,
 )
-from ols.app.models.config import InMemoryCacheConfig
+from ols.app.models.config import InMemoryCacheConfig, ReferenceContent
 from ols.app.models.models import LivenessResponse, ReadinessResponse
+from ols.constants import IndexLoadState
 from ols.src.cache.in_memory_cache import InMemoryCache
 
 
@@ -164,22 +165,37 @@ def test_readiness_probe_get_method_service_is_ready():
         assert response == ReadinessResponse(ready=True, reason="service is ready")
 
 
+def mock_index_loader(states):
+    """Create mocked index loader reporting given loading states of indexes."""
+    loader = Mock()
+    loader.index_states = states
+    loader.vector_indexes = None if IndexLoadState.LOADED not in states else [Mock()]
+    return loader
+
+
 def test_readiness_probe_get_method_index_is_ready():
     """Test the readiness_probe function when index is loaded."""
+    states = [IndexLoadState.LOADED, IndexLoadState.FAILED]
     with (
         patch("ols.config._conversation_cache", create=True, new=mock_cache()),
         patch("ols.app.endpoints.health.llm_is_ready_persistent_state", new=True),
+        patch.object(config.ols_config, "reference_content", new=ReferenceContent()),
+        patch("ols.config._rag_index_loader", new=mock_index_loader(states)),
     ):
-        # simulate that the index is loaded
-        config._rag_index = True
         assert index_is_ready()
         response = readiness_probe_get_method()
-        assert response == ReadinessResponse(ready=True, reason="service is ready")
+        assert response == ReadinessResponse(
+            ready=True, reason="service is ready", index_states=states
+        )
 
-        # simulate that the index is not loaded, but it shouldn't as there
-        # is no reference content in config
-        config._rag_index = None
-        config.ols_config.reference_content = None
+    # the index is not loaded, but it shouldn't as there is no reference
+    # content in config
+    with (
+        patch("ols.config._conversation_cache", create=True, new=mock_cache()),
+        patch("ols.app.endpoints.health.llm_is_ready_persistent_state", new=True),
+        patch.object(config.ols_config, "reference_content", new=None),
+        patch("ols.config._rag_index_loader", new=mock_index_loader([])),
+    ):
         assert index_is_ready()
         response = readiness_probe_get_method()
         assert response == ReadinessResponse(ready=True, reason="service is ready")
@@ -187,16 +203,44 @@ def test_readiness_probe_get_method_index_is_ready():
 
 def test_readiness_probe_get_method_index_not_ready():
     """Test the readiness_probe function when index is not loaded."""
-    with patch("ols.app.endpoints.health.llm_is_ready_persistent_state", new=True):
-        # simulate that the index is not loaded
-        config._rag_index = None
-        config.ols_config.reference_content = "something else than None"
-
+    with (
+        patch("ols.app.endpoints.health.llm_is_ready_persistent_state", new=True),
+        patch.object(config.ols_config, "reference_content", new=ReferenceContent()),
+        patch(
+            "ols.config._rag_index_loader",
+            new=mock_index_loader([IndexLoadState.FAILED]),
+        ),
+    ):
         assert not index_is_ready()
         with pytest.raises(HTTPException, match="Service is not ready"):
             readiness_probe_get_method()
 
 
+@pytest.mark.parametrize(
+    ("ready_on_primary_index", "states", "ready"),
+    [
+        (False, [IndexLoadState.LOADED, IndexLoadState.LOADING], False),
+        (True, [IndexLoadState.LOADED, IndexLoadState.LOADING], True),
+        (
+            True,
+            [IndexLoadState.SKIPPED, IndexLoadState.LOADED, IndexLoadState.LOADING],
+            True,
+        ),
+        (True, [IndexLoadState.LOADING, IndexLoadState.LOADED], False),
+        (False, [IndexLoadState.LOADED, IndexLoadState.SKIPPED], True),
+    ],
+)
+def test_index_is_ready_index_states(ready_on_primary_index, states, ready):
+    """Test that readiness of index follows loading states of indexes."""
+    reference_content = ReferenceContent()
+    reference_content.ready_on_primary_index = ready_on_primary_index
+    with (
+        patch.object(config.ols_config, "reference_content", new=reference_content),
+        patch("ols.config._rag_index_loader", new=mock_index_loader(states)),
+    ):
+        assert index_is_ready() is ready
+
+
 def test_readiness_probe_get_method_cache_not_ready():
     """Test the readiness_probe function when cache is not ready."""
     # simulate that the cache is not ready
@@ -2,9 +2,10 @@
 
 import json
 import re
+import threading
 from http import HTTPStatus
 from pathlib import Path
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from fastapi import HTTPException
@@ -30,7 +31,7 @@ from ols.src.llms.llm_loader import LLMConfigurationError  # noqa:E402
 from ols.utils import suid  # noqa:E402
 from ols.utils.errors_parsing import DEFAULT_ERROR_MESSAGE  # noqa:E402
 from ols.utils.redactor import Redactor, RegexFilter  # noqa:E402
-from ols.utils.token_handler import PromptTooLongError  # noqa:E402
+from ols.utils.token_handler import PromptTooLongError, TokenHandler  # noqa:E402
 
 
 @pytest.fixture(scope="function")
@@ -116,6 +117,13 @@ def test_retrieve_previous_input_for_previous_history():
             constants.DEFAULT_USER_UID, llm_request.conversation_id
         )
         assert previous_input == "input"
+        # history is loaded up to the limit
+        get.assert_called_once_with(
+            constants.DEFAULT_USER_UID,
+            conversation_id,
+            False,
+            limit=constants.CONVERSATION_HISTORY_MAX_ENTRIES,
+        )
 
 
 @pytest.mark.usefixtures("_load_config")
@@ -214,6 +222,14 @@ def test_retrieve_attachments_on_improper_content_type():
         ols.retrieve_attachments(llm_request)
 
 
+def history_token_counts(query, response=""):
+    """Token counts of query and response stored with conversation history."""
+    counts = TokenHandler().history_message_token_counts(
+        [HumanMessage(query), AIMessage(response)]
+    )
+    return {"query_token_count": counts[0], "response_token_count": counts[1]}
+
+
 @pytest.mark.usefixtures("_load_config")
 def test_store_conversation_history():
     """Test if operation to store conversation history to cache is called."""
@@ -233,7 +249,9 @@ def test_store_conversation_history():
             {},
         )
 
-        expected_history = CacheEntry(query=HumanMessage(query))
+        expected_history = CacheEntry(
+            query=HumanMessage(query), **history_token_counts(query)
+        )
         insert_or_append.assert_called_with(
             constants.DEFAULT_USER_UID,
             conversation_id,
@@ -258,7 +276,9 @@ def test_store_conversation_history_some_response():
         )
 
     expected_history = CacheEntry(
-        query=HumanMessage(query), response=AIMessage(response)
+        query=HumanMessage(query),
+        response=AIMessage(response),
+        **history_token_counts(query, response),
     )
     insert_or_append.assert_called_with(
         user_id, conversation_id, expected_history, skip_user_id_check
@@ -333,6 +353,7 @@ def test_store_conversation_history_with_tool_data():
             response=AIMessage(response),
             tool_calls=tool_calls,
             tool_results=tool_results,
+            **history_token_counts(query, response),
         )
         insert_or_append.assert_called_with(
             constants.DEFAULT_USER_UID,
@@ -737,8 +758,9 @@ def test_attachments_redact_on_redact_error():
             ols.redact_attachments(conversation_id, attachments)
 
 
+@pytest.mark.asyncio
 @pytest.mark.usefixtures("_load_config")
-def test_conversation_request(auth):
+async def test_conversation_request(auth):
     """Test conversation request API endpoint."""
     with (
         patch(
@@ -749,7 +771,7 @@ def test_conversation_request(auth):
             "ols.src.query_helpers.question_validator.QuestionValidator.validate_question"
         ) as mock_validate_question,
         patch(
-            "ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response"
+            "ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response_async"
         ) as mock_summarize,
         patch("ols.config.conversation_cache.get"),
     ):
@@ -765,7 +787,7 @@ def test_conversation_request(auth):
             token_counter=None,
         )
         llm_request = LLMRequest(query="Tell me about Kubernetes")
-        response = ols.conversation_request(llm_request, auth)
+        response = await ols.conversation_request(llm_request, auth)
         assert (
             response.response
             == "Kubernetes is an open-source container-orchestration system..."
@@ -777,7 +799,7 @@ def test_conversation_request(auth):
         # invalid question
         mock_validate_question.return_value = False
         llm_request = LLMRequest(query="Generate a yaml")
-        response = ols.conversation_request(llm_request, auth)
+        response = await ols.conversation_request(llm_request, auth)
         assert response.response == prompts.INVALID_QUERY_RESP
         assert suid.check_suid(
             response.conversation_id
@@ -787,20 +809,21 @@ def test_conversation_request(auth):
         mock_validate_question.side_effect = HTTPException
         with pytest.raises(HTTPException) as excinfo:
             llm_request = LLMRequest(query="Generate a yaml")
-            response = ols.conversation_request(llm_request, auth)
+            response = await ols.conversation_request(llm_request, auth)
             assert excinfo.status_code == HTTPStatus.INTERNAL_SERVER_ERROR
             assert len(response.conversation_id) == 0
 
 
+@pytest.mark.asyncio
 @pytest.mark.usefixtures("_load_config")
-def test_conversation_request_dedup_ref_docs(auth):
+async def test_conversation_request_dedup_ref_docs(auth):
     """Test deduplication of referenced docs."""
     with (
         patch(
             "ols.src.query_helpers.question_validator.QuestionValidator.validate_question"
         ) as mock_validate_question,
         patch(
-            "ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response"
+            "ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response_async"
         ) as mock_summarize,
         patch("ols.config.conversation_cache.get"),
     ):
@@ -819,7 +842,7 @@ def test_conversation_request_dedup_ref_docs(auth):
             token_counter=None,
         )
         llm_request = LLMRequest(query="some query")
-        response = ols.conversation_request(llm_request, auth)
+        response = await ols.conversation_request(llm_request, auth)
 
         assert len(response.referenced_documents) == 2
         assert response.referenced_documents[0].doc_url == "url-b"
@@ -828,8 +851,9 @@ def test_conversation_request_dedup_ref_docs(auth):
         assert response.referenced_documents[1].doc_title == "title-a"
 
 
+@pytest.mark.asyncio
 @pytest.mark.usefixtures("_load_config")
-def test_conversation_request_on_wrong_configuration(auth):
+async def test_conversation_request_on_wrong_configuration(auth):
     """Test conversation request API endpoint."""
     with (
         patch(
@@ -850,11 +874,12 @@ def test_conversation_request_on_wrong_configuration(auth):
 
         # call must fail because we mocked invalid configuration state
         with pytest.raises(HTTPException, match="Unable to process this request"):
-            ols.conversation_request(llm_request, auth)
+            await ols.conversation_request(llm_request, auth)
 
 
+@pytest.mark.asyncio
 @pytest.mark.usefixtures("_load_config")
-def test_question_validation_in_conversation_start(auth):
+async def test_question_validation_in_conversation_start(auth):
     """Test if question validation is skipped in follow-up conversation."""
     with (
         patch(
@@ -871,13 +896,14 @@ def test_question_validation_in_conversation_start(auth):
         query = "some elaborate question"
         llm_request = LLMRequest(query=query, conversation_id=conversation_id)
 
-        response = ols.conversation_request(llm_request, auth)
+        response = await ols.conversation_request(llm_request, auth)
 
         assert response.response.startswith(prompts.INVALID_QUERY_RESP)
 
 
+@pytest.mark.asyncio
 @pytest.mark.usefixtures("_load_config")
-def test_no_question_validation_in_follow_up_conversation(auth):
+async def test_no_question_validation_in_follow_up_conversation(auth):
     """Test if question validation is skipped in follow-up conversation."""
     with (
         patch(
@@ -889,7 +915,7 @@ def test_no_question_validation_in_follow_up_conversation(auth):
             new=Mock(return_value=constants.SUBJECT_REJECTED),
         ),
         patch(
-            "ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response"
+            "ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response_async"
         ) as mock_summarize,
     ):
         # note the `validate_question` is patched to always return as `SUBJECT_REJECTED`
@@ -904,20 +930,21 @@ def test_no_question_validation_in_follow_up_conversation(auth):
         query = "some elaborate question"
         llm_request = LLMRequest(query=query, conversation_id=conversation_id)
 
-        response = ols.conversation_request(llm_request, auth)
+        response = await ols.conversation_request(llm_request, auth)
 
         assert response.response == "some elaborate answer"
 
 
+@pytest.mark.asyncio
 @pytest.mark.usefixtures("_load_config")
-def test_conversation_request_invalid_subject(auth):
+async def test_conversation_request_invalid_subject(auth):
     """Test how generate_response function checks validation results."""
     with (patch("ols.app.endpoints.ols.validate_question") as mock_validate,):
         # prepare arguments for DocsSummarizer
         llm_request = LLMRequest(query="Tell me about Kubernetes")
 
         mock_validate.return_value = False
-        response = ols.conversation_request(llm_request, auth)
+        response = await ols.conversation_request(llm_request, auth)
         assert response.response == prompts.INVALID_QUERY_RESP
         assert len(response.referenced_documents) == 0
         assert not response.truncated
@@ -925,21 +952,12 @@ def test_conversation_request_invalid_subject(auth):
 
 @pytest.mark.usefixtures("_load_config")
 def test_generate_response_valid_subject():
-    """Test how generate_response function checks validation results."""
-    # mock the DocsSummarizer
-    mock_response = (
-        "Kubernetes is an open-source container-orchestration system..."  # summary
-    )
+    """Test that generate_response function returns the streamed response."""
+    streamed_response = Mock()
     with patch(
-        "ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response"
-    ) as mock_summarize:
-        mock_summarize.return_value = SummarizerResponse(
-            mock_response,
-            [],
-            False,
-            token_counter=None,
-        )
-
+        "ols.src.query_helpers.docs_summarizer.DocsSummarizer.generate_response",
+        return_value=streamed_response,
+    ) as mock_generate:
         # prepare arguments for DocsSummarizer
         conversation_id = suid.get_suid()
         llm_request = LLMRequest(query="Tell me about Kubernetes")
@@ -950,20 +968,19 @@ def test_generate_response_valid_subject():
             conversation_id, llm_request, previous_input
         )
 
-        # check the response
-        assert "Kubernetes" in summarizer_response.response
-        assert summarizer_response.rag_chunks == []
-        assert summarizer_response.history_truncated is False
+        assert summarizer_response is streamed_response
+        mock_generate.assert_called_once()
+        assert mock_generate.call_args.args[0] == "Tell me about Kubernetes"
 
 
 @pytest.mark.usefixtures("_load_config")
 def test_generate_response_on_summarizer_error():
-    """Test how generate_response function checks validation results."""
+    """Test how generate_response function handles summarizer errors."""
     with patch(
-        "ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response"
-    ) as mock_summarize:
+        "ols.src.query_helpers.docs_summarizer.DocsSummarizer.generate_response"
+    ) as mock_generate:
         # mock the DocsSummarizer
-        mock_summarize.side_effect = Exception  # any exception might occur
+        mock_generate.side_effect = Exception  # any exception might occur
 
         # prepare arguments for DocsSummarizer
         conversation_id = suid.get_suid()
@@ -976,6 +993,85 @@ def test_generate_response_on_summarizer_error():
             ols.generate_response(conversation_id, llm_request, previous_input)
 
 
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+async def test_generate_response_async_valid_subject():
+    """Test the asynchronous variant of generate_response function."""
+    with patch(
+        "ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response_async"
+    ) as mock_summarize:
+        mock_summarize.return_value = SummarizerResponse(
+            "Kubernetes is an open-source container-orchestration system...",
+            [],
+            False,
+            token_counter=None,
+        )
+
+        conversation_id = suid.get_suid()
+        llm_request = LLMRequest(query="Tell me about Kubernetes")
+
+        summarizer_response = await ols.generate_response_async(
+            conversation_id, llm_request, []
+        )
+
+        assert "Kubernetes" in summarizer_response.response
+        mock_summarize.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+async def test_generate_response_async_does_not_block_event_loop():
+    """Test that LLM and retriever are not created in the event loop thread."""
+    event_loop_thread = threading.get_ident()
+    creating_threads = []
+
+    def create_summarizer(**kwargs):
+        creating_threads.append(threading.get_ident())
+        summarizer = Mock()
+        summarizer.create_response_async = AsyncMock(return_value="response")
+        return summarizer
+
+    def get_retriever():
+        creating_threads.append(threading.get_ident())
+        return "retriever"
+
+    index_loader = Mock()
+    index_loader.get_retriever.side_effect = get_retriever
+    with (
+        patch("ols.app.endpoints.ols.DocsSummarizer", side_effect=create_summarizer),
+        patch("ols.config._rag_index_loader", new=index_loader),
+    ):
+        llm_request = LLMRequest(query="Tell me about Kubernetes")
+        response = await ols.generate_response_async(suid.get_suid(), llm_request, [])
+
+    assert response == "response"
+    assert len(creating_threads) == 2
+    assert event_loop_thread not in creating_threads
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+async def test_generate_response_async_on_summarizer_error():
+    """Test how the asynchronous generate_response function handles errors."""
+    with patch(
+        "ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response_async",
+        side_effect=Exception,
+    ):
+        conversation_id = suid.get_suid()
+        llm_request = LLMRequest(query="Tell me about Kubernetes")
+
+        with pytest.raises(HTTPException, match=DEFAULT_ERROR_MESSAGE):
+            await ols.generate_response_async(conversation_id, llm_request, [])
+
+    with patch(
+        "ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response_async",
+        side_effect=PromptTooLongError("too long"),
+    ):
+        with pytest.raises(HTTPException, match="Prompt is too long") as excinfo:
+            await ols.generate_response_async(conversation_id, llm_request, [])
+        assert excinfo.value.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
 def test_generate_response_unknown_validation_result():
     """Test how generate_response function checks validation results."""
     # prepare arguments for DocsSummarizer
@@ -1002,7 +1098,8 @@ def transcripts_location(tmpdir):
     return tmpdir.strpath
 
 
-def test_transcripts_are_not_stored_when_disabled(transcripts_location, auth):
+@pytest.mark.asyncio
+async def test_transcripts_are_not_stored_when_disabled(transcripts_location, auth):
     """Test nothing is stored when the transcript collection is disabled."""
     with (
         patch(
@@ -1014,7 +1111,7 @@ def test_transcripts_are_not_stored_when_disabled(transcripts_location, auth):
             return_value=True,
         ),
         patch(
-            "ols.app.endpoints.ols.generate_response",
+            "ols.app.endpoints.ols.generate_response_async",
             return_value=SummarizerResponse("something", [], False, None),
         ),
         patch(
@@ -1023,7 +1120,7 @@ def test_transcripts_are_not_stored_when_disabled(transcripts_location, auth):
         ),
     ):
         llm_request = LLMRequest(query="Tell me about Kubernetes")
-        response = ols.conversation_request(llm_request, auth)
+        response = await ols.conversation_request(llm_request, auth)
         assert response
         assert response.response == "something"
 
@@ -3,6 +3,7 @@
 import pytest
 
 from ols import config
+from ols.utils.token_handler import token_count_cache
 
 # needs to be setup there before is_user_authorized is imported
 config.ols_config.authentication_config.module = "k8s"
@@ -93,3 +94,17 @@ async def test_on_llm_end():
     # check the textual representation as well
     expected = "GenericTokenCounter: input_tokens: 0 output_tokens: 2 LLM calls: 0"
     assert str(generic_token_counter) == expected
+
+
+@pytest.mark.asyncio
+async def test_counted_tokens_are_not_remembered():
+    """Test that streamed tokens and prompts do not fill the token count cache."""
+    generic_token_counter = GenericTokenCounter(MockLLM())
+    token_count_cache.clear()
+
+    await generic_token_counter.on_llm_start({}, ["this is just a test"])
+    await generic_token_counter.on_llm_new_token("token")
+
+    assert generic_token_counter.token_counter.input_tokens == 5
+    assert generic_token_counter.token_counter.output_tokens == 1
+    assert len(token_count_cache) == 0
@@ -16,6 +16,7 @@ from ols.app.models.config import (
     Config,
     ConversationCacheConfig,
     DevConfig,
+    HybridRetrievalConfig,
     InMemoryCacheConfig,
     LLMProviders,
     LoggingConfig,
@@ -31,6 +32,7 @@ from ols.app.models.config import (
     QuotaHandlersConfig,
     ReferenceContent,
     ReferenceContentIndex,
+    RerankerConfig,
     TLSConfig,
     TLSSecurityProfile,
     UserDataCollection,
@@ -1372,6 +1374,66 @@ def test_provider_config_validation_improper_url():
         provider_config.validate_yaml()
 
 
+@pytest.mark.parametrize(
+    "pool_config, message",
+    (
+        ({"max_connections": 0}, "max_connections for provider bam needs to be"),
+        ({"max_connections": "many"}, "max_connections for provider bam needs to be"),
+        (
+            {"max_connections": 10, "max_keepalive_connections": 20},
+            "max_keepalive_connections for provider bam needs to be",
+        ),
+        (
+            {"max_keepalive_connections": -1},
+            "max_keepalive_connections for provider bam needs to be",
+        ),
+    ),
+)
+def test_provider_config_validation_improper_pool_size(pool_config, message):
+    """Test the ProviderConfig model validation for improper HTTP pool size."""
+    provider_config = ProviderConfig(
+        {
+            "name": "bam",
+            "url": "http://test.url",
+            "credentials_path": "tests/config/secret/apitoken",
+            "models": [{"name": "test_model_name"}],
+        }
+        | pool_config
+    )
+
+    with pytest.raises(InvalidConfigurationError, match=message):
+        provider_config.validate_yaml()
+
+
+def test_provider_config_pool_size():
+    """Test the HTTP pool size settings in ProviderConfig model."""
+    provider_config = ProviderConfig(
+        {
+            "name": "bam",
+            "credentials_path": "tests/config/secret/apitoken",
+            "models": [{"name": "test_model_name"}],
+        }
+    )
+    assert provider_config.max_connections == constants.DEFAULT_LLM_MAX_CONNECTIONS
+    assert (
+        provider_config.max_keepalive_connections
+        == constants.DEFAULT_LLM_MAX_KEEPALIVE_CONNECTIONS
+    )
+
+    provider_config = ProviderConfig(
+        {
+            "name": "bam",
+            "credentials_path": "tests/config/secret/apitoken",
+            "models": [{"name": "test_model_name"}],
+            "max_connections": 50,
+            "max_keepalive_connections": 50,
+        }
+    )
+    provider_config.validate_yaml()
+    assert provider_config.max_connections == 50
+    assert provider_config.max_keepalive_connections == 50
+
+
 def test_provider_config_validation_missing_name():
     """Test the ProviderConfig model validation for missing name."""
     provider_config = ProviderConfig(
@@ -1947,6 +2009,10 @@ def test_postgres_config_default_values():
     assert postgres_config.dbname == constants.POSTGRES_CACHE_DBNAME
     assert postgres_config.user == constants.POSTGRES_CACHE_USER
     assert postgres_config.max_entries == constants.POSTGRES_CACHE_MAX_ENTRIES
+    assert postgres_config.schema_mode == constants.POSTGRES_CACHE_SCHEMA
+    assert postgres_config.pool_min_size == constants.POSTGRES_POOL_MIN_SIZE
+    assert postgres_config.pool_max_size == constants.POSTGRES_POOL_MAX_SIZE
+    assert postgres_config.pool_timeout == constants.POSTGRES_POOL_TIMEOUT
 
 
 def test_postgres_config_correct_values():
@@ -1983,6 +2049,40 @@ def test_postgres_config_wrong_port():
         )
 
 
+def test_postgres_config_schema_mode():
+    """Test the PostgresConfig schema mode validation."""
+    postgres_config = PostgresConfig(
+        schema_mode=constants.POSTGRES_CACHE_SCHEMA_MESSAGES
+    )
+    assert postgres_config.schema_mode == constants.POSTGRES_CACHE_SCHEMA_MESSAGES
+
+    with pytest.raises(ValidationError, match="Invalid schema mode: foo"):
+        PostgresConfig(schema_mode="foo")
+
+
+def test_postgres_config_pool_settings():
+    """Test the PostgresConfig connection pool settings validation."""
+    postgres_config = PostgresConfig(pool_min_size=0, pool_max_size=5, pool_timeout=1.5)
+    assert postgres_config.pool_min_size == 0
+    assert postgres_config.pool_max_size == 5
+    assert postgres_config.pool_timeout == 1.5
+
+    with pytest.raises(
+        ValidationError,
+        match="The pool_min_size needs to be between 0 and pool_max_size",
+    ):
+        PostgresConfig(pool_min_size=6, pool_max_size=5)
+
+    with pytest.raises(
+        ValidationError,
+        match="The pool_min_size needs to be between 0 and pool_max_size",
+    ):
+        PostgresConfig(pool_min_size=-1)
+
+    with pytest.raises(ValidationError, match="The pool_timeout needs to be positive"):
+        PostgresConfig(pool_timeout=0)
+
+
 def test_postgres_config_equality():
     """Test the PostgresConfig equality check."""
     postgres_config_1 = PostgresConfig()
@@ -2912,6 +3012,64 @@ def test_reference_content_constructor():
         {"product_docs_index_id": "id", "product_docs_index_path": "/path/1/"}
     )
     assert reference_content.embeddings_model_path == "/path/2/"
+    assert reference_content.memory_map_indexes is False
+
+    reference_content = ReferenceContent({"memory_map_indexes": True})
+    assert reference_content.memory_map_indexes is True
+    assert reference_content.index_load_workers == 4
+    assert reference_content.index_reload_interval == 0
+    assert reference_content.ready_on_primary_index is False
+
+    reference_content = ReferenceContent(
+        {
+            "index_load_workers": 2,
+            "index_reload_interval": 60,
+            "ready_on_primary_index": True,
+        }
+    )
+    assert reference_content.index_load_workers == 2
+    assert reference_content.index_reload_interval == 60
+    assert reference_content.ready_on_primary_index is True
+    assert reference_content.embeddings_backend == "torch"
+    assert reference_content.embeddings_onnx_file == "onnx/model_qint8_avx2.onnx"
+    assert reference_content.embeddings_onnx_threads == 2
+
+    reference_content = ReferenceContent(
+        {
+            "embeddings_backend": "onnx",
+            "embeddings_onnx_file": "onnx/model.onnx",
+            "embeddings_onnx_threads": 4,
+        }
+    )
+    assert reference_content.embeddings_backend == "onnx"
+    assert reference_content.embeddings_onnx_file == "onnx/model.onnx"
+    assert reference_content.embeddings_onnx_threads == 4
+    assert reference_content.reranker is None
+
+    reference_content = ReferenceContent(
+        {"reranker": {"model_path": "/path/3/", "top_n": 10, "timeout": 2}}
+    )
+    assert reference_content.reranker == RerankerConfig(
+        model_path="/path/3/", top_n=10, timeout=2
+    )
+    assert reference_content.reranker.top_k == 5
+    assert reference_content.reranker.onnx_file is None
+    assert reference_content.hybrid_retrieval is None
+
+    # hybrid retrieval is enabled by presence of its section
+    reference_content = ReferenceContent({"hybrid_retrieval": {}})
+    assert reference_content.hybrid_retrieval == HybridRetrievalConfig()
+    assert reference_content.hybrid_retrieval.rrf_k == 60
+
+    reference_content = ReferenceContent(
+        {"hybrid_retrieval": {"dense_weight": 0.7, "sparse_weight": 0.3}}
+    )
+    assert reference_content.hybrid_retrieval.dense_weight == 0.7
+    assert reference_content.hybrid_retrieval.sparse_weight == 0.3
+    assert reference_content.deduplicate_chunks
+
+    reference_content = ReferenceContent({"deduplicate_chunks": False})
+    assert not reference_content.deduplicate_chunks
 
 
 def test_reference_content_equality():
@@ -2934,6 +3092,46 @@ def test_reference_content_equality():
     ]
     assert reference_content_1 != reference_content_2
 
+    reference_content_2 = ReferenceContent()
+    reference_content_2.memory_map_indexes = True
+    assert reference_content_1 != reference_content_2
+
+    reference_content_2 = ReferenceContent()
+    reference_content_2.index_load_workers = 1
+    assert reference_content_1 != reference_content_2
+
+    reference_content_2 = ReferenceContent()
+    reference_content_2.index_reload_interval = 60
+    assert reference_content_1 != reference_content_2
+
+    reference_content_2 = ReferenceContent()
+    reference_content_2.ready_on_primary_index = True
+    assert reference_content_1 != reference_content_2
+
+    reference_content_2 = ReferenceContent()
+    reference_content_2.embeddings_backend = "onnx"
+    assert reference_content_1 != reference_content_2
+
+    reference_content_2 = ReferenceContent()
+    reference_content_2.embeddings_onnx_file = "model.onnx"
+    assert reference_content_1 != reference_content_2
+
+    reference_content_2 = ReferenceContent()
+    reference_content_2.embeddings_onnx_threads = 1
+    assert reference_content_1 != reference_content_2
+
+    reference_content_2 = ReferenceContent()
+    reference_content_2.reranker = RerankerConfig(model_path="model")
+    assert reference_content_1 != reference_content_2
+
+    reference_content_2 = ReferenceContent()
+    reference_content_2.hybrid_retrieval = HybridRetrievalConfig()
+    assert reference_content_1 != reference_content_2
+
+    reference_content_2 = ReferenceContent()
+    reference_content_2.deduplicate_chunks = False
+    assert reference_content_1 != reference_content_2
+
     # compare with value of different type
     other_value = "foo"
     assert reference_content_1 != other_value
@@ -2962,6 +3160,100 @@ def test_reference_content_yaml_validation():
     with pytest.raises(InvalidConfigurationError):
         reference_content.validate_yaml()
 
+    # invalid number of workers loading indexes
+    reference_content = ReferenceContent({"index_load_workers": 0})
+    with pytest.raises(
+        InvalidConfigurationError, match="index_load_workers must be positive"
+    ):
+        reference_content.validate_yaml()
+
+    # invalid interval of checking index directories
+    reference_content = ReferenceContent({"index_reload_interval": -1})
+    with pytest.raises(
+        InvalidConfigurationError, match="index_reload_interval must not be negative"
+    ):
+        reference_content.validate_yaml()
+
+
+def test_reference_content_yaml_validation_reranker(tmp_path):
+    """Test the ReferenceContent YAML validation of reranker."""
+    reference_content = ReferenceContent(
+        {"reranker": {"model_path": str(tmp_path), "onnx_file": "model.onnx"}}
+    )
+    with pytest.raises(
+        InvalidConfigurationError, match=r"Reranker model ONNX file '.+' is not a file"
+    ):
+        reference_content.validate_yaml()
+
+    (tmp_path / "model.onnx").touch()
+    reference_content.validate_yaml()
+
+    reference_content.reranker.model_path = str(tmp_path / "missing")
+    with pytest.raises(
+        InvalidConfigurationError, match=r"Reranker model path '.+' does not exist"
+    ):
+        reference_content.validate_yaml()
+
+
+def test_reranker_config():
+    """Test the RerankerConfig model."""
+    with pytest.raises(ValidationError):
+        RerankerConfig()
+    with pytest.raises(ValidationError):
+        RerankerConfig(model_path="model", top_n=0)
+    with pytest.raises(ValidationError):
+        RerankerConfig(model_path="model", timeout=0)
+
+
+def test_hybrid_retrieval_config():
+    """Test the HybridRetrievalConfig model."""
+    with pytest.raises(ValidationError):
+        HybridRetrievalConfig(dense_weight=-1)
+    with pytest.raises(ValidationError):
+        HybridRetrievalConfig(sparse_weight=-0.5)
+    with pytest.raises(ValidationError):
+        HybridRetrievalConfig(rrf_k=0)
+
+
+def test_reference_content_yaml_validation_embeddings_backend(tmp_path):
+    """Test the ReferenceContent YAML validation of embeddings backend."""
+    (tmp_path / "onnx").mkdir()
+    (tmp_path / "onnx" / "model_qint8_avx2.onnx").touch()
+
+    reference_content = ReferenceContent(
+        {"embeddings_model_path": str(tmp_path), "embeddings_backend": "onnx"}
+    )
+    # should not raise an exception
+    reference_content.validate_yaml()
+
+    reference_content.embeddings_backend = "tensorflow"
+    with pytest.raises(
+        InvalidConfigurationError, match="Invalid embeddings backend: tensorflow"
+    ):
+        reference_content.validate_yaml()
+
+    # ONNX export of model does not exist
+    reference_content.embeddings_backend = "onnx"
+    reference_content.embeddings_onnx_file = "onnx/model.onnx"
+    with pytest.raises(
+        InvalidConfigurationError,
+        match=r"Embeddings model ONNX file '.+' is not a file",
+    ):
+        reference_content.validate_yaml()
+
+    # model path is required
+    reference_content.embeddings_model_path = None
+    with pytest.raises(
+        InvalidConfigurationError, match="embeddings_model_path is required"
+    ):
+        reference_content.validate_yaml()
+
+    reference_content = ReferenceContent({"embeddings_onnx_threads": 0})
+    with pytest.raises(
+        InvalidConfigurationError, match="embeddings_onnx_threads must be positive"
+    ):
+        reference_content.validate_yaml()
+
 
 def test_reference_content_yaml_validation_fallback_to_default_dir(tmp_path):
     """Test the ReferenceContent YAML validation method fallback to default dir."""
@@ -3483,6 +3775,36 @@ def test_authentication_config_validation_k8s_ca_cert_path():
         )
 
 
+def test_authentication_config_review_cache():
+    """Test method to validate settings of review outcomes cache."""
+    cfg = AuthenticationConfig(module=constants.DEFAULT_AUTHENTICATION_MODULE)
+    assert cfg.review_cache_ttl == constants.K8S_AUTH_CACHE_TTL
+    assert cfg.review_cache_negative_ttl == constants.K8S_AUTH_CACHE_NEGATIVE_TTL
+    assert cfg.review_cache_max_entries == constants.K8S_AUTH_CACHE_MAX_ENTRIES
+    cfg.validate_yaml()
+
+    # zero TTL disables the cache
+    AuthenticationConfig(
+        module=constants.DEFAULT_AUTHENTICATION_MODULE,
+        review_cache_ttl=0,
+        review_cache_negative_ttl=0,
+    ).validate_yaml()
+
+    for settings, message in (
+        ({"review_cache_ttl": -1}, "review_cache_ttl can not be negative"),
+        (
+            {"review_cache_negative_ttl": -1},
+            "review_cache_negative_ttl can not be negative",
+        ),
+        ({"review_cache_max_entries": 0}, "review_cache_max_entries must be positive"),
+    ):
+        cfg = AuthenticationConfig(
+            module=constants.DEFAULT_AUTHENTICATION_MODULE, **settings
+        )
+        with pytest.raises(InvalidConfigurationError, match=message):
+            cfg.validate_yaml()
+
+
 def test_user_data_config__feedback(tmpdir):
     """Tests the UserDataCollection model, feedback part."""
     # valid configuration
@@ -23,7 +23,7 @@ from ols.app.models.models import (
     SummarizerResponse,
     ToolCall,
 )
-from ols.constants import MEDIA_TYPE_JSON, MEDIA_TYPE_TEXT
+from ols.constants import MEDIA_TYPE_JSON, MEDIA_TYPE_TEXT, MESSAGE_TOKEN_COUNT_KEY
 from ols.utils import suid
 
 
@@ -506,6 +506,48 @@ class TestCacheEntry:
             AIMessage(""),
         ]
 
+    @staticmethod
+    def test_token_counts():
+        """Test that token counts survive conversion to dictionary and back."""
+        cache_entry = CacheEntry(
+            query=HumanMessage("query"),
+            response=AIMessage("response"),
+            query_token_count=3,
+            response_token_count=4,
+        )
+        assert cache_entry.token_counts() == {
+            "query_token_count": 3,
+            "response_token_count": 4,
+        }
+        assert CacheEntry.from_dict(cache_entry.to_dict()) == cache_entry
+
+        decoded = json.loads(
+            json.dumps(cache_entry, cls=MessageEncoder), cls=MessageDecoder
+        )
+        assert decoded.query_token_count == 3
+        assert decoded.response_token_count == 4
+
+        # unknown counts are not stored
+        assert CacheEntry(query=HumanMessage("query")).token_counts() == {}
+
+    @staticmethod
+    def test_cache_entries_to_history_token_counts():
+        """Test token counts are passed to history messages."""
+        cache_entries = [
+            CacheEntry(
+                query=HumanMessage("query"),
+                response=AIMessage("response"),
+                query_token_count=3,
+                response_token_count=4,
+            ),
+            CacheEntry(query=HumanMessage("query2"), response=AIMessage("response2")),
+        ]
+        history = CacheEntry.cache_entries_to_history(cache_entries)
+        assert history[0].response_metadata[MESSAGE_TOKEN_COUNT_KEY] == 3
+        assert history[1].response_metadata[MESSAGE_TOKEN_COUNT_KEY] == 4
+        assert MESSAGE_TOKEN_COUNT_KEY not in history[2].response_metadata
+        assert MESSAGE_TOKEN_COUNT_KEY not in history[3].response_metadata
+
     @staticmethod
     def test_cache_entries_to_history_no_response():
         """Test no AI response is handled."""
@@ -15,6 +15,9 @@ from ols.src.auth.k8s import (
     AuthDependency,
     ClusterIDUnavailableError,
     K8sClientSingleton,
+    ReviewCache,
+    ReviewOutcome,
+    review_cache,
 )
 from tests.mock_classes.mock_k8s_api import (
     MockK8sResponseStatus,
@@ -146,6 +149,150 @@ async def test_cluster_id_is_used_for_kube_admin():
         assert token == "valid-token"  # noqa: S105
 
 
+def _request(token):
+    """Construct request with given bearer token."""
+    return Request(
+        scope={
+            "type": "http",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+        }
+    )
+
+
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+async def test_auth_dependency_caches_review_outcome():
+    """Test that reviews are not repeated for the same token and path."""
+    with (
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authn_api") as mock_authn_api,
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authz_api") as mock_authz_api,
+    ):
+        mock_authn_api.return_value.create_token_review.side_effect = (
+            mock_token_review_response
+        )
+        mock_authz_api.return_value.create_subject_access_review.side_effect = (
+            mock_subject_access_review_response
+        )
+
+        for _ in range(3):
+            user_uid, username, _, token = await auth_dependency(
+                _request("valid-token")
+            )
+            assert user_uid == "valid-uid"
+            assert username == "valid-user"
+            assert token == "valid-token"  # noqa: S105
+
+        mock_authn_api.return_value.create_token_review.assert_called_once()
+        mock_authz_api.return_value.create_subject_access_review.assert_called_once()
+
+        # other virtual path needs its own SubjectAccessReview
+        await AuthDependency(virtual_path="/ols-metrics-access")(
+            _request("valid-token")
+        )
+        assert mock_authz_api.return_value.create_subject_access_review.call_count == 2
+
+    # raw token is not stored in the cache
+    assert len(review_cache) == 2
+    for key in review_cache._entries:
+        assert "valid-token" not in key
+
+
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+async def test_auth_dependency_caches_rejected_token():
+    """Test that rejected tokens are cached too."""
+    with (
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authn_api") as mock_authn_api,
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authz_api") as mock_authz_api,
+    ):
+        mock_authn_api.return_value.create_token_review.side_effect = (
+            mock_token_review_response
+        )
+
+        for _ in range(2):
+            with pytest.raises(HTTPException) as exc_info:
+                await auth_dependency(_request("invalid-token"))
+            assert exc_info.value.status_code == 403
+            assert exc_info.value.detail == "Forbidden: Invalid or expired token"
+
+        mock_authn_api.return_value.create_token_review.assert_called_once()
+        mock_authz_api.return_value.create_subject_access_review.assert_not_called()
+
+
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+async def test_auth_dependency_does_not_cache_api_errors():
+    """Test that failed SubjectAccessReview calls are not cached."""
+    with (
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authn_api") as mock_authn_api,
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authz_api") as mock_authz_api,
+    ):
+        mock_authn_api.return_value.create_token_review.side_effect = (
+            mock_token_review_response
+        )
+        mock_authz_api.return_value.create_subject_access_review.side_effect = (
+            ApiException()
+        )
+
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                await auth_dependency(_request("valid-token"))
+
+        assert mock_authz_api.return_value.create_subject_access_review.call_count == 2
+    assert len(review_cache) == 0
+
+
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+async def test_auth_dependency_review_cache_disabled():
+    """Test that zero TTL disables caching of review outcomes."""
+    config.ols_config.authentication_config.review_cache_ttl = 0
+    with (
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authn_api") as mock_authn_api,
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authz_api") as mock_authz_api,
+    ):
+        mock_authn_api.return_value.create_token_review.side_effect = (
+            mock_token_review_response
+        )
+        mock_authz_api.return_value.create_subject_access_review.side_effect = (
+            mock_subject_access_review_response
+        )
+
+        await auth_dependency(_request("valid-token"))
+        await auth_dependency(_request("valid-token"))
+
+        assert mock_authn_api.return_value.create_token_review.call_count == 2
+
+
+def test_review_cache_expiration_and_eviction():
+    """Test that cached outcomes expire and least recently used ones are evicted."""
+    cache = ReviewCache()
+    outcome = ReviewOutcome(user_id="uid", username="user")
+
+    with patch("ols.src.auth.k8s.time.monotonic", return_value=100.0):
+        cache.put(cache.key("a", "/p"), outcome, ttl=10, max_entries=2)
+        cache.put(cache.key("b", "/p"), outcome, ttl=10, max_entries=2)
+        # touch "a", so "b" is the least recently used one
+        assert cache.get(cache.key("a", "/p")) is outcome
+        cache.put(cache.key("c", "/p"), outcome, ttl=10, max_entries=2)
+        assert cache.get(cache.key("b", "/p")) is None
+        assert cache.get(cache.key("c", "/p")) is outcome
+
+    with patch("ols.src.auth.k8s.time.monotonic", return_value=110.0):
+        assert cache.get(cache.key("a", "/p")) is None
+        assert len(cache) == 1
+
+
+def test_review_outcome():
+    """Test that rejected outcome raises HTTP exception."""
+    ReviewOutcome(user_id="uid", username="user").raise_for_status()
+
+    with pytest.raises(HTTPException) as exc_info:
+        ReviewOutcome(status_code=403, detail="Forbidden").raise_for_status()
+    assert exc_info.value.status_code == 403
+    assert exc_info.value.detail == "Forbidden"
+
+
 @pytest.mark.usefixtures("_setup")
 def test_auth_dependency_config():
     """Test the auth dependency can load kubeconfig file."""
@@ -39,6 +39,21 @@ def test_insert_or_append(cache):
     assert cache.get(constants.DEFAULT_USER_UID, conversation_id) == [cache_entry_1]
 
 
+def test_insert_or_append_token_counts(cache):
+    """Test that token counts are stored together with messages."""
+    cache_entry = CacheEntry(
+        query=HumanMessage("user message"),
+        response=AIMessage("ai message"),
+        query_token_count=4,
+        response_token_count=5,
+    )
+    cache.insert_or_append(constants.DEFAULT_USER_UID, conversation_id, cache_entry)
+
+    stored = cache.get(constants.DEFAULT_USER_UID, conversation_id)[0]
+    assert stored.query_token_count == 4
+    assert stored.response_token_count == 5
+
+
 def test_insert_or_append_skip_user_id_check(cache):
     """Test the behavior of insert_or_append method."""
     skip_user_id_check = True
@@ -128,6 +143,54 @@ def test_insert_or_append_eviction(cache):
     )
 
 
+def test_get_refreshes_lru_order(cache):
+    """Test that reading a conversation protects it from being evicted first."""
+    # remove last hex digit from user UUID
+    user_name_prefix = constants.DEFAULT_USER_UID[:-1]
+
+    capacity = 3
+    cache.capacity = capacity
+    for i in range(capacity):
+        cache.insert_or_append(
+            f"{user_name_prefix}{i}",
+            conversation_id,
+            CacheEntry(query=HumanMessage(f"user query {i}")),
+        )
+
+    # touch the least recently used conversation
+    assert cache.get(f"{user_name_prefix}0", conversation_id) is not None
+
+    cache.insert_or_append(
+        f"{user_name_prefix}{capacity}",
+        conversation_id,
+        CacheEntry(query=HumanMessage(f"user query {capacity}")),
+    )
+
+    # conversation 1 is now the least recently used one and has been evicted
+    assert cache.get(f"{user_name_prefix}1", conversation_id) is None
+    assert cache.get(f"{user_name_prefix}0", conversation_id) == [
+        CacheEntry(query=HumanMessage("user query 0"))
+    ]
+    assert cache.total_entries == capacity
+
+
+def test_get_limit(cache):
+    """Test that only the last entries are returned when limit is specified."""
+    cache.insert_or_append(constants.DEFAULT_USER_UID, conversation_id, cache_entry_1)
+    cache.insert_or_append(constants.DEFAULT_USER_UID, conversation_id, cache_entry_2)
+
+    assert cache.get(constants.DEFAULT_USER_UID, conversation_id, limit=1) == [
+        cache_entry_2
+    ]
+    assert cache.get(constants.DEFAULT_USER_UID, conversation_id, limit=0) == []
+    assert cache.get(constants.DEFAULT_USER_UID, conversation_id, limit=5) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+    # limited read does not remove older entries
+    assert len(cache.get(constants.DEFAULT_USER_UID, conversation_id)) == 2
+
+
 def test_get_nonexistent_user(cache):
     """Test how non-existent items are handled by the cache."""
     # this UUID is different from DEFAULT_USER_UID
@@ -248,6 +311,53 @@ def test_list_conversations_metadata(cache):
     assert conv_data.last_message_timestamp > 0
 
 
+def test_list_conversations_ordering(cache):
+    """Test that conversations are listed from the most recently updated one."""
+    conversation_ids = [suid.get_suid() for _ in range(3)]
+    for conv_id in conversation_ids:
+        cache.insert_or_append(constants.DEFAULT_USER_UID, conv_id, cache_entry_1)
+
+    # update the oldest conversation
+    cache.insert_or_append(
+        constants.DEFAULT_USER_UID, conversation_ids[0], cache_entry_2
+    )
+
+    conversations = cache.list(constants.DEFAULT_USER_UID)
+    assert [c.conversation_id for c in conversations] == [
+        conversation_ids[0],
+        conversation_ids[2],
+        conversation_ids[1],
+    ]
+    timestamps = [c.last_message_timestamp for c in conversations]
+    assert timestamps == sorted(timestamps, reverse=True)
+
+
+def test_list_after_eviction(cache):
+    """Test that evicted conversations are not listed anymore."""
+    cache.capacity = 2
+    conversation_ids = [suid.get_suid() for _ in range(3)]
+    for conv_id in conversation_ids:
+        cache.insert_or_append(constants.DEFAULT_USER_UID, conv_id, cache_entry_1)
+
+    conversations = cache.list(constants.DEFAULT_USER_UID)
+    assert [c.conversation_id for c in conversations] == [
+        conversation_ids[2],
+        conversation_ids[1],
+    ]
+
+
+def test_list_other_user_conversations(cache):
+    """Test that conversations of other users are not listed."""
+    other_user_id = "ffffffff-ffff-ffff-ffff-ffffffffffff"
+    conv_id = suid.get_suid()
+
+    cache.insert_or_append(constants.DEFAULT_USER_UID, conv_id, cache_entry_1)
+    cache.insert_or_append(other_user_id, suid.get_suid(), cache_entry_2)
+
+    conversations = cache.list(constants.DEFAULT_USER_UID)
+    assert [c.conversation_id for c in conversations] == [conv_id]
+
+
 def test_set_topic_summary(cache):
     """Test setting topic summary for a conversation."""
     conv_id = suid.get_suid()
@@ -1,12 +1,13 @@
 """Unit tests for PostgresCache class."""
 
 import json
-from unittest.mock import MagicMock, call, patch
+from unittest.mock import MagicMock, PropertyMock, call, patch
 
 import psycopg2
 import pytest
 from langchain_core.messages import AIMessage, HumanMessage
 
+from ols import constants
 from ols.app.models.config import PostgresConfig
 from ols.app.models.models import CacheEntry, MessageDecoder, MessageEncoder
 from ols.src.cache.cache_error import CacheError
@@ -63,10 +64,8 @@ def test_get_operation_on_empty_cache():
     assert conversation == []
 
     # multiple DB operations must be performed:
-    # 1. check if connection to DB is alive
-    # 2. select conversation from DB
+    # 1. select conversation from DB
     calls = [
-        call("SELECT 1"),
         call(
             PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
             (user_id, conversation_id),
@@ -99,10 +98,8 @@ def test_get_operation_invalid_value():
             cache.get(user_id, conversation_id)
 
     # multiple DB operations must be performed:
-    # 1. check if connection to DB is alive
-    # 2. select conversation from DB
+    # 1. select conversation from DB
     calls = [
-        call("SELECT 1"),
         call(
             PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
             (user_id, conversation_id),
@@ -142,10 +139,8 @@ def test_get_operation_valid_value():
     assert cache.get(user_id, conversation_id) == history
 
     # multiple DB operations must be performed:
-    # 1. check if connection to DB is alive
-    # 2. select conversation from DB
+    # 1. select conversation from DB
     calls = [
-        call("SELECT 1"),
         call(
             PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
             (user_id, conversation_id),
@@ -157,6 +152,32 @@ def test_get_operation_valid_value():
     mock_cursor.fetchone.assert_called_once()
 
 
+def test_get_operation_token_counts():
+    """Test that token counts stored with conversation are returned by Cache.get."""
+    history = [
+        CacheEntry(
+            query=HumanMessage("user message"),
+            response=AIMessage("ai message"),
+            query_token_count=4,
+            response_token_count=5,
+        )
+    ]
+    conversation = json.dumps([ce.to_dict() for ce in history], cls=MessageEncoder)
+
+    mock_cursor = MagicMock()
+    mock_cursor.fetchone.return_value = (memoryview(bytearray(conversation, "utf-8")),)
+
+    with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = (
+            mock_cursor
+        )
+        cache = PostgresCache(PostgresConfig())
+
+    cache_entry = cache.get(user_id, conversation_id)[0]
+    assert cache_entry.query_token_count == 4
+    assert cache_entry.response_token_count == 5
+
+
 def test_get_operation_on_exception():
     """Test the Cache.get operation when exception is thrown."""
     # mock the query
@@ -194,11 +215,10 @@ def test_get_operation_on_disconnected_db():
         config = PostgresConfig()
         cache = PostgresCache(config)
         # simulate DB disconnection
-        cache.connection = None
-        assert not cache.connected()
+        cache.connection_pool.close()
         # DB operation should connect automatically
         cache.get(user_id, conversation_id)
-        assert cache.connected()
+        assert mock_connect.call_count == 2
 
     calls = [
         call(
@@ -343,11 +363,10 @@ def test_insert_or_append_operation_on_disconnected_db():
         config = PostgresConfig()
         cache = PostgresCache(config)
         # simulate DB disconnection
-        cache.connection = None
-        assert not cache.connected()
+        cache.connection_pool.close()
         # DB operation should connect automatically
         cache.insert_or_append(user_id, conversation_id, cache_entry_1)
-        assert cache.connected()
+        assert mock_connect.call_count == 2
 
     # multiple DB operations must be performed:
     calls = [
@@ -364,7 +383,6 @@ def test_insert_or_append_operation_on_disconnected_db():
             (user_id, conversation_id),
         ),
         call(PostgresCache.QUERY_TOTAL_ENTRIES),
-        call("SELECT 1"),
     ]
     mock_cursor.execute.assert_has_calls(calls, any_order=False)
 
@@ -406,10 +424,8 @@ def test_list_operation():
     assert result[2].conversation_id == "conversation_3"
 
     # multiple DB operations must be performed:
-    # 1. check if connection to DB is alive
-    # 2. list conversations from DB
+    # 1. list conversations from DB
     calls = [
-        call("SELECT 1"),
         call(PostgresCache.LIST_CONVERSATIONS_STATEMENT, (user_id,)),
     ]
     mock_cursor.execute.assert_has_calls(calls, any_order=False)
@@ -456,11 +472,10 @@ def test_list_operation_on_disconnected_db():
         config = PostgresConfig()
         cache = PostgresCache(config)
         # simulate DB disconnection
-        cache.connection = None
-        assert not cache.connected()
+        cache.connection_pool.close()
         # DB operation should connect automatically
         cache.list(user_id)
-        assert cache.connected()
+        assert mock_connect.call_count == 2
 
     # one DB operation must be performed:
     # 1. list conversations from DB
@@ -489,10 +504,8 @@ def test_set_topic_summary_operation():
         cache.set_topic_summary(user_id, conversation_id, "Test Topic Summary")
 
     # multiple DB operations must be performed:
-    # 1. check if connection to DB is alive
-    # 2. upsert topic summary
+    # 1. upsert topic summary
     calls = [
-        call("SELECT 1"),
         call(
             PostgresCache.INSERT_OR_UPDATE_TOPIC_SUMMARY_STATEMENT,
             (user_id, conversation_id, "Test Topic Summary"),
@@ -503,11 +516,9 @@ def test_set_topic_summary_operation():
 
 def test_set_topic_summary_operation_on_exception():
     """Test the Cache.set_topic_summary operation when an exception is raised."""
-    # Mock the database cursor behavior to raise an exception on the second execute call
-    # (first call is "SELECT 1" for connection check)
+    # Mock the database cursor behavior to raise an exception on execute call
     mock_cursor = MagicMock()
     mock_cursor.execute.side_effect = [
-        None,  # SELECT 1 succeeds
         psycopg2.DatabaseError("PLSQL error"),  # actual operation fails
     ]
 
@@ -549,10 +560,8 @@ def test_delete_operation():
     assert result is True
 
     # multiple DB operations must be performed:
-    # 1. check if connection to DB is alive
-    # 2. delete one conversation from DB
+    # 1. delete one conversation from DB
     calls = [
-        call("SELECT 1"),
         call(
             PostgresCache.DELETE_SINGLE_CONVERSATION_STATEMENT,
             (user_id, conversation_id),
@@ -584,10 +593,8 @@ def test_delete_operation_not_found():
     assert result is False
 
     # multiple DB operations must be performed:
-    # 1. check if connection to DB is alive
-    # 2. delete one conversation from DB
+    # 1. delete one conversation from DB
     calls = [
-        call("SELECT 1"),
         call(
             PostgresCache.DELETE_SINGLE_CONVERSATION_STATEMENT,
             (user_id, conversation_id),
@@ -613,7 +620,7 @@ def test_delete_operation_on_exception():
         cache = PostgresCache(config)
 
         # Verify that the exception is raised
-        with pytest.raises(psycopg2.DatabaseError, match="PLSQL error"):
+        with pytest.raises(CacheError, match="PLSQL error"):
             cache.delete(user_id, conversation_id)
 
 
@@ -633,11 +640,10 @@ def test_delete_operation_on_disconnected_db():
         config = PostgresConfig()
         cache = PostgresCache(config)
         # simulate DB disconnection
-        cache.connection = None
-        assert not cache.connected()
+        cache.connection_pool.close()
         # DB operation should connect automatically
         cache.delete(user_id, conversation_id)
-        assert cache.connected()
+        assert mock_connect.call_count == 2
 
     # one DB operations must be performed:
     # 1. delete one conversation from DB
@@ -665,64 +671,272 @@ def test_cleanup_method_when_clean_not_needed():
 
 
 def test_cleanup_method_when_clean_performed():
-    """Test the static method that cleans up PG cache by evicting one message."""
-    # Prepare mock data for eviction: a conversation with 2 messages
-    value = [cache_entry_1.to_dict(), cache_entry_2.to_dict()]
-    conversation = json.dumps(value, cls=MessageEncoder)
-    value_bytes = conversation.encode("utf-8")
-    row = (user_id, conversation_id, value_bytes)
+    """Test the static method that cleans up PG cache by evicting oldest messages."""
+    mock_cursor = MagicMock()
+    mock_cursor.fetchone.return_value = (1001,)
+    capacity = 1000  # Total 1001 > 1000, so evict 1 entry + 10% of capacity
+
+    # do not use real PostgreSQL instance
+    with patch("psycopg2.connect"):
+        PostgresCache._cleanup(mock_cursor, capacity)
+
+    # Verify the query executions: get total, evict oldest messages in one batch
+    calls = [
+        call(PostgresCache.QUERY_TOTAL_ENTRIES),
+        call(PostgresCache.TRIM_OLDEST_CONVERSATIONS_STATEMENT, (101, 101, 101)),
+    ]
+    mock_cursor.execute.assert_has_calls(calls, any_order=False)
+    assert mock_cursor.execute.call_count == 2
 
-    # After evicting the oldest message, the conversation has 1 message left
-    trimmed_value = [cache_entry_2.to_dict()]
-    trimmed_conversation = json.dumps(trimmed_value, cls=MessageEncoder)
-    trimmed_value_bytes = trimmed_conversation.encode("utf-8")
 
+def test_cleanup_method_small_capacity():
+    """Test that at least one entry over capacity is evicted for small capacity."""
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.side_effect = [(200,), row]
-    capacity = 199  # Total 200 > 199, so evict 1 message
+    mock_cursor.fetchone.return_value = (6,)
+    capacity = 5
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect"):
         PostgresCache._cleanup(mock_cursor, capacity)
 
-    # Verify the query executions: get total, get oldest row, update the trimmed conversation
+    mock_cursor.execute.assert_called_with(
+        PostgresCache.TRIM_OLDEST_CONVERSATIONS_STATEMENT, (2, 2, 2)
+    )
+
+
+def test_cleanup_method_no_statistics():
+    """Test the static method that cleans up PG cache when statistics are missing."""
+    mock_cursor = MagicMock()
+    mock_cursor.fetchone.return_value = None
+
+    # do not use real PostgreSQL instance
+    with patch("psycopg2.connect"):
+        PostgresCache._cleanup(mock_cursor, 1)
+
+    mock_cursor.execute.assert_called_once_with(PostgresCache.QUERY_TOTAL_ENTRIES)
+
+
+def test_init_cache_statistics():
+    """Test that cache statistics table and triggers are initialized."""
+    with patch("psycopg2.connect") as mock_connect:
+        PostgresCache(PostgresConfig())
+        mock_cursor = mock_connect.return_value.cursor.return_value
+
     calls = [
-        call(PostgresCache.QUERY_TOTAL_ENTRIES),
-        call(PostgresCache.SELECT_OLDEST_ROW),
-        call(
-            PostgresCache.UPDATE_CONVERSATION_HISTORY_STATEMENT,
-            (trimmed_value_bytes, user_id, conversation_id),
-        ),
+        call(PostgresCache.CREATE_CACHE_STATS_TABLE),
+        call(PostgresCache.CREATE_CACHE_STATS_FUNCTION),
+        call(PostgresCache.CREATE_CACHE_STATS_TRIGGERS),
+        call(PostgresCache.INITIALIZE_CACHE_STATS_STATEMENT),
     ]
     mock_cursor.execute.assert_has_calls(calls, any_order=False)
 
 
 def test_ready():
     """Test the Cache.ready operation."""
+    mock_cursor = MagicMock()
+
     # do not use real PostgreSQL instance
-    with patch("psycopg2.connect"):
+    with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = (
+            mock_cursor
+        )
+
         # initialize Postgres cache
         config = PostgresConfig()
         cache = PostgresCache(config)
 
-        # mock the connection state 0 - open
-        cache.connection.closed = 0
-        # patch the poll function to return POLL_OK
-        cache.connection.poll = MagicMock(return_value=psycopg2.extensions.POLL_OK)
-        # cache is ready
+        # connection is alive
         assert cache.ready()
 
-        # mock the connection state 1 - closed
-        cache.connection.closed = 1
-        # cache is not ready
-        assert not cache.ready()
-
         for error_type in (psycopg2.OperationalError, psycopg2.InterfaceError):
-            # mock the connection state 0 - open
-            cache.connection.closed = 0
-            # patch the poll function to raise OperationalError
-            cache.connection.poll = MagicMock(
-                side_effect=error_type("Connection closed")
-            )
+            # connection is broken and database can't be reached
+            mock_cursor.execute.side_effect = error_type("Connection closed")
+            mock_connect.side_effect = error_type("Connection refused")
             # cache is not ready
             assert not cache.ready()
+
+        # database is back online, new connection should be established
+        mock_cursor.execute.side_effect = None
+        mock_connect.side_effect = None
+        assert cache.ready()
+
+
+def prepare_messages_cache(mock_cursor):
+    """Initialize Postgres cache in messages schema mode with mocked cursor."""
+    with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = (
+            mock_cursor
+        )
+        config = PostgresConfig(schema_mode=constants.POSTGRES_CACHE_SCHEMA_MESSAGES)
+        return PostgresCache(config)
+
+
+def test_init_messages_schema_migrates_legacy_cache():
+    """Test that legacy conversations are migrated when messages schema is used."""
+    mock_cursor = MagicMock()
+    # first batch migrates 3 messages, the second one finds nothing
+    type(mock_cursor).rowcount = PropertyMock(side_effect=[3, 0])
+
+    with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = (
+            mock_cursor
+        )
+        mock_cursor_init = mock_connect.return_value.cursor.return_value
+        config = PostgresConfig(schema_mode=constants.POSTGRES_CACHE_SCHEMA_MESSAGES)
+        PostgresCache(config)
+
+    mock_cursor_init.execute.assert_any_call(PostgresCache.CREATE_CACHE_MESSAGES_TABLE)
+    mock_cursor_init.execute.assert_any_call(
+        PostgresCache.CREATE_CACHE_MESSAGES_SEQUENCE
+    )
+    mock_cursor_init.execute.assert_any_call(PostgresCache.CREATE_CACHE_MESSAGES_INDEX)
+    calls = [
+        call(
+            PostgresCache.MIGRATE_CONVERSATIONS_BATCH_STATEMENT,
+            (constants.POSTGRES_CACHE_MIGRATION_BATCH_SIZE,),
+        ),
+        call(
+            PostgresCache.MIGRATE_CONVERSATIONS_BATCH_STATEMENT,
+            (constants.POSTGRES_CACHE_MIGRATION_BATCH_SIZE,),
+        ),
+    ]
+    mock_cursor.execute.assert_has_calls(calls, any_order=False)
+
+
+def test_get_operation_messages_schema():
+    """Test the Cache.get operation in messages schema mode."""
+    rows = [
+        (memoryview(bytearray(json.dumps(ce.to_dict(), cls=MessageEncoder), "utf-8")),)
+        for ce in (cache_entry_1, cache_entry_2)
+    ]
+    mock_cursor = MagicMock()
+    mock_cursor.rowcount = 0
+    mock_cursor.fetchall.return_value = rows
+    cache = prepare_messages_cache(mock_cursor)
+
+    assert cache.get(user_id, conversation_id, limit=2) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+
+    mock_cursor.execute.assert_called_with(
+        PostgresCache.SELECT_LAST_MESSAGES_STATEMENT, (user_id, conversation_id, 2)
+    )
+
+
+def test_get_operation_messages_schema_migrates_conversation():
+    """Test that legacy conversation is migrated when it is read."""
+    row = (
+        memoryview(
+            bytearray(json.dumps(cache_entry_1.to_dict(), cls=MessageEncoder), "utf-8")
+        ),
+    )
+    mock_cursor = MagicMock()
+    mock_cursor.rowcount = 0
+    cache = prepare_messages_cache(mock_cursor)
+
+    mock_cursor.rowcount = 1
+    mock_cursor.fetchall.side_effect = [[], [row]]
+
+    assert cache.get(user_id, conversation_id) == [cache_entry_1]
+
+    calls = [
+        call(
+            PostgresCache.SELECT_LAST_MESSAGES_STATEMENT,
+            (user_id, conversation_id, None),
+        ),
+        call(PostgresCache.MIGRATE_CONVERSATION_STATEMENT, (user_id, conversation_id)),
+        call(
+            PostgresCache.SELECT_LAST_MESSAGES_STATEMENT,
+            (user_id, conversation_id, None),
+        ),
+    ]
+    mock_cursor.execute.assert_has_calls(calls, any_order=False)
+
+
+def test_get_operation_messages_schema_empty():
+    """Test the Cache.get operation in messages schema mode on empty cache."""
+    mock_cursor = MagicMock()
+    mock_cursor.rowcount = 0
+    mock_cursor.fetchall.return_value = []
+    cache = prepare_messages_cache(mock_cursor)
+
+    assert cache.get(user_id, conversation_id) == []
+
+
+def test_get_operation_blob_schema_limit():
+    """Test the Cache.get operation with limit in blob schema mode."""
+    history = [cache_entry_1, cache_entry_2]
+    conversation = json.dumps([ce.to_dict() for ce in history], cls=MessageEncoder)
+    mock_cursor = MagicMock()
+    mock_cursor.fetchone.return_value = (memoryview(bytearray(conversation, "utf-8")),)
+
+    with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = (
+            mock_cursor
+        )
+        cache = PostgresCache(PostgresConfig())
+
+    assert cache.get(user_id, conversation_id, limit=1) == [cache_entry_2]
+    assert cache.get(user_id, conversation_id, limit=0) == []
+
+
+def test_insert_or_append_operation_messages_schema():
+    """Test the Cache.insert_or_append operation in messages schema mode."""
+    mock_cursor = MagicMock()
+    mock_cursor.rowcount = 0
+    mock_cursor.fetchone.return_value = (10,)
+    cache = prepare_messages_cache(mock_cursor)
+    cache.capacity = 8
+
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+
+    value = json.dumps(cache_entry_1.to_dict(), cls=MessageEncoder).encode("utf-8")
+    calls = [
+        call(
+            PostgresCache.APPEND_MESSAGE_STATEMENT,
+            (user_id, conversation_id, value),
+        ),
+        call(PostgresCache.QUERY_TOTAL_ENTRIES),
+        call(PostgresCache.DELETE_OLDEST_MESSAGES_STATEMENT, (3,)),
+    ]
+    mock_cursor.execute.assert_has_calls(calls, any_order=False)
+
+
+def test_insert_or_append_operation_messages_schema_on_exception():
+    """Test the Cache.insert_or_append operation in messages schema on exception."""
+    mock_cursor = MagicMock()
+    mock_cursor.rowcount = 0
+    cache = prepare_messages_cache(mock_cursor)
+    mock_cursor.execute.side_effect = [
+        psycopg2.DatabaseError("PLSQL error"),
+    ]
+
+    with pytest.raises(CacheError, match="PLSQL error"):
+        cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+
+
+def test_delete_operation_messages_schema():
+    """Test the Cache.delete operation in messages schema mode."""
+    mock_cursor = MagicMock()
+    mock_cursor.rowcount = 0
+    cache = prepare_messages_cache(mock_cursor)
+    type(mock_cursor).rowcount = PropertyMock(side_effect=[0, 2])
+
+    assert cache.delete(user_id, conversation_id) is True
+
+    calls = [
+        call(
+            PostgresCache.DELETE_SINGLE_CONVERSATION_STATEMENT,
+            (user_id, conversation_id),
+        ),
+        call(
+            PostgresCache.DELETE_CONVERSATION_MESSAGES_STATEMENT,
+            (user_id, conversation_id),
+        ),
+        call(
+            PostgresCache.DELETE_CONVERSATION_METADATA_STATEMENT,
+            (user_id, conversation_id),
+        ),
+    ]
+    mock_cursor.execute.assert_has_calls(calls, any_order=False)
@@ -3,9 +3,49 @@
 import pytest
 
 from ols import config
+from ols.src.auth.k8s import review_cache
+from ols.src.rag_index.index_loader import query_embedding_cache
+from ols.src.rag_index.retrieval_cache import retrieval_cache
+from ols.utils.connection_pool import close_connection_pools
+from ols.utils.mcp_utils import mcp_tools_cache
 
 
 @pytest.fixture(scope="function", autouse=True)
 def ensure_empty_config_for_each_unit_test_by_default():
     """Set up fixture for all unit tests."""
     config.reload_empty()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def ensure_no_shared_connection_pools():
+    """Do not share connection pools (with mocked connections) between unit tests."""
+    yield
+    close_connection_pools()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def ensure_empty_mcp_tools_cache():
+    """Do not share MCP tools (listed by mocked clients) between unit tests."""
+    yield
+    mcp_tools_cache.clear()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def ensure_empty_k8s_review_cache():
+    """Do not share K8S review outcomes (made by mocked APIs) between unit tests."""
+    yield
+    review_cache.clear()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def ensure_empty_query_embedding_cache():
+    """Do not share query embeddings (made by mocked models) between unit tests."""
+    yield
+    query_embedding_cache.clear()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def ensure_empty_retrieval_cache():
+    """Do not share retrieval results (from mocked indexes) between unit tests."""
+    yield
+    retrieval_cache.clear()
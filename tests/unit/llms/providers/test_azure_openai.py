@@ -10,8 +10,9 @@ from azure.core.credentials import AccessToken
 from langchain_openai import AzureChatOpenAI
 from pydantic import AnyHttpUrl
 
-from ols import constants
-from ols.app.models.config import AzureOpenAIConfig, ProviderConfig
+from ols import config, constants
+from ols.app.models.config import AzureOpenAIConfig, LLMProviders, ProviderConfig
+from ols.src.llms.llm_loader import load_llm
 from ols.src.llms.providers.azure_openai import (
     TOKEN_EXPIRATION_LEEWAY,
     AzureOpenAI,
@@ -565,6 +566,49 @@ def test_token_is_reused(provider_config):
         assert access_token == token_cache.access_token  # cache is updated
 
 
+def test_loaded_llm_is_loaded_again_when_token_expires():
+    """Test that cached LLM does not keep using expired AD token."""
+    now = time.time()
+    tokens = [
+        AccessToken(token="first_token", expires_on=int(now) + 3600),  # noqa: S106
+        AccessToken(token="second_token", expires_on=int(now) + 7200),  # noqa: S106
+    ]
+    config.config.llm_providers = LLMProviders(
+        [
+            {
+                "name": "azure",
+                "type": "azure_openai",
+                "url": "http://azure.com",
+                "deployment_name": "test_deployment_name",
+                "azure_openai_config": {
+                    "url": "http://azure.com",
+                    "deployment_name": "azure_deployment_name",
+                    "credentials_path": "tests/config/"
+                    "secret_azure_tenant_id_client_id_client_secret",
+                },
+                "models": [{"name": "test_model_name"}],
+            }
+        ]
+    )
+
+    with (
+        patch(
+            "ols.src.llms.providers.azure_openai.AzureOpenAI.retrieve_access_token",
+            side_effect=tokens,
+        ),
+        patch("ols.src.llms.providers.azure_openai.TOKEN_CACHE", new=TokenCache()),
+    ):
+        llm = load_llm("azure", "test_model_name")
+        assert llm.azure_ad_token.get_secret_value() == "first_token"
+        # LLM is reused while the token is valid
+        assert load_llm("azure", "test_model_name") is llm
+
+        with patch("time.time", return_value=now + 3600):
+            reloaded_llm = load_llm("azure", "test_model_name")
+        assert reloaded_llm is not llm
+        assert reloaded_llm.azure_ad_token.get_secret_value() == "second_token"
+
+
 @pytest.mark.parametrize(
     "model_name,should_have_params",
     [
@@ -8,6 +8,7 @@ from langchain_core.language_models.fake_chat_models import FakeChatModel
 from ols import config, constants
 from ols.app.models.config import LLMProviders
 from ols.src.llms.llm_loader import (
+    LLMCache,
     LLMConfigurationError,
     ModelConfigMissingError,
     UnknownProviderError,
@@ -101,3 +102,90 @@ def test_load_llm_no_provider_config():
         match=f"Providers configuration missing in {constants.DEFAULT_CONFIGURATION_FILE}",
     ):
         load_llm(provider="fake-provider", model="model")
+
+
+@pytest.mark.usefixtures("_registered_fake_provider")
+def test_load_llm_cached():
+    """Test that loaded LLMs are reused until the configuration is reloaded."""
+    with patch("ols.constants.SUPPORTED_PROVIDER_TYPES", new=["fake-provider"]):
+        providers = LLMProviders(
+            [
+                {
+                    "name": "fake-provider",
+                    "type": "fake-provider",
+                    "models": [{"name": "model"}],
+                }
+            ]
+        )
+        config.config.llm_providers = providers
+
+        llm = load_llm(provider="fake-provider", model="model")
+        assert load_llm(provider="fake-provider", model="model") is llm
+
+        # different parameters -> different LLM instance
+        other_llm = load_llm(
+            provider="fake-provider", model="model", generic_llm_params={"foo": 1}
+        )
+        assert other_llm is not llm
+        assert (
+            load_llm(
+                provider="fake-provider", model="model", generic_llm_params={"foo": 1}
+            )
+            is other_llm
+        )
+
+        # configuration reload drops all loaded LLMs
+        config.config.llm_providers = LLMProviders(
+            [
+                {
+                    "name": "fake-provider",
+                    "type": "fake-provider",
+                    "models": [{"name": "model"}],
+                }
+            ]
+        )
+        assert load_llm(provider="fake-provider", model="model") is not llm
+
+
+def test_llm_cache_loads_outside_lock():
+    """Test that LLM is loaded without holding the cache lock."""
+    cache = LLMCache()
+    configuration = (object(),)
+    other = object()
+
+    def load():
+        # other LLM can be stored and read while this one is being loaded
+        assert cache.get_or_load("other", configuration, lambda: (other, None)) is other
+        return "llm", None
+
+    assert cache.get_or_load("key", configuration, load) == "llm"
+    assert cache.get_or_load("key", configuration, MagicMock()) == "llm"
+
+
+def test_llm_cache_keeps_first_stored_llm():
+    """Test that concurrently loaded LLM does not replace the stored one."""
+    cache = LLMCache()
+    configuration = (object(),)
+
+    def load():
+        # simulate other thread storing the same LLM during loading
+        cache.get_or_load("key", configuration, lambda: ("first", None))
+        return "second", None
+
+    assert cache.get_or_load("key", configuration, load) == "first"
+
+
+def test_llm_cache_loads_expired_llm_again():
+    """Test that LLM is loaded again when its credentials expire."""
+    cache = LLMCache()
+    configuration = (object(),)
+
+    with patch("ols.src.llms.llm_loader.time.time", return_value=100):
+        assert cache.get_or_load("key", configuration, lambda: ("llm", 200)) == "llm"
+        assert cache.get_or_load("key", configuration, MagicMock()) == "llm"
+
+    with patch("ols.src.llms.llm_loader.time.time", return_value=200):
+        assert (
+            cache.get_or_load("key", configuration, lambda: ("new llm", 300))
+            == "new llm"
+        )
@@ -1,19 +1,22 @@
 """Unit tests for DocsSummarizer class."""
 
+import asyncio
 import json
 import logging
 import re
+import time
 from math import ceil
-from unittest.mock import ANY, AsyncMock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 
 import pytest
 from langchain_core.messages import HumanMessage
 from langchain_core.messages.ai import AIMessageChunk
+from llama_index.core.schema import NodeWithScore, TextNode
 
 from ols import config
-from ols.app.models.config import MCPServerConfig, MCPServers
-from ols.constants import TOKEN_BUFFER_WEIGHT
-from ols.utils.token_handler import TokenHandler
+from ols.app.models.config import MCPServerConfig, MCPServers, RerankerConfig
+from ols.constants import RAG_CHUNK_SIMHASH_KEY, TOKEN_BUFFER_WEIGHT
+from ols.utils.token_handler import PromptTooLongError, TokenHandler
 from tests.mock_classes.mock_tools import mock_tools_map
 
 # needs to be setup there before is_user_authorized is imported
@@ -23,10 +26,15 @@ config.ols_config.authentication_config.module = "k8s"
 from ols.app.models.config import (  # noqa:E402
     LoggingConfig,
 )
+from ols.src.prompts.prompt_generator import GeneratePrompt  # noqa:E402
 from ols.src.query_helpers.docs_summarizer import (  # noqa:E402
     DocsSummarizer,
     QueryHelper,
+    prompt_template_token_count,
+    retrieve_nodes,
 )
+from ols.src.rag_index.near_duplicates import simhash  # noqa:E402
+from ols.src.rag_index.reranker import CrossEncoderReranker  # noqa:E402
 from ols.utils import suid  # noqa:E402
 from ols.utils.logging_configurator import configure_logging  # noqa:E402
 from tests import constants  # noqa:E402
@@ -34,6 +42,7 @@ from tests.mock_classes.mock_langchain_interface import (  # noqa:E402
     mock_langchain_interface,
 )
 from tests.mock_classes.mock_llm_loader import mock_llm_loader  # noqa:E402
+from tests.mock_classes.mock_retrieved_node import MockRetrievedNode  # noqa:E402
 from tests.mock_classes.mock_retrievers import MockRetriever  # noqa:E402
 
 conversation_id = suid.get_suid()
@@ -145,6 +154,161 @@ def test_summarize_truncation():
         assert summary.history_truncated
 
 
+def test_summarize_prompt_is_tokenized_by_parts():
+    """Test that the whole prompt is not tokenized to check available tokens."""
+    with (
+        patch("ols.utils.token_handler.RAG_SIMILARITY_CUTOFF", 0.4),
+        patch(
+            "ols.src.query_helpers.docs_summarizer.TokenHandler"
+            ".calculate_and_check_available_tokens"
+        ) as calculate_and_check_available_tokens,
+    ):
+        # chunk has to be longer than the minimum context token limit
+        rag_retriever = MagicMock(spec=["retrieve"])
+        rag_retriever.retrieve.return_value = [
+            MockRetrievedNode(
+                {
+                    "text": "Kubernetes is an open source container orchestration "
+                    "engine for automating deployment and scaling.",
+                    "score": 0.6,
+                    "metadata": {
+                        "docs_url": f"{constants.OCP_DOCS_ROOT_URL}/"
+                        f"{constants.OCP_DOCS_VERSION}/docs/test.html",
+                        "title": "Docs Test",
+                    },
+                }
+            )
+        ]
+        summarizer = DocsSummarizer(llm_loader=mock_llm_loader(None))
+        question = "What's the ultimate question with answer 42?"
+        history = [HumanMessage("What is Kubernetes?")] * 10
+        summary = summarizer.create_response(question, rag_retriever, history)
+
+        calculate_and_check_available_tokens.assert_not_called()
+        assert len(summary.rag_chunks) == 1
+        assert not summary.history_truncated
+
+
+def test_retrieve_nodes_uses_cache():
+    """Test that retrieved and reranked nodes are cached by their IDs."""
+    nodes = [
+        NodeWithScore(node=TextNode(id_="1", text="first"), score=0.8),
+        NodeWithScore(node=TextNode(id_="2", text="second"), score=0.6),
+    ]
+    rag_retriever = MagicMock()
+    rag_retriever.index_generation = 1
+    rag_retriever.similarity_top_k = 5
+    rag_retriever.retrieve.return_value = nodes
+    rag_retriever.get_nodes.return_value = nodes
+
+    with patch(
+        "ols.src.query_helpers.docs_summarizer.reranker.rerank",
+        side_effect=lambda nodes, query: (nodes, True),
+    ) as rerank:
+        assert retrieve_nodes("How to scale?", rag_retriever) == nodes
+        # normalized query is answered from cache
+        assert retrieve_nodes("how to  scale?", rag_retriever) == nodes
+
+    rag_retriever.retrieve.assert_called_once_with("How to scale?")
+    rerank.assert_called_once()
+    rag_retriever.get_nodes.assert_called_once_with([("1", 0.8), ("2", 0.6)])
+
+    # results of other generation of indexes are not used
+    rag_retriever.index_generation = 2
+    retrieve_nodes("How to scale?", rag_retriever)
+    assert rag_retriever.retrieve.call_count == 2
+
+    # nodes that can't be found in indexes are retrieved again
+    rag_retriever.get_nodes.return_value = None
+    retrieve_nodes("How to scale?", rag_retriever)
+    assert rag_retriever.retrieve.call_count == 3
+
+
+def test_retrieve_nodes_does_not_cache_unreranked_nodes():
+    """Test that nodes are not cached when reranker keeps their original order."""
+    nodes = [
+        NodeWithScore(node=TextNode(id_="1", text="first"), score=0.8),
+        NodeWithScore(node=TextNode(id_="2", text="second"), score=0.6),
+    ]
+    rag_retriever = MagicMock()
+    rag_retriever.index_generation = 1
+    rag_retriever.similarity_top_k = 5
+    rag_retriever.retrieve.return_value = nodes
+    model = MagicMock()
+    model.predict.side_effect = lambda *args, **kwargs: time.sleep(0.5) or [0.1, 0.9]
+    timing_out_reranker = CrossEncoderReranker(
+        RerankerConfig(model_path="model", timeout=0.01)
+    )
+    timing_out_reranker._model = model
+
+    with patch(
+        "ols.src.rag_index.reranker.get_reranker", return_value=timing_out_reranker
+    ):
+        assert retrieve_nodes("How to scale?", rag_retriever) == nodes
+        assert retrieve_nodes("How to scale?", rag_retriever) == nodes
+
+    # reranking timed out, so nodes are retrieved and reranked again
+    assert rag_retriever.retrieve.call_count == 2
+    rag_retriever.get_nodes.assert_not_called()
+
+
+def test_retrieve_nodes_suppresses_near_duplicates():
+    """Test that near-duplicates are left out before reranking."""
+    text = "Pods are scheduled to nodes by the default scheduler of the cluster."
+    nodes = [
+        NodeWithScore(
+            node=TextNode(
+                id_=str(i), text=text, metadata={RAG_CHUNK_SIMHASH_KEY: simhash(text)}
+            ),
+            score=score,
+        )
+        for i, score in enumerate((0.8, 0.7))
+    ]
+    rag_retriever = MagicMock()
+    rag_retriever.index_generation = None
+    rag_retriever.retrieve.return_value = nodes
+
+    with patch(
+        "ols.src.query_helpers.docs_summarizer.reranker.rerank",
+        side_effect=lambda nodes, query: (nodes, True),
+    ) as rerank:
+        assert retrieve_nodes("How are pods scheduled?", rag_retriever) == nodes[:1]
+
+    rerank.assert_called_once_with(nodes[:1], query="How are pods scheduled?")
+
+
+def test_summarize_too_long_query():
+    """Test that too long query is detected without tokenizing the whole prompt."""
+    summarizer = DocsSummarizer(llm_loader=mock_llm_loader(None))
+    question = "What is Kubernetes? " * summarizer.model_config.context_window_size
+
+    with pytest.raises(PromptTooLongError):
+        summarizer.create_response(question)
+
+
+def test_prompt_template_token_count():
+    """Test that prompt template is tokenized once for the same arguments."""
+    prompt_template_token_count.cache_clear()
+    args = ("model", "You are a helpful assistant.", False)
+
+    with patch(
+        "ols.src.query_helpers.docs_summarizer.GeneratePrompt",
+        wraps=GeneratePrompt,
+    ) as generate_prompt:
+        count = prompt_template_token_count(*args, False, False)
+        assert prompt_template_token_count(*args, False, False) == count
+        assert generate_prompt.call_count == 1
+
+    # instructions for context and history are part of the template
+    with_context = prompt_template_token_count(*args, True, False)
+    with_history = prompt_template_token_count(*args, False, True)
+    assert with_context > count
+    assert with_history > count
+    assert prompt_template_token_count(*args, True, True) > max(
+        with_context, with_history
+    )
+
+
 def test_summarize_no_reference_content():
     """Basic test for DocsSummarizer using mocked index and query engine."""
     summarizer = DocsSummarizer(
@@ -535,6 +699,110 @@ async def test_gather_mcp_tools_empty_config():
         mock_client_instance.get_tools.assert_not_called()
 
 
+@pytest.mark.asyncio
+async def test_gather_mcp_tools_cached():
+    """Test gather_mcp_tools lists tools from each server only once."""
+    from ols.utils.mcp_utils import gather_mcp_tools
+
+    mcp_servers = {
+        "server_a": {"transport": "streamable_http", "url": "http://server-a:8080/mcp"},
+    }
+    with patch("ols.utils.mcp_utils.MultiServerMCPClient") as mock_client_cls:
+        mock_client_instance = AsyncMock()
+        mock_client_instance.get_tools.return_value = mock_tools_map
+        mock_client_cls.return_value = mock_client_instance
+
+        assert await gather_mcp_tools(mcp_servers) == mock_tools_map
+        assert await gather_mcp_tools(mcp_servers) == mock_tools_map
+        mock_client_instance.get_tools.assert_called_once_with(server_name="server_a")
+
+        # different credentials -> tools needs to be listed again
+        mcp_servers["server_a"]["headers"] = {"Authorization": "Bearer other"}
+        assert await gather_mcp_tools(mcp_servers) == mock_tools_map
+        assert mock_client_instance.get_tools.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_mcp_tools_cache_failures_are_not_cached():
+    """Test tools are listed again when MCP server was not reachable."""
+    from ols.utils.mcp_utils import MCPToolsCache
+
+    cache = MCPToolsCache()
+    mcp_servers = {
+        "server_a": {"transport": "streamable_http", "url": "http://server-a:8080/mcp"},
+    }
+    with patch("ols.utils.mcp_utils.MultiServerMCPClient") as mock_client_cls:
+        mock_client_instance = AsyncMock()
+        mock_client_instance.get_tools.side_effect = [
+            ConnectionError("Failed to connect"),
+            mock_tools_map,
+        ]
+        mock_client_cls.return_value = mock_client_instance
+
+        assert await cache.get_tools(mcp_servers) == []
+        assert await cache.get_tools(mcp_servers) == mock_tools_map
+
+
+@pytest.mark.asyncio
+async def test_mcp_tools_cache_refresh():
+    """Test stale tools are returned and refreshed in background."""
+    from ols.utils.mcp_utils import MCPToolsCache
+
+    # cached tools are always stale
+    cache = MCPToolsCache(ttl=-1, max_age=3600)
+    mcp_servers = {
+        "server_a": {"transport": "streamable_http", "url": "http://server-a:8080/mcp"},
+    }
+    refreshed_tools = [*mock_tools_map, *mock_tools_map]
+    with patch("ols.utils.mcp_utils.MultiServerMCPClient") as mock_client_cls:
+        mock_client_instance = AsyncMock()
+        mock_client_instance.get_tools.side_effect = [mock_tools_map, refreshed_tools]
+        mock_client_cls.return_value = mock_client_instance
+
+        assert await cache.get_tools(mcp_servers) == mock_tools_map
+        # stale tools are returned immediately
+        assert await cache.get_tools(mcp_servers) == mock_tools_map
+
+        # wait for background refresh
+        while cache._background_tasks:
+            await asyncio.gather(*cache._background_tasks)
+
+        cache.ttl = 3600
+        assert await cache.get_tools(mcp_servers) == refreshed_tools
+        assert mock_client_instance.get_tools.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_mcp_tools_cache_expired():
+    """Test too old tools are listed again before they are used."""
+    from ols.utils.mcp_utils import MCPToolsCache
+
+    # cached tools are always expired
+    cache = MCPToolsCache(ttl=-1, max_age=-1)
+    mcp_servers = {
+        "server_a": {"transport": "streamable_http", "url": "http://server-a:8080/mcp"},
+    }
+    with patch("ols.utils.mcp_utils.MultiServerMCPClient") as mock_client_cls:
+        mock_client_instance = AsyncMock()
+        mock_client_instance.get_tools.side_effect = [[], mock_tools_map]
+        mock_client_cls.return_value = mock_client_instance
+
+        assert await cache.get_tools(mcp_servers) == []
+        assert await cache.get_tools(mcp_servers) == mock_tools_map
+        assert not cache._background_tasks
+
+
+def test_mcp_tools_cache_max_entries():
+    """Test least recently used catalogs are evicted."""
+    from ols.utils.mcp_utils import MCPToolsCache
+
+    cache = MCPToolsCache(max_entries=2)
+    cache._store("a", [])
+    cache._store("b", [])
+    cache._store("c", [])
+    assert list(cache._entries) == ["b", "c"]
+
+
 def test_build_mcp_config_transport_is_streamable_http():
     """Test build_mcp_config sets transport to streamable_http for all servers."""
     from ols.utils.mcp_utils import build_mcp_config
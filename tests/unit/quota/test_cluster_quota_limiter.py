@@ -59,7 +59,7 @@ def test_init_quota():
             q._init_quota()
 
     # new record should be inserted into storage
-    mock_cursor.execute.assert_called_once_with(
+    mock_cursor.execute.assert_called_with(
         ClusterQuotaLimiter.INIT_QUOTA,
         ("", subject, quota_limit, quota_limit, timestamp),
     )
@@ -90,8 +90,6 @@ def test_available_quota_with_data():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         # quota for given cluster should be read from storage
         call(ClusterQuotaLimiter.SELECT_QUOTA, ("", subject)),
     ]
@@ -169,14 +167,13 @@ def test_available_quota_on_disconnected_db():
             q = ClusterQuotaLimiter(config, quota_limit)
 
             # simulate DB disconnection
-            q.connection = None
-            assert not q.connected()
+            q.connection_pool.close()
 
             # try to retrieve available quota for given cluster
             available = q.available_quota()
 
             # DB operation should connect automatically
-            assert q.connected()
+            assert mock_connect.call_count == 2
 
     assert available == quota_limit
 
@@ -213,8 +210,6 @@ def test_revoke_quota():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         # quota for given cluster should be written into the storage
         call(
             ClusterQuotaLimiter.SET_AVAILABLE_QUOTA,
@@ -251,14 +246,13 @@ def test_revoke_quota_on_disconnected_db():
             q = ClusterQuotaLimiter(config, quota_limit)
 
             # simulate DB disconnection
-            q.connection = None
-            assert not q.connected()
+            q.connection_pool.close()
 
             # try to revoke quota
             q.revoke_quota()
 
             # DB operation should connect automatically
-            assert q.connected()
+            assert mock_connect.call_count == 2
 
 
 def test_consume_tokens_not_enough():
@@ -295,8 +289,6 @@ def test_consume_tokens_not_enough():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         # quota for given user should be updated in storage
         call(
             ClusterQuotaLimiter.UPDATE_AVAILABLE_QUOTA,
@@ -340,8 +332,6 @@ def test_consume_input_tokens_enough_tokens():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         # quota for given user should be updated in storage
         call(
             ClusterQuotaLimiter.UPDATE_AVAILABLE_QUOTA,
@@ -385,8 +375,6 @@ def test_consume_output_tokens_enough_tokens():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         # quota for given user should be updated in storage
         call(
             ClusterQuotaLimiter.UPDATE_AVAILABLE_QUOTA,
@@ -432,8 +420,6 @@ def test_consume_input_and_output_tokens_enough_tokens():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         # quota for given user should be updated in storage
         call(
             ClusterQuotaLimiter.UPDATE_AVAILABLE_QUOTA,
@@ -475,8 +461,6 @@ def test_consume_tokens_on_no_record():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         # quota for given user should be updated in storage
         call(
             ClusterQuotaLimiter.UPDATE_AVAILABLE_QUOTA,
@@ -516,14 +500,13 @@ def test_consume_tokens_on_disconnected_db():
             q = ClusterQuotaLimiter(config, quota_limit)
 
             # simulate DB disconnection
-            q.connection = None
-            assert not q.connected()
+            q.connection_pool.close()
 
             # try to consume tokens
             q.consume_tokens(input_tokens, output_tokens)
 
             # DB operation should connect automatically
-            assert q.connected()
+            assert mock_connect.call_count == 2
 
 
 def test_increase_quota():
@@ -559,8 +542,6 @@ def test_increase_quota():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         # quota for given cluster should be written into the storage
         call(
             ClusterQuotaLimiter.UPDATE_AVAILABLE_QUOTA,
@@ -597,14 +578,13 @@ def test_increase_quota_on_disconnected_db():
             q = ClusterQuotaLimiter(config, quota_limit)
 
             # simulate DB disconnection
-            q.connection = None
-            assert not q.connected()
+            q.connection_pool.close()
 
             # try to increase quota
             q.increase_quota()
 
             # DB operation should connect automatically
-            assert q.connected()
+            assert mock_connect.call_count == 2
 
 
 def test_ensure_available_quota():
@@ -28,6 +28,19 @@ def test_init_storage_failure_detection():
         mock_connect.return_value.close.assert_called_once_with()
 
 
+def test_storage_connection_without_ca_cert(tmp_path):
+    """Test that quota storage does not verify server by CA certificate."""
+    ca_cert_path = tmp_path / "ca.crt"
+    ca_cert_path.touch()
+
+    # do not use connection to real PostgreSQL instance
+    with patch("psycopg2.connect") as mock_connect:
+        config = PostgresConfig(ca_cert_path=ca_cert_path)
+        TokenUsageHistory(config)
+
+    assert mock_connect.call_args.kwargs["sslrootcert"] is None
+
+
 def test_consume_tokens():
     """Test the operation to consume tokens."""
     input_tokens = 10
@@ -63,8 +76,6 @@ def test_consume_tokens():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         # quota for given user should be read from storage
         # and the initialization of new record should be made
         call(
@@ -113,15 +124,13 @@ def test_consume_tokens_on_disconnected_db():
             q = TokenUsageHistory(config)
 
             # simulate DB disconnection
-            q.connection = None
-
-            assert not q.connected()
+            q.connection_pool.close()
 
             # try to consume tokens
             # DB should be connected automatically
             q.consume_tokens(user_id, provider, model, input_tokens, output_tokens)
 
-            assert q.connected()
+            assert mock_connect.call_count == 2
 
     # expected calls to storage
     calls = [
@@ -138,7 +147,5 @@ def test_consume_tokens_on_disconnected_db():
                 "updated_at": timestamp,
             },
         ),
-        # check if storage connection is alive
-        call("SELECT 1"),
     ]
     mock_cursor.execute.assert_has_calls(calls, any_order=False)
@@ -28,6 +28,19 @@ def test_init_storage_failure_detection():
         mock_connect.return_value.close.assert_called_once_with()
 
 
+def test_storage_connection_without_ca_cert(tmp_path):
+    """Test that quota storage does not verify server by CA certificate."""
+    ca_cert_path = tmp_path / "ca.crt"
+    ca_cert_path.touch()
+
+    # do not use connection to real PostgreSQL instance
+    with patch("psycopg2.connect") as mock_connect:
+        config = PostgresConfig(ca_cert_path=ca_cert_path)
+        UserQuotaLimiter(config, 0)
+
+    assert mock_connect.call_args.kwargs["sslrootcert"] is None
+
+
 def test_init_quota():
     """Test the init quota operation."""
     quota_limit = 100
@@ -60,7 +73,7 @@ def test_init_quota():
             q._init_quota(user_id)
 
     # new record should be inserted into storage
-    mock_cursor.execute.assert_called_once_with(
+    mock_cursor.execute.assert_called_with(
         UserQuotaLimiter.INIT_QUOTA,
         (user_id, subject, quota_limit, quota_limit, timestamp),
     )
@@ -92,8 +105,6 @@ def test_available_quota_with_data():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         # quota for given user should be read from storage
         call(
             UserQuotaLimiter.SELECT_QUOTA,
@@ -177,14 +188,13 @@ def test_available_quota_on_disconnected_db():
             q = UserQuotaLimiter(config, quota_limit)
 
             # simulate DB disconnection
-            q.connection = None
-            assert not q.connected()
+            q.connection_pool.close()
 
             # try to retrieve available quota for given user
             available = q.available_quota(user_id)
 
             # DB operation should connect automatically
-            assert q.connected()
+            assert mock_connect.call_count == 2
 
     assert available == quota_limit
 
@@ -222,8 +232,6 @@ def test_revoke_quota():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         # quota for given user should be written into the storage
         call(
             UserQuotaLimiter.SET_AVAILABLE_QUOTA,
@@ -261,14 +269,13 @@ def test_revoke_quota_on_disconnected_db():
             q = UserQuotaLimiter(config, quota_limit)
 
             # simulate DB disconnection
-            q.connection = None
-            assert not q.connected()
+            q.connection_pool.close()
 
             # try to revoke quota
             q.revoke_quota(user_id)
 
             # DB operation should connect automatically
-            assert q.connected()
+            assert mock_connect.call_count == 2
 
 
 def test_consume_tokens_not_enough():
@@ -306,8 +313,6 @@ def test_consume_tokens_not_enough():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         call(
             # quota for given user should be read from storage
             UserQuotaLimiter.UPDATE_AVAILABLE_QUOTA,
@@ -352,8 +357,6 @@ def test_consume_input_tokens_enough_tokens():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         call(
             # quota for given user should be read from storage
             UserQuotaLimiter.UPDATE_AVAILABLE_QUOTA,
@@ -398,8 +401,6 @@ def test_consume_output_tokens_enough_tokens():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         call(
             # quota for given user should be read from storage
             UserQuotaLimiter.UPDATE_AVAILABLE_QUOTA,
@@ -446,8 +447,6 @@ def test_consume_input_and_output_tokens_enough_tokens():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         call(
             UserQuotaLimiter.UPDATE_AVAILABLE_QUOTA,
             (-to_be_consumed, timestamp, user_id, subject),
@@ -489,8 +488,6 @@ def test_consume_tokens_on_no_record():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         call(
             # quota for given user should be read from storage
             UserQuotaLimiter.UPDATE_AVAILABLE_QUOTA,
@@ -531,14 +528,13 @@ def test_consume_tokens_on_disconnected_db():
             q = UserQuotaLimiter(config, quota_limit)
 
             # simulate DB disconnection
-            q.connection = None
-            assert not q.connected()
+            q.connection_pool.close()
 
             # try to consume tokens
             q.consume_tokens(input_tokens, output_tokens, user_id)
 
             # DB operation should connect automatically
-            assert q.connected()
+            assert mock_connect.call_count == 2
 
 
 def test_increase_quota():
@@ -575,8 +571,6 @@ def test_increase_quota():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         # quota for given user should be written into the storage
         call(
             UserQuotaLimiter.UPDATE_AVAILABLE_QUOTA,
@@ -614,14 +608,13 @@ def test_increase_quota_on_disconnected_db():
             q = UserQuotaLimiter(config, quota_limit)
 
             # simulate DB disconnection
-            q.connection = None
-            assert not q.connected()
+            q.connection_pool.close()
 
             # try to increase quota
             q.increase_quota(user_id)
 
             # DB operation should connect automatically
-            assert q.connected()
+            assert mock_connect.call_count == 2
 
 
 def test_ensure_available_quota():
@@ -0,0 +1,104 @@
+"""Unit tests for BM25 index module."""
+
+import math
+import os
+
+import pytest
+
+from ols.src.rag_index.bm25_index import BM25Index, load_bm25_index, tokenize
+
+TEXTS = {
+    "node0": "Set imagePullPolicy to Always to pull the image on every start.",
+    "node1": "Use oc adm top pods to show resource usage of pods.",
+    "node2": "Pods are scheduled to nodes. Pods run containers.",
+    "node3": "The image registry stores container images.",
+}
+
+
+def test_tokenize():
+    """Test that identifiers are kept as whole terms."""
+    assert tokenize("Set imagePullPolicy: oc-mirror") == [
+        "set",
+        "imagepullpolicy",
+        "oc",
+        "mirror",
+    ]
+
+
+def test_search():
+    """Test that chunks are ranked by BM25 scores."""
+    index = BM25Index.build(TEXTS)
+    assert len(index) == 4
+
+    assert index.search("What is imagePullPolicy?", top_k=5) == [
+        ("node0", pytest.approx(index.scores("imagepullpolicy")[0]))
+    ]
+
+    matches = index.search("oc adm top pods", top_k=5)
+    assert [node_id for node_id, _ in matches] == ["node1", "node2"]
+    assert matches[0][1] > matches[1][1] > 0
+
+    # only top_k chunks are returned
+    assert [node_id for node_id, _ in index.search("pods", top_k=1)] == ["node2"]
+
+    assert index.search("unknown terms", top_k=5) == []
+
+
+def test_scores():
+    """Test that scores are equal to BM25 scores computed term by term."""
+    k1, b = 1.2, 0.75
+    index = BM25Index.build(TEXTS, k1=k1, b=b)
+
+    documents = [tokenize(text) for text in TEXTS.values()]
+    average_length = sum(len(document) for document in documents) / len(documents)
+    # "pods" is 2 times in 2 of 4 chunks
+    idf = math.log(1 + (4 - 2 + 0.5) / (2 + 0.5))
+    length = len(documents[2])
+    expected = idf * 2 * (k1 + 1) / (2 + k1 * (1 - b + b * length / average_length))
+
+    assert index.scores("pods")[2] == pytest.approx(expected, rel=1e-5)
+    # scores of repeated query terms are added
+    assert index.scores("pods pods")[2] == pytest.approx(2 * expected, rel=1e-5)
+
+
+def test_save_and_load(tmp_path):
+    """Test that stored index gives the same results."""
+    path = os.path.join(tmp_path, "bm25_index.npz")
+    index = BM25Index.build(TEXTS)
+    index.save(path)
+    assert os.listdir(tmp_path) == ["bm25_index.npz"]
+
+    loaded_index = BM25Index.load(path)
+    assert list(loaded_index.node_ids) == list(TEXTS)
+    assert (loaded_index.k1, loaded_index.b) == (index.k1, index.b)
+    for query in ("imagePullPolicy", "oc adm top pods", "image"):
+        assert loaded_index.search(query, top_k=5) == index.search(query, top_k=5)
+
+
+def test_load_bm25_index(tmp_path):
+    """Test that index is built once and built again when chunks change."""
+    path = os.path.join(tmp_path, "bm25_index.npz")
+
+    index = load_bm25_index(TEXTS, path)
+    assert os.path.exists(path)
+
+    modified_at = os.path.getmtime(path)
+    os.utime(path, (0, 0))
+    assert load_bm25_index(TEXTS, path).search("pods", 5) == index.search("pods", 5)
+    assert os.path.getmtime(path) == 0
+
+    texts = {**TEXTS, "node4": "New chunk about pods."}
+    index = load_bm25_index(texts, path)
+    assert len(index) == 5
+    assert os.path.getmtime(path) >= modified_at
+    assert len(BM25Index.load(path)) == 5
+
+
+def test_load_bm25_index_read_only_directory(tmp_path):
+    """Test that index is built when it can't be stored."""
+    path = os.path.join(tmp_path, "missing_directory", "bm25_index.npz")
+
+    index = load_bm25_index(TEXTS, path)
+
+    assert len(index) == 4
+    assert not os.path.exists(path)
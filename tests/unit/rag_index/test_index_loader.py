@@ -1,11 +1,23 @@
 """Unit test for the index loader module."""
 
+import gc
 import os
-from unittest.mock import patch
+import threading
+import weakref
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from prometheus_client import REGISTRY
 
 import ols.src.rag_index.index_loader as il
 from ols import config
-from ols.app.models.config import ReferenceContent, ReferenceContentIndex
+from ols.app.models.config import (
+    HybridRetrievalConfig,
+    ReferenceContent,
+    ReferenceContentIndex,
+)
+from ols.constants import RAG_CHUNK_TOKEN_COUNT_KEY, IndexLoadState
 from tests.mock_classes.mock_llama_index import MockLlamaIndex
 from tests.mock_classes.mock_retrievers import MockRetriever
 
@@ -120,6 +132,7 @@ def test_custom_weight_function():
 
     custom_fusion_retriever = il.QueryFusionRetrieverCustom(
         retrievers=[MockRetriever] * 3,
+        similarity_top_k=6,
         mode="simple",
     )
     sorted_result = custom_fusion_retriever._simple_fusion(mock_retrieved_result)
@@ -145,3 +158,799 @@ def test_custom_weight_function():
     assert round(sorted_result[5].score, 4) == round(
         0.735 * (1 - (1 * 0.05)), 4
     )  # 0.6982
+
+
+def test_custom_fusion_top_k_without_duplicates():
+    """Test that fusion selects top-k nodes, leaving out duplicates."""
+    from llama_index.core.schema import NodeWithScore, TextNode
+
+    il.load_llama_index_deps()
+    il.Settings.llm = il.resolve_llm(None)
+
+    results = {
+        ("query_text", 0): [
+            NodeWithScore(node=TextNode(id_="a", text="chunk a"), score=0.9),
+            NodeWithScore(node=TextNode(id_="b", text="chunk b"), score=0.8),
+            NodeWithScore(node=TextNode(id_="c", text="chunk c"), score=0.5),
+        ],
+        ("query_text", 1): [
+            # the same chunk in other index
+            NodeWithScore(node=TextNode(id_="b2", text="chunk b"), score=0.85),
+            NodeWithScore(node=TextNode(id_="d", text="chunk d"), score=0.6),
+            # the same node retrieved again
+            NodeWithScore(node=TextNode(id_="a", text="chunk a"), score=0.7),
+        ],
+    }
+    fusion_retriever = il.QueryFusionRetrieverCustom(
+        retrievers=[MockRetriever] * 2,
+        index_configs=[
+            ReferenceContentIndex({"product_docs_index_id": f"id_{i}"})
+            for i in range(2)
+        ],
+        similarity_top_k=3,
+        mode="simple",
+    )
+
+    fused = fusion_retriever._simple_fusion(results)
+
+    # copy of chunk b with the highest weighted score is kept
+    assert [node.node.node_id for node in fused] == ["a", "b2", "d"]
+    assert [node.score for node in fused] == pytest.approx([0.9, 0.8075, 0.57])
+    assert [node.node.metadata["index_id"] for node in fused] == [
+        "id_0",
+        "id_1",
+        "id_1",
+    ]
+    # only selected nodes get metadata
+    assert "index_id" not in results[("query_text", 0)][2].node.metadata
+
+    assert fusion_retriever._simple_fusion({("query_text", 0): []}) == []
+
+
+def test_attach_token_counts():
+    """Test that token counts of chunks are stored in document store."""
+    from llama_index.core.schema import TextNode
+    from llama_index.core.storage.docstore import SimpleDocumentStore
+
+    from ols.utils.token_handler import TokenHandler
+
+    docstore = SimpleDocumentStore()
+    docstore.add_documents(
+        [
+            TextNode(id_="1", text="first chunk"),
+            TextNode(
+                id_="2",
+                text="second chunk",
+                metadata={RAG_CHUNK_TOKEN_COUNT_KEY: 42},
+            ),
+        ]
+    )
+
+    class Index:
+        """Index with document store only."""
+
+        def __init__(self):
+            """Initialize the index."""
+            self.docstore = docstore
+
+    assert il.attach_token_counts(Index()) == 1
+
+    token_handler = TokenHandler()
+    node = docstore.get_node("1")
+    assert node.metadata[RAG_CHUNK_TOKEN_COUNT_KEY] == len(
+        token_handler.text_to_tokens("Document:\nfirst chunk")
+    )
+    assert RAG_CHUNK_TOKEN_COUNT_KEY in node.excluded_llm_metadata_keys
+    assert RAG_CHUNK_TOKEN_COUNT_KEY in node.excluded_embed_metadata_keys
+    # precomputed count is kept
+    assert docstore.get_node("2").metadata[RAG_CHUNK_TOKEN_COUNT_KEY] == 42
+
+    # nothing to compute for the second time
+    assert il.attach_token_counts(Index()) == 0
+
+
+def test_attach_simhashes():
+    """Test that signatures of chunks are stored in document store."""
+    from llama_index.core.schema import TextNode
+    from llama_index.core.storage.docstore import SimpleDocumentStore
+
+    from ols.constants import RAG_CHUNK_SIMHASH_KEY
+    from ols.src.rag_index.near_duplicates import simhash
+
+    docstore = SimpleDocumentStore()
+    docstore.add_documents(
+        [
+            # metadata of documents can't be mistaken for the signature
+            TextNode(id_="1", text="first chunk", metadata={"simhash": "abc"}),
+            TextNode(id_="2", text="second chunk", metadata={RAG_CHUNK_SIMHASH_KEY: 7}),
+        ]
+    )
+    index = MagicMock(docstore=docstore)
+
+    assert il.attach_simhashes(index) == 1
+
+    node = docstore.get_node("1")
+    assert node.metadata[RAG_CHUNK_SIMHASH_KEY] == simhash("first chunk")
+    assert node.metadata["simhash"] == "abc"
+    assert RAG_CHUNK_SIMHASH_KEY in node.excluded_llm_metadata_keys
+    assert RAG_CHUNK_SIMHASH_KEY in node.excluded_embed_metadata_keys
+    # precomputed signature is kept
+    assert docstore.get_node("2").metadata[RAG_CHUNK_SIMHASH_KEY] == 7
+
+    assert il.attach_simhashes(index) == 0
+
+
+def test_load_vector_store_memory_map(tmp_path):
+    """Test that FAISS index is loaded both memory mapped and into memory."""
+    import faiss
+    import numpy as np
+
+    from ols.constants import RAG_INDEX_VECTOR_STORE_FILE
+
+    il.load_llama_index_deps()
+    faiss_index = faiss.IndexFlatIP(4)
+    faiss_index.add(np.eye(4, dtype="float32"))
+    faiss.write_index(faiss_index, str(tmp_path / RAG_INDEX_VECTOR_STORE_FILE))
+
+    for memory_map in (False, True):
+        vector_store = il.load_vector_store(str(tmp_path), memory_map)
+        loaded_index = vector_store.client
+        assert loaded_index.ntotal == 4
+        _, ids = loaded_index.search(np.eye(4, dtype="float32")[2:3], 1)
+        assert ids[0][0] == 2
+
+
+def test_index_loader_memory_map():
+    """Test that index loader memory maps indexes when configured."""
+    config.ols_config.reference_content = ReferenceContent({"memory_map_indexes": True})
+
+    with (
+        patch("llama_index.core.StorageContext.from_defaults"),
+        patch("ols.src.rag_index.index_loader.load_vector_store") as load_vector_store,
+        patch("llama_index.core.load_index_from_storage", new=MockLlamaIndex),
+        patch.dict(os.environ, {"TRANSFORMERS_CACHE": "", "TRANSFORMERS_OFFLINE": ""}),
+    ):
+        config.ols_config.reference_content.indexes = [
+            ReferenceContentIndex(
+                {
+                    "product_docs_index_path": "./some_dir",
+                    "product_docs_index_id": "./some_id",
+                }
+            )
+        ]
+
+        index_loader_obj = il.IndexLoader(config.ols_config.reference_content)
+
+        assert len(index_loader_obj.vector_indexes) == 1
+        load_vector_store.assert_called_once_with("./some_dir", True)
+
+
+def _reference_content(index_count, **options):
+    """Construct reference content config with given number of indexes."""
+    return ReferenceContent(
+        {
+            "indexes": [
+                {
+                    "product_docs_index_path": f"./some_dir_{i}",
+                    "product_docs_index_id": f"id_{i}",
+                }
+                for i in range(index_count)
+            ],
+            **options,
+        }
+    )
+
+
+def test_index_loader_loads_indexes_concurrently():
+    """Test that indexes are loaded concurrently and kept in configured order."""
+    barrier = threading.Barrier(3, timeout=5)
+
+    def load_index_from_storage(**kwargs):
+        # all three loads must be running at the same time to pass the barrier
+        barrier.wait()
+        return MockLlamaIndex(**kwargs)
+
+    with (
+        patch("llama_index.core.StorageContext.from_defaults"),
+        patch("ols.src.rag_index.index_loader.load_vector_store"),
+        patch("llama_index.core.load_index_from_storage", new=load_index_from_storage),
+        patch.dict(os.environ, {"TRANSFORMERS_CACHE": "", "TRANSFORMERS_OFFLINE": ""}),
+    ):
+        index_loader_obj = il.IndexLoader(_reference_content(3))
+
+    indexes = index_loader_obj.vector_indexes
+    assert [index.kwargs["index_id"] for index in indexes] == ["id_0", "id_1", "id_2"]
+    assert index_loader_obj.index_states == [IndexLoadState.LOADED] * 3
+    assert index_loader_obj._loading_finished.wait(timeout=0)
+
+
+def test_index_loader_index_states():
+    """Test that loading state is reported for each index."""
+    reference_content = _reference_content(3)
+    reference_content.indexes[2].product_docs_index_path = None
+
+    def load_index_from_storage(**kwargs):
+        if kwargs["index_id"] == "id_0":
+            raise ValueError("broken index")
+        return MockLlamaIndex(**kwargs)
+
+    with (
+        patch("llama_index.core.StorageContext.from_defaults"),
+        patch("ols.src.rag_index.index_loader.load_vector_store"),
+        patch("llama_index.core.load_index_from_storage", new=load_index_from_storage),
+        patch.dict(os.environ, {"TRANSFORMERS_CACHE": "", "TRANSFORMERS_OFFLINE": ""}),
+    ):
+        index_loader_obj = il.IndexLoader(reference_content)
+
+    assert index_loader_obj.index_states == [
+        IndexLoadState.FAILED,
+        IndexLoadState.LOADED,
+        IndexLoadState.SKIPPED,
+    ]
+    indexes = index_loader_obj.vector_indexes
+    assert [index.kwargs["index_id"] for index in indexes] == ["id_1"]
+
+
+def test_index_loader_ready_on_primary_index():
+    """Test that loader is ready once the primary index is loaded."""
+    secondary_can_load = threading.Event()
+
+    def load_index_from_storage(**kwargs):
+        if kwargs["index_id"] != "id_0":
+            assert secondary_can_load.wait(timeout=5)
+        return MockLlamaIndex(**kwargs)
+
+    with (
+        patch("llama_index.core.StorageContext.from_defaults"),
+        patch("ols.src.rag_index.index_loader.load_vector_store"),
+        patch("llama_index.core.load_index_from_storage", new=load_index_from_storage),
+        patch.dict(os.environ, {"TRANSFORMERS_CACHE": "", "TRANSFORMERS_OFFLINE": ""}),
+    ):
+        index_loader_obj = il.IndexLoader(
+            _reference_content(2, ready_on_primary_index=True)
+        )
+
+        # only the primary index is available
+        assert [
+            index.kwargs["index_id"] for index in index_loader_obj.vector_indexes
+        ] == ["id_0"]
+        assert index_loader_obj.index_states == [
+            IndexLoadState.LOADED,
+            IndexLoadState.LOADING,
+        ]
+        retriever = index_loader_obj.get_retriever()
+        assert len(retriever._retrievers) == 1
+
+        secondary_can_load.set()
+        assert index_loader_obj._loading_finished.wait(timeout=5)
+
+    assert [index.kwargs["index_id"] for index in index_loader_obj.vector_indexes] == [
+        "id_0",
+        "id_1",
+    ]
+    # retriever is created again for all indexes
+    assert len(index_loader_obj.get_retriever()._retrievers) == 2
+
+
+def test_index_fingerprint(tmp_path):
+    """Test that fingerprint of index directory changes with index files."""
+    assert il.index_fingerprint(str(tmp_path / "missing")) is None
+
+    (tmp_path / "docstore.json").write_text("{}")
+    fingerprint = il.index_fingerprint(str(tmp_path))
+    assert [name for name, _, _ in fingerprint] == ["docstore.json"]
+
+    # BM25 index stored by the service itself is not a change
+    (tmp_path / "bm25_index.npz").write_text("")
+    (tmp_path / "bm25_index.npz.tmp").write_text("")
+    assert il.index_fingerprint(str(tmp_path)) == fingerprint
+
+    (tmp_path / "docstore.json").write_text('{"docs": {}}')
+    assert il.index_fingerprint(str(tmp_path)) != fingerprint
+
+
+def test_index_loader_reload_indexes():
+    """Test that reloaded indexes are used by new retrievers only."""
+
+    def load_index_from_storage(**kwargs):
+        index = MagicMock(kwargs=kwargs)
+        index.docstore.docs = {}
+        return index
+
+    with (
+        patch("llama_index.core.StorageContext.from_defaults"),
+        patch("ols.src.rag_index.index_loader.load_vector_store"),
+        patch("llama_index.core.load_index_from_storage", new=load_index_from_storage),
+        patch.dict(os.environ, {"TRANSFORMERS_CACHE": "", "TRANSFORMERS_OFFLINE": ""}),
+    ):
+        index_loader_obj = il.IndexLoader(_reference_content(2))
+        indexes = index_loader_obj.vector_indexes
+        retriever = index_loader_obj.get_retriever()
+        previous_index = weakref.ref(indexes[1])
+
+        assert index_loader_obj.reload_indexes([1])
+
+    reloaded_indexes = index_loader_obj.vector_indexes
+    assert reloaded_indexes[0] is indexes[0]
+    assert reloaded_indexes[1] is not indexes[1]
+    assert reloaded_indexes[1].kwargs["index_id"] == "id_1"
+    # request in progress keeps its retriever, new requests get a new one
+    new_retriever = index_loader_obj.get_retriever()
+    assert new_retriever is not retriever
+    assert new_retriever.index_generation != retriever.index_generation
+    assert index_loader_obj.index_states == [IndexLoadState.LOADED] * 2
+
+    # previous index is released when no retriever uses it anymore
+    del indexes
+    gc.collect()
+    assert previous_index() is not None
+    del retriever
+    gc.collect()
+    assert previous_index() is None
+
+
+def test_index_loader_reload_keeps_index_that_fails_to_load():
+    """Test that previous index is used when it can't be loaded again."""
+    reference_content = _reference_content(2)
+    reference_content.indexes[1].product_docs_index_path = None
+    with (
+        patch("llama_index.core.StorageContext.from_defaults"),
+        patch("ols.src.rag_index.index_loader.load_vector_store"),
+        patch("llama_index.core.load_index_from_storage", new=MockLlamaIndex),
+        patch.dict(os.environ, {"TRANSFORMERS_CACHE": "", "TRANSFORMERS_OFFLINE": ""}),
+    ):
+        index_loader_obj = il.IndexLoader(reference_content)
+    indexes = index_loader_obj.vector_indexes
+    retriever = index_loader_obj.get_retriever()
+
+    with (
+        patch("llama_index.core.StorageContext.from_defaults"),
+        patch("ols.src.rag_index.index_loader.load_vector_store"),
+        patch(
+            "ols.src.rag_index.index_loader.load_index_from_storage",
+            side_effect=ValueError("broken index"),
+        ),
+    ):
+        assert not index_loader_obj.reload_indexes()
+
+    assert index_loader_obj.vector_indexes == indexes
+    assert index_loader_obj.get_retriever() is retriever
+    assert index_loader_obj.index_states == [
+        IndexLoadState.LOADED,
+        IndexLoadState.SKIPPED,
+    ]
+    # skipped index is not loaded
+    assert not index_loader_obj.reload_indexes([1])
+
+
+def test_index_loader_changed_indexes(tmp_path):
+    """Test that index is reported as changed once its directory settles."""
+    for i in range(2):
+        (tmp_path / f"index_{i}").mkdir()
+        (tmp_path / f"index_{i}" / "docstore.json").write_text("{}")
+    reference_content = ReferenceContent(
+        {
+            "indexes": [
+                {
+                    "product_docs_index_path": str(tmp_path / f"index_{i}"),
+                    "product_docs_index_id": f"id_{i}",
+                }
+                for i in range(2)
+            ],
+        }
+    )
+    with (
+        patch("llama_index.core.StorageContext.from_defaults"),
+        patch("ols.src.rag_index.index_loader.load_vector_store"),
+        patch("llama_index.core.load_index_from_storage", new=MockLlamaIndex),
+        patch.dict(os.environ, {"TRANSFORMERS_CACHE": "", "TRANSFORMERS_OFFLINE": ""}),
+    ):
+        index_loader_obj = il.IndexLoader(reference_content)
+    assert index_loader_obj.changed_indexes() == []
+
+    (tmp_path / "index_1" / "docstore.json").write_text('{"docs": {}}')
+    # index can still be being copied
+    assert index_loader_obj.changed_indexes() == []
+    (tmp_path / "index_1" / "vector_store.faiss").write_text("")
+    assert index_loader_obj.changed_indexes() == []
+    assert index_loader_obj.changed_indexes() == [1]
+
+    # index is reported until it is reloaded
+    with (
+        patch("llama_index.core.StorageContext.from_defaults"),
+        patch("ols.src.rag_index.index_loader.load_vector_store"),
+        patch(
+            "ols.src.rag_index.index_loader.load_index_from_storage",
+            side_effect=ValueError("broken index"),
+        ),
+    ):
+        assert not index_loader_obj.reload_indexes([1])
+    assert index_loader_obj.changed_indexes() == [1]
+
+    with (
+        patch("llama_index.core.StorageContext.from_defaults"),
+        patch("ols.src.rag_index.index_loader.load_vector_store"),
+        patch("llama_index.core.load_index_from_storage", new=MockLlamaIndex),
+    ):
+        assert index_loader_obj.reload_indexes([1])
+    assert index_loader_obj.changed_indexes() == []
+
+
+def test_watch_indexes():
+    """Test that changed indexes are reloaded until loader is gone."""
+    loader = MagicMock()
+    loader.changed_indexes.side_effect = [[], [1], RuntimeError("failure"), []]
+    stop_watching = threading.Event()
+    loader_ref = MagicMock(side_effect=[loader, loader, loader, None])
+
+    il.watch_indexes(loader_ref, 0.001, stop_watching)
+
+    loader.reload_indexes.assert_called_once_with([1])
+    assert loader_ref.call_count == 4
+
+    # watching is stopped
+    loader_ref.reset_mock()
+    stop_watching.set()
+    il.watch_indexes(loader_ref, 0.001, stop_watching)
+    loader_ref.assert_not_called()
+
+
+def test_index_loader_watches_indexes():
+    """Test that index directories are watched when configured."""
+    watching_started = threading.Event()
+    watch_indexes = MagicMock(side_effect=lambda *args: watching_started.set())
+    with (
+        patch("llama_index.core.StorageContext.from_defaults"),
+        patch("ols.src.rag_index.index_loader.load_vector_store"),
+        patch("llama_index.core.load_index_from_storage", new=MockLlamaIndex),
+        patch("ols.src.rag_index.index_loader.watch_indexes", new=watch_indexes),
+        patch.dict(os.environ, {"TRANSFORMERS_CACHE": "", "TRANSFORMERS_OFFLINE": ""}),
+    ):
+        il.IndexLoader(_reference_content(1))
+        assert not watching_started.wait(timeout=0.1)
+
+        index_loader_obj = il.IndexLoader(
+            _reference_content(1, index_reload_interval=30)
+        )
+        assert watching_started.wait(timeout=5)
+
+    loader_ref, interval, stop_watching = watch_indexes.call_args.args
+    assert loader_ref() is index_loader_obj
+    assert interval == 30
+    index_loader_obj.stop_watching()
+    assert stop_watching.is_set()
+
+
+def test_custom_retriever_queries_indexes_concurrently():
+    """Test that indexes are searched concurrently with query embedded once."""
+    from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode
+
+    il.load_llama_index_deps()
+    il.Settings.llm = il.resolve_llm(None)
+
+    embed_model = MagicMock()
+    embed_model.get_query_embedding.return_value = [0.1, 0.2]
+    barrier = threading.Barrier(3, timeout=5)
+
+    class Retriever:
+        """Retriever that waits for the other retrievers."""
+
+        def __init__(self, text, score):
+            """Initialize the retriever."""
+            self._embed_model = embed_model
+            self.node = NodeWithScore(node=TextNode(text=text), score=score)
+            self.embedding = None
+
+        def retrieve(self, query_bundle):
+            """Return one node when all retrievers are searching."""
+            barrier.wait()
+            self.embedding = query_bundle.embedding
+            return [self.node]
+
+    retrievers = [
+        Retriever(f"index{i}", score) for i, score in enumerate((0.5, 0.7, 0.6))
+    ]
+    fusion_retriever = il.QueryFusionRetrieverCustom(
+        retrievers=retrievers,
+        similarity_top_k=3,
+        mode="simple",
+        num_queries=1,
+        use_async=False,
+    )
+
+    nodes = fusion_retriever.retrieve(QueryBundle("query_text"))
+
+    assert [node.get_content() for node in nodes] == ["index1", "index2", "index0"]
+    embed_model.get_query_embedding.assert_called_once_with("query_text")
+    assert all(
+        retriever.embedding == pytest.approx([0.1, 0.2]) for retriever in retrievers
+    )
+    # weights are still applied according to the order of retrievers
+    assert nodes[0].score == 0.7 * (1 - il.SCORE_DILUTION_WEIGHT)
+    assert nodes[2].score == 0.5
+
+
+def test_query_embedding_cache():
+    """Test LRU cache of query embeddings."""
+    cache = il.QueryEmbeddingCache(max_entries=2)
+
+    key = cache.key("model", "  How do I scale\ta Deployment ")
+    assert key == ("model", "how do i scale a deployment")
+    assert cache.key("other model", "how do I scale a deployment") != key
+    assert cache.get(key) is None
+
+    embedding = cache.put(key, [0.5, 0.25])
+    assert embedding.dtype == np.float32
+    assert not embedding.flags.writeable
+    assert cache.get(key) is embedding
+
+    cache.put(("model", "second"), [1.0])
+    # first key is used, so the second one is evicted
+    cache.get(key)
+    cache.put(("model", "third"), [2.0])
+    assert len(cache) == 2
+    assert cache.get(("model", "second")) is None
+    assert cache.get(key) is embedding
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_embed_query_uses_cache():
+    """Test that repeated queries are not embedded by the model again."""
+    embed_model = MagicMock()
+    embed_model.model_name = "model"
+    embed_model.get_query_embedding.side_effect = [[1.0, 0.0], [0.0, 1.0]]
+    hits = REGISTRY.get_sample_value("ols_rag_query_embedding_cache_hits_total")
+    misses = REGISTRY.get_sample_value("ols_rag_query_embedding_cache_misses_total")
+
+    assert il.embed_query(embed_model, ["How to scale?"]) == [1.0, 0.0]
+    assert il.embed_query(embed_model, ["how to  scale?"]) == [1.0, 0.0]
+    # embeddings of more texts are averaged
+    assert il.embed_query(embed_model, ["How to scale?", "pods"]) == [0.5, 0.5]
+
+    assert embed_model.get_query_embedding.call_count == 2
+    assert (
+        REGISTRY.get_sample_value("ols_rag_query_embedding_cache_hits_total")
+        == hits + 2
+    )
+    assert (
+        REGISTRY.get_sample_value("ols_rag_query_embedding_cache_misses_total")
+        == misses + 2
+    )
+
+
+def test_custom_retriever_get_nodes():
+    """Test that nodes are taken from document stores of indexes by their IDs."""
+    from llama_index.core.schema import TextNode
+    from llama_index.core.storage.docstore import SimpleDocumentStore
+
+    il.load_llama_index_deps()
+    il.Settings.llm = il.resolve_llm(None)
+
+    retrievers = []
+    for i in range(2):
+        docstore = SimpleDocumentStore()
+        docstore.add_documents([TextNode(id_=f"node{i}", text=f"chunk{i}")])
+        retrievers.append(MagicMock(_docstore=docstore))
+    fusion_retriever = il.QueryFusionRetrieverCustom(
+        retrievers=retrievers,
+        index_configs=[
+            ReferenceContentIndex({"product_docs_index_id": f"id_{i}"})
+            for i in range(2)
+        ],
+        index_generation=7,
+        mode="simple",
+        num_queries=1,
+    )
+    assert fusion_retriever.index_generation == 7
+
+    nodes = fusion_retriever.get_nodes([("node1", 0.9), ("node0", 0.8)])
+    assert [node.get_content() for node in nodes] == ["chunk1", "chunk0"]
+    assert [node.score for node in nodes] == [0.9, 0.8]
+    assert nodes[0].node.metadata["index_id"] == "id_1"
+    assert nodes[1].node.metadata["index_origin"] == "default"
+
+    assert fusion_retriever.get_nodes([("node0", 0.8), ("unknown", 0.5)]) is None
+
+
+def test_custom_retriever_hybrid_fusion():
+    """Test that dense and sparse results are fused by reciprocal rank fusion."""
+    from llama_index.core.schema import NodeWithScore, TextNode
+
+    il.load_llama_index_deps()
+    il.Settings.llm = il.resolve_llm(None)
+
+    def node(node_id, score, text=None):
+        return NodeWithScore(
+            node=TextNode(id_=node_id, text=text or node_id), score=score
+        )
+
+    fusion_retriever = il.QueryFusionRetrieverCustom(
+        retrievers=[MockRetriever] * 2,
+        sparse_retrievers=[(0, MockRetriever)],
+        hybrid_retrieval=HybridRetrievalConfig(),
+        index_configs=[
+            ReferenceContentIndex({"product_docs_index_id": f"id_{i}"})
+            for i in range(2)
+        ],
+        mode="simple",
+        num_queries=1,
+    )
+    assert len(fusion_retriever._retrievers) == 3
+
+    results = {
+        # dense results from both indexes
+        ("query_text", 0): [node("A", 0.8), node("B", 0.7)],
+        ("query_text", 1): [node("C", 0.75), node("D", 0.2)],
+        # sparse results from the first index
+        ("query_text", 2): [node("E", 0.5), node("A", 0.8)],
+    }
+    fused = fusion_retriever._simple_fusion(results)
+
+    # A: 1/61 + 1/62, E: 1/61, B: 1/62, C: 0.95/61, D is below cutoff
+    assert [n.node.node_id for n in fused] == ["A", "E", "B", "C"]
+    assert [n.score for n in fused] == pytest.approx([0.8, 0.5, 0.7, 0.7125])
+    assert fused[1].node.metadata["index_id"] == "id_0"
+    assert fused[3].node.metadata["index_id"] == "id_1"
+
+    # sparse ranks are not considered when their weight is zero
+    fusion_retriever._hybrid_retrieval = HybridRetrievalConfig(sparse_weight=0)
+    fused = fusion_retriever._simple_fusion(results)
+    assert [n.node.node_id for n in fused] == ["A", "B", "C", "E"]
+
+    # the same chunk from other index is left out
+    fusion_retriever._hybrid_retrieval = HybridRetrievalConfig()
+    results[("query_text", 1)] = [node("C", 0.75, text="A"), node("D", 0.2)]
+    fused = fusion_retriever._simple_fusion(results)
+    assert [n.node.node_id for n in fused] == ["A", "E", "B"]
+
+
+def test_bm25_retriever():
+    """Test that chunks found by BM25 index are scored by their embeddings."""
+    from llama_index.core.schema import QueryBundle, TextNode
+    from llama_index.core.storage.docstore import SimpleDocumentStore
+
+    from ols.src.rag_index.bm25_index import BM25Index
+
+    il.load_llama_index_deps()
+    nodes = [
+        TextNode(id_="node0", text="Set imagePullPolicy to Always."),
+        TextNode(id_="node1", text="Pods pull images by imagePullPolicy."),
+        TextNode(id_="node2", text="Nodes run pods."),
+    ]
+    vectors = np.array([[1.0, 0.0], [0.6, 0.8], [0.0, 1.0]], dtype=np.float32)
+    index = MagicMock()
+    index.docstore = SimpleDocumentStore()
+    index.docstore.add_documents(nodes)
+    index.index_struct.nodes_dict = {
+        str(i): node.node_id for i, node in enumerate(nodes)
+    }
+    index.vector_store.client.reconstruct_batch.side_effect = lambda ids: vectors[ids]
+    bm25_index = BM25Index.build({node.node_id: node.text for node in nodes})
+
+    retriever = il.BM25Retriever(index, bm25_index, similarity_top_k=5)
+    retrieved = retriever.retrieve(QueryBundle("imagePullPolicy", embedding=[0.0, 1.0]))
+
+    # ranked by BM25, scored by similarity of embeddings
+    assert [node.node.node_id for node in retrieved] == ["node0", "node1"]
+    assert [node.score for node in retrieved] == pytest.approx([0.0, 0.8])
+    assert retriever.retrieve(QueryBundle("unknown", embedding=[0.0, 1.0])) == []
+
+
+def test_index_loader_hybrid_retrieval():
+    """Test that BM25 indexes are loaded and searched along vector indexes."""
+    from llama_index.core.schema import TextNode
+
+    from ols.src.rag_index.bm25_index import BM25Index
+
+    def load_index_from_storage(**kwargs):
+        index = MagicMock(kwargs=kwargs)
+        node = TextNode(
+            text=kwargs["index_id"], metadata={RAG_CHUNK_TOKEN_COUNT_KEY: 1}
+        )
+        index.docstore.docs = {node.node_id: node}
+        index.index_struct.nodes_dict = {"0": node.node_id}
+        return index
+
+    def load_bm25_index(texts, path):
+        if path.startswith("./some_dir_1"):
+            raise ValueError("broken BM25 index")
+        return BM25Index.build(texts)
+
+    with (
+        patch("llama_index.core.StorageContext.from_defaults"),
+        patch("ols.src.rag_index.index_loader.load_vector_store"),
+        patch("llama_index.core.load_index_from_storage", new=load_index_from_storage),
+        patch(
+            "ols.src.rag_index.bm25_index.load_bm25_index", side_effect=load_bm25_index
+        ) as load_bm25,
+        patch.dict(os.environ, {"TRANSFORMERS_CACHE": "", "TRANSFORMERS_OFFLINE": ""}),
+    ):
+        index_loader_obj = il.IndexLoader(
+            _reference_content(2, hybrid_retrieval={"sparse_weight": 0.5})
+        )
+
+    # BM25 indexes are stored next to vector indexes
+    assert sorted(call.args[1] for call in load_bm25.call_args_list) == [
+        os.path.join(f"./some_dir_{i}", "bm25_index.npz") for i in range(2)
+    ]
+    # both vector indexes are used, BM25 index just for the first one
+    assert index_loader_obj.index_states == [IndexLoadState.LOADED] * 2
+    retriever = index_loader_obj.get_retriever()
+    assert len(retriever._retrievers) == 3
+    assert isinstance(retriever._retrievers[2], il.BM25Retriever)
+    assert retriever._retriever_index_positions == [0, 1, 0]
+    assert retriever._hybrid_retrieval.sparse_weight == 0.5
+
+
+def test_index_loader_onnx_embeddings_backend():
+    """Test that ONNX backend of embedding model is used when configured."""
+    reference_content = ReferenceContent(
+        {
+            "embeddings_model_path": "./embeddings_model",
+            "embeddings_backend": "onnx",
+            "indexes": [{"product_docs_index_path": "./some_dir"}],
+        }
+    )
+
+    with (
+        patch(
+            "llama_index.embeddings.huggingface.HuggingFaceEmbedding"
+        ) as huggingface_embedding,
+        patch(
+            "ols.src.rag_index.index_loader.onnx_model_kwargs",
+            return_value={"file_name": "model.onnx"},
+        ),
+        patch.object(il.IndexLoader, "_load_index"),
+    ):
+        index_loader_obj = il.IndexLoader(reference_content)
+
+    huggingface_embedding.assert_called_once_with(
+        model_name="./embeddings_model",
+        backend="onnx",
+        model_kwargs={"file_name": "model.onnx"},
+    )
+    assert index_loader_obj._embed_model is huggingface_embedding.return_value
+
+
+def test_embeddings_agreement():
+    """Test the lowest cosine similarity of embeddings by two models."""
+    embed_model = MagicMock()
+    embed_model.get_text_embedding_batch.return_value = [[1.0, 0.0], [0.0, 2.0]]
+    other_embed_model = MagicMock()
+    other_embed_model.get_text_embedding_batch.return_value = [[3.0, 0.0], [1.0, 1.0]]
+
+    agreement = il.embeddings_agreement(embed_model, other_embed_model, ["a", "b"])
+
+    assert agreement == pytest.approx(1 / np.sqrt(2))
+    embed_model.get_text_embedding_batch.assert_called_once_with(["a", "b"])
+
+
+def test_onnx_embeddings_agree_with_torch_embeddings():
+    """Test that ONNX export of the embedding model can search existing indexes."""
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+    from ols.constants import DEFAULT_EMBEDDINGS_ONNX_FILE
+
+    # model is downloaded by `make get-rag`
+    model_path = "embeddings_model"
+    if not os.path.isfile(os.path.join(model_path, DEFAULT_EMBEDDINGS_ONNX_FILE)):
+        pytest.skip("ONNX export of embedding model is not available")
+
+    reference_content = ReferenceContent({"embeddings_model_path": model_path})
+    texts = [
+        "How do I scale a deployment?",
+        "What is the difference between a pod and a container?",
+        "oc adm must-gather --image=registry.redhat.io/openshift4/ose-must-gather",
+    ]
+    agreement = il.embeddings_agreement(
+        HuggingFaceEmbedding(model_name=model_path),
+        HuggingFaceEmbedding(
+            model_name=model_path,
+            backend="onnx",
+            model_kwargs=il.onnx_model_kwargs(reference_content),
+        ),
+        texts,
+    )
+    assert agreement > 0.99
@@ -0,0 +1,76 @@
+"""Unit tests for near-duplicates module."""
+
+from llama_index.core.schema import NodeWithScore, TextNode
+
+from ols.constants import RAG_CHUNK_SIMHASH_KEY, RAG_NEAR_DUPLICATE_MAX_DISTANCE
+from ols.src.rag_index.near_duplicates import simhash, suppress_near_duplicates
+
+PARAGRAPH = (
+    "To view the resource usage of pods in a namespace, run the oc adm top pods "
+    "command. The command shows the CPU and memory usage of every pod that is "
+    "running in the namespace, as reported by the metrics server of the cluster."
+)
+
+
+def distance(text, other_text):
+    """Get the number of bits in which signatures of texts differ."""
+    return (simhash(text) ^ simhash(other_text)).bit_count()
+
+
+def test_simhash():
+    """Test that signatures of near-duplicate texts are close."""
+    assert simhash(PARAGRAPH) == simhash(PARAGRAPH)
+    assert 0 <= simhash(PARAGRAPH) < 2**64
+    assert simhash("") == 0
+
+    # letter case and punctuation do not matter
+    assert distance(PARAGRAPH, PARAGRAPH.upper().replace(",", "")) == 0
+    assert (
+        distance(
+            PARAGRAPH, PARAGRAPH.replace("of the cluster", "of the OpenShift cluster")
+        )
+        <= RAG_NEAR_DUPLICATE_MAX_DISTANCE
+    )
+    assert (
+        distance(
+            PARAGRAPH,
+            "Image pull policy of a container determines when the image is "
+            "pulled from the registry before the container is started on a node.",
+        )
+        > RAG_NEAR_DUPLICATE_MAX_DISTANCE
+    )
+
+
+def make_node(node_id, text, score, with_signature=True):
+    """Construct node with signature of its text."""
+    metadata = {RAG_CHUNK_SIMHASH_KEY: simhash(text)} if with_signature else {}
+    return NodeWithScore(
+        node=TextNode(id_=node_id, text=text, metadata=metadata), score=score
+    )
+
+
+def test_suppress_near_duplicates():
+    """Test that the best ranked copy of near-duplicate nodes is kept."""
+    nodes = [
+        make_node("4.19", PARAGRAPH, 0.8),
+        make_node("other", "Image pull policy determines when images are pulled.", 0.7),
+        make_node("4.18", PARAGRAPH.replace("To view", "To see"), 0.6),
+        make_node("4.17", PARAGRAPH, 0.5),
+    ]
+
+    kept = suppress_near_duplicates(nodes)
+
+    assert [node.node.node_id for node in kept] == ["4.19", "other"]
+    assert suppress_near_duplicates(nodes, max_distance=-1) == nodes
+
+
+def test_suppress_near_duplicates_without_signatures():
+    """Test that nodes without signatures are kept."""
+    nodes = [
+        make_node("1", PARAGRAPH, 0.8, with_signature=False),
+        make_node("2", PARAGRAPH, 0.6),
+        make_node("3", PARAGRAPH, 0.5, with_signature=False),
+    ]
+
+    assert suppress_near_duplicates(nodes) == nodes
+    assert suppress_near_duplicates([]) == []
@@ -0,0 +1,155 @@
+"""Unit tests for reranker module."""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+from llama_index.core.schema import NodeWithScore, TextNode
+
+from ols import config
+from ols.app.models.config import ReferenceContent, RerankerConfig
+from ols.customize import reranker as customized_reranker
+from ols.src.rag_index.reranker import CrossEncoderReranker, get_reranker
+
+
+def make_nodes(*scores: float) -> list[NodeWithScore]:
+    """Construct nodes with given similarity scores."""
+    return [
+        NodeWithScore(node=TextNode(id_=str(i), text=f"chunk{i}"), score=score)
+        for i, score in enumerate(scores)
+    ]
+
+
+def make_reranker(model: MagicMock, **options) -> CrossEncoderReranker:
+    """Construct reranker with given cross-encoder model."""
+    reranker = CrossEncoderReranker(RerankerConfig(model_path="model", **options))
+    reranker._model = model
+    return reranker
+
+
+def test_rerank():
+    """Test that nodes are ordered by relevance scored by cross-encoder."""
+    model = MagicMock()
+    model.predict.return_value = [0.1, 0.9, 0.5]
+    reranker = make_reranker(model, top_k=2)
+
+    reranked, complete = reranker.rerank("query", make_nodes(0.8, 0.7, 0.6))
+
+    assert complete
+
+    assert [node.node.node_id for node in reranked] == ["1", "2"]
+    # similarity scores are kept
+    assert [node.score for node in reranked] == [0.7, 0.6]
+    model.predict.assert_called_once_with(
+        [("query", "chunk0"), ("query", "chunk1"), ("query", "chunk2")],
+        batch_size=3,
+        show_progress_bar=False,
+    )
+
+
+def test_rerank_candidates():
+    """Test that only top_n nodes passing similarity cutoff are reranked."""
+    model = MagicMock()
+    model.predict.return_value = [0.1, 0.9]
+    reranker = make_reranker(model, top_n=3)
+
+    reranked, _ = reranker.rerank("query", make_nodes(0.8, 0.7, 0.1, 0.9))
+
+    assert [node.node.node_id for node in reranked] == ["1", "0"]
+    assert len(model.predict.call_args.args[0]) == 2
+
+    # nothing to rerank
+    model.predict.reset_mock()
+    nodes = make_nodes(0.8, 0.1)
+    assert reranker.rerank("query", nodes) == (nodes, True)
+    model.predict.assert_not_called()
+
+
+def test_rerank_timeout():
+    """Test that original order is kept when reranking takes too long."""
+    scoring_can_finish = threading.Event()
+    model = MagicMock()
+    model.predict.side_effect = lambda *args, **kwargs: (
+        scoring_can_finish.wait(5) and [0.1, 0.9]
+    )
+    reranker = make_reranker(model, timeout=0.01, top_k=1)
+    nodes = make_nodes(0.8, 0.7)
+
+    assert reranker.rerank("query", nodes) == (nodes[:1], False)
+    scoring_can_finish.set()
+
+
+def test_rerank_busy():
+    """Test that original order is kept when all reranker slots are used."""
+    model = MagicMock()
+    reranker = make_reranker(model)
+    nodes = make_nodes(0.8, 0.7)
+
+    with patch.object(reranker, "_reserve_slot", return_value=False):
+        assert reranker.rerank("query", nodes) == (nodes, False)
+    model.predict.assert_not_called()
+
+
+def test_rerank_failure():
+    """Test that original order is kept when reranking fails."""
+    model = MagicMock()
+    model.predict.side_effect = RuntimeError("model failure")
+    reranker = make_reranker(model)
+    nodes = make_nodes(0.8, 0.7)
+
+    assert reranker.rerank("query", nodes) == (nodes, False)
+    # slot is released after failed scoring
+    assert reranker._reserve_slot()
+
+
+def test_rerank_model_load_failure():
+    """Test that original order is kept when reranker model can't be loaded."""
+    reranker = CrossEncoderReranker(RerankerConfig(model_path="model", top_k=1))
+    nodes = make_nodes(0.8, 0.7)
+
+    with patch.object(reranker, "_get_model", side_effect=OSError("no model")):
+        assert reranker.rerank("query", nodes) == (nodes[:1], False)
+
+
+def test_rerank_after_shutdown():
+    """Test that original order is kept when reranker has been shut down."""
+    model = MagicMock()
+    reranker = make_reranker(model)
+    nodes = make_nodes(0.8, 0.7)
+
+    reranker.shutdown()
+    assert reranker.rerank("query", nodes) == (nodes, False)
+    model.predict.assert_not_called()
+    assert reranker._reserve_slot()
+
+
+def test_get_reranker():
+    """Test that reranker is shared until configuration changes."""
+    assert get_reranker(None) is None
+
+    reranker_config = RerankerConfig(model_path="model")
+    reranker = get_reranker(reranker_config)
+    assert get_reranker(reranker_config) is reranker
+
+    with patch.object(reranker, "shutdown") as shutdown:
+        other_reranker = get_reranker(RerankerConfig(model_path="model"))
+    assert other_reranker is not reranker
+    # executor of replaced reranker is shut down
+    shutdown.assert_called_once_with()
+
+
+def test_customized_rerank():
+    """Test that customized rerank uses configured reranker."""
+    nodes = make_nodes(0.8, 0.7)
+
+    # reranking is not configured
+    config.ols_config.reference_content = None
+    assert customized_reranker.rerank(nodes, query="query") == (nodes, True)
+
+    config.ols_config.reference_content = ReferenceContent(
+        {"reranker": {"model_path": "model"}}
+    )
+    with patch.object(
+        CrossEncoderReranker, "rerank", return_value=(nodes[1:], True)
+    ) as rerank:
+        assert customized_reranker.rerank(nodes, query="query") == (nodes[1:], True)
+    rerank.assert_called_once_with("query", nodes)
@@ -0,0 +1,39 @@
+"""Unit tests for cache of retrieval results."""
+
+from unittest.mock import MagicMock, patch
+
+from ols.src.rag_index.retrieval_cache import RetrievalCache
+from tests.mock_classes.mock_retrievers import MockRetriever
+
+
+def test_retrieval_cache():
+    """Test LRU cache of retrieval results with limited lifetime."""
+    cache = RetrievalCache(ttl=10, max_entries=2)
+    retriever = MagicMock(similarity_top_k=5, index_generation=3)
+
+    key = cache.key("  How to SCALE ", retriever)
+    assert key == ("how to scale", 5, 3)
+    # results of retrievers without index generation are not cached
+    assert cache.key("How to scale", MockRetriever()) is None
+
+    with patch("ols.src.rag_index.retrieval_cache.time.monotonic", return_value=100):
+        cache.put(key, [("1", 0.5)])
+        assert cache.get(key) == [("1", 0.5)]
+        cache.put(("second", 5, 3), [])
+        cache.get(key)
+        cache.put(("third", 5, 3), [])
+        assert len(cache) == 2
+        assert cache.get(("second", 5, 3)) is None
+
+    with patch("ols.src.rag_index.retrieval_cache.time.monotonic", return_value=110):
+        # expired
+        assert cache.get(key) is None
+        assert len(cache) == 1
+
+    cache.clear()
+    assert len(cache) == 0
+
+    # disabled cache
+    cache = RetrievalCache(ttl=0, max_entries=2)
+    cache.put(key, [])
+    assert cache.get(key) is None
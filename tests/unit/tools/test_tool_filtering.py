@@ -0,0 +1,167 @@
+"""Unit tests for tool filtering module."""
+
+from unittest.mock import MagicMock, patch
+
+from langchain_core.tools.structured import StructuredTool
+from pydantic import BaseModel
+
+from ols.app.models.config import ToolFilteringConfig
+from ols.src.rag_index.bm25_index import BM25Index, tokenize
+from ols.src.tools.tool_filtering import (
+    ToolFilter,
+    ToolRetriever,
+    get_tool_filter,
+)
+
+
+class FakeSchema(BaseModel):
+    """Fake schema for tools."""
+
+
+def make_tool(name: str, description: str) -> StructuredTool:
+    """Construct tool with given name and description."""
+    return StructuredTool(
+        name=name,
+        description=description,
+        func=lambda: name,
+        args_schema=FakeSchema,
+    )
+
+
+TOOLS = [
+    make_tool("get_namespaces", "List all namespaces in the cluster."),
+    make_tool("get_pods", "List pods running in the namespace."),
+    make_tool("get_nodes", "List nodes of the cluster and their status."),
+    make_tool("get_events", "Show recent events in the namespace."),
+]
+
+
+class FakeEmbedModel:
+    """Embedding model with one dimension per known word."""
+
+    WORDS = ("namespaces", "pods", "nodes", "events")
+
+    def _embed(self, text: str) -> list[float]:
+        terms = tokenize(text)
+        return [float(word in terms) for word in self.WORDS]
+
+    def get_text_embedding_batch(self, texts: list[str]) -> list[list[float]]:
+        """Embed documents."""
+        return [self._embed(text) for text in texts]
+
+    def get_query_embedding(self, query: str) -> list[float]:
+        """Embed query."""
+        return self._embed(query)
+
+
+def test_tokenize():
+    """Test splitting of text into terms."""
+    assert tokenize("get_pods\nList Pods, now!") == [
+        "get",
+        "pods",
+        "list",
+        "pods",
+        "now",
+    ]
+
+
+def test_bm25_index():
+    """Test BM25 scores documents with query terms higher."""
+    index = BM25Index.build({"0": "list pods", "1": "list nodes", "2": "show events"})
+
+    scores = index.scores("pods")
+    assert scores[0] > 0
+    assert scores[1] == scores[2] == 0
+
+    # rare terms are more important than common ones
+    scores = index.scores("list events")
+    assert scores[2] > scores[0] > 0
+
+
+def test_tool_retriever_sparse():
+    """Test tools retrieved by sparse retrieval only."""
+    retriever = ToolRetriever(TOOLS, ToolFilteringConfig(top_k=2))
+
+    tools = retriever.retrieve("which pods are running?")
+    assert [tool.name for tool in tools] == ["get_pods"]
+
+
+def test_tool_retriever_hybrid():
+    """Test tools retrieved by combination of dense and sparse retrieval."""
+    embed_model = FakeEmbedModel()
+    embeddings = embed_model.get_text_embedding_batch(
+        [f"{tool.name} {tool.description}" for tool in TOOLS]
+    )
+    retriever = ToolRetriever(
+        TOOLS, ToolFilteringConfig(alpha=1.0, top_k=2), embeddings
+    )
+
+    # dense retrieval only
+    tools = retriever.retrieve("nodes", embed_model.get_query_embedding("nodes"))
+    assert [tool.name for tool in tools] == ["get_nodes"]
+
+    # no dense score, the threshold filters out everything
+    tools = retriever.retrieve("nodes", [0.0, 0.0, 0.0, 0.0])
+    assert tools == []
+
+
+def test_tool_filter_small_catalog():
+    """Test that small catalogs are not filtered at all."""
+    tool_filter = ToolFilter(ToolFilteringConfig(top_k=10))
+
+    assert tool_filter.filter_tools("pods", TOOLS) is TOOLS
+
+
+def test_tool_filter():
+    """Test tool filter selects relevant tools and reuses the retriever."""
+    tool_filter = ToolFilter(ToolFilteringConfig(top_k=1))
+
+    assert tool_filter.filter_tools("show me recent events", TOOLS) == [TOOLS[3]]
+    retriever = tool_filter.get_retriever(TOOLS)
+    assert tool_filter.filter_tools("list namespaces", TOOLS) == [TOOLS[0]]
+    assert tool_filter.get_retriever(TOOLS) is retriever
+
+    # different catalog -> different retriever
+    assert tool_filter.get_retriever(TOOLS[:3]) is not retriever
+
+
+def test_tool_filter_nothing_relevant():
+    """Test that all tools are used when no tool is relevant to query."""
+    tool_filter = ToolFilter(ToolFilteringConfig(top_k=1))
+
+    assert tool_filter.filter_tools("hello", TOOLS) is TOOLS
+
+
+def test_tool_filter_with_embed_model():
+    """Test tool filter with embedding model."""
+    config = ToolFilteringConfig(embed_model_path="/models/embeddings", top_k=1)
+    embed_model = MagicMock(wraps=FakeEmbedModel())
+    with patch(
+        "llama_index.embeddings.huggingface.HuggingFaceEmbedding",
+        return_value=embed_model,
+    ) as mock_embedding:
+        tool_filter = ToolFilter(config)
+        assert tool_filter.filter_tools("nodes", TOOLS) == [TOOLS[2]]
+        assert tool_filter.filter_tools("pods", TOOLS[1:]) == [TOOLS[1]]
+
+    mock_embedding.assert_called_once_with(model_name="/models/embeddings")
+    # tools are embedded just once
+    assert embed_model.get_text_embedding_batch.call_count == 1
+
+
+def test_tool_filter_failure():
+    """Test that all tools are used when filtering fails."""
+    tool_filter = ToolFilter(ToolFilteringConfig(top_k=1))
+
+    with patch.object(tool_filter, "get_retriever", side_effect=Exception("error")):
+        assert tool_filter.filter_tools("pods", TOOLS) is TOOLS
+
+
+def test_get_tool_filter():
+    """Test tool filter is shared until configuration changes."""
+    assert get_tool_filter(None) is None
+
+    config = ToolFilteringConfig()
+    tool_filter = get_tool_filter(config)
+    assert get_tool_filter(config) is tool_filter
+    assert get_tool_filter(ToolFilteringConfig()) is not tool_filter
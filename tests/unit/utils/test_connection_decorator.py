@@ -1,53 +1,85 @@
 """Unit tests for the connection decorator."""
 
+from contextlib import contextmanager
+from typing import Any, Optional
+
 import pytest
 
 from ols.utils.connection_decorator import connection
 
 
+class ConnectionPool:
+    """Connection pool used to test connection decorator."""
+
+    def __init__(self):
+        """Initialize connection pool used to test connection decorator."""
+        self.borrowed = 0
+        self.returned = 0
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection."""
+        self.borrowed += 1
+        try:
+            yield f"connection-{self.borrowed}"
+        finally:
+            self.returned += 1
+
+
 class Connectable:
     """Class used to test connection decorator."""
 
     def __init__(self, raise_exception_from_foo: bool):
         """Initialize class used to test connection decorator."""
         self._raise_exception_from_foo = raise_exception_from_foo
-
-    def connected(self) -> bool:
-        """Predicate if connection is alive."""
-        return self._connected
-
-    def connect(self) -> None:
-        """Connect."""
-        self._connected = True
-
-    def disconnect(self) -> None:
-        """Disconnect."""
-        self._connected = False
+        self.connection_pool = ConnectionPool()
+        self.connection: Optional[Any] = None
 
     @connection
-    def foo(self) -> None:
+    def foo(self) -> Any:
         """Perform any action, but with active connection."""
         if self._raise_exception_from_foo:
             raise Exception("foo error!")
+        return self.connection
+
+    @connection
+    def bar(self) -> tuple[Any, Any]:
+        """Call other decorated method with active connection."""
+        return self.connection, self.foo()
 
 
 def test_connection_decorator():
     """Test the connection decorator."""
     c = Connectable(raise_exception_from_foo=False)
-    c.disconnect()
-    assert c.connected() is False
+    assert c.connection is None
+
+    # this method should borrow a connection
+    assert c.foo() == "connection-1"
+
+    # and the connection should be returned afterwards
+    assert c.connection is None
+    assert c.connection_pool.borrowed == 1
+    assert c.connection_pool.returned == 1
+
+
+def test_connection_decorator_nested_calls():
+    """Test that nested calls reuse the borrowed connection."""
+    c = Connectable(raise_exception_from_foo=False)
 
-    # this method should autoconnect
-    c.foo()
-    assert c.connected() is True
+    assert c.bar() == ("connection-1", "connection-1")
+
+    assert c.connection is None
+    assert c.connection_pool.borrowed == 1
+    assert c.connection_pool.returned == 1
 
 
 def test_connection_decorator_on_connection_exception():
     """Test the connection decorator."""
     c = Connectable(raise_exception_from_foo=True)
-    c.disconnect()
-    assert c.connected() is False
 
     with pytest.raises(Exception, match="foo error!"):
-        # this method should autoconnect
         c.foo()
+
+    # connection must be returned even in case of exception
+    assert c.connection is None
+    assert c.connection_pool.returned == 1
@@ -0,0 +1,187 @@
+"""Unit tests for the Postgres connection pool."""
+
+from unittest.mock import MagicMock, patch
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+import pytest
+
+from ols.app.models.config import PostgresConfig
+from ols.utils.connection_pool import (
+    ConnectionPool,
+    close_connection_pools,
+    get_connection_pool,
+)
+
+
+def test_pool_opens_min_connections():
+    """Test that minimal number of connections is opened in advance."""
+    with patch("psycopg2.connect") as mock_connect:
+        pool = ConnectionPool(PostgresConfig(pool_min_size=3))
+
+    assert mock_connect.call_count == 3
+    assert pool.size == 3
+    # connections are used in autocommit mode
+    assert mock_connect.return_value.autocommit is True
+
+
+def test_pool_reuses_connections():
+    """Test that returned connection is borrowed again."""
+    with patch("psycopg2.connect") as mock_connect:
+        pool = ConnectionPool(PostgresConfig())
+
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+
+    assert first is second
+    assert mock_connect.call_count == 1
+    # recently used connection is not checked before it is borrowed again
+    cursor = second.cursor.return_value.__enter__.return_value
+    cursor.execute.assert_not_called()
+
+
+def test_pool_checks_idle_connections():
+    """Test that connection idle for a while is checked before it is borrowed."""
+    with (
+        patch("psycopg2.connect"),
+        patch("ols.utils.connection_pool.POSTGRES_POOL_IDLE_CHECK_INTERVAL", 0),
+    ):
+        pool = ConnectionPool(PostgresConfig())
+
+        with pool.connection() as connection:
+            pass
+
+    cursor = connection.cursor.return_value.__enter__.return_value
+    cursor.execute.assert_called_once_with("SELECT 1")
+
+
+def test_pool_replaces_broken_connection():
+    """Test that broken idle connection is replaced by new one."""
+    broken = MagicMock()
+    cursor = broken.cursor.return_value.__enter__.return_value
+    cursor.execute.side_effect = psycopg2.OperationalError("connection closed")
+    fresh = MagicMock()
+
+    with (
+        patch("psycopg2.connect", side_effect=[broken, fresh]),
+        patch("ols.utils.connection_pool.POSTGRES_POOL_IDLE_CHECK_INTERVAL", 0),
+    ):
+        pool = ConnectionPool(PostgresConfig())
+
+        with pool.connection():
+            pass
+        with pool.connection() as connection:
+            assert connection is fresh
+
+    broken.close.assert_called_once_with()
+    assert pool.size == 1
+
+
+def test_pool_keeps_connection_on_exception():
+    """Test that connection is kept when a query fails while it is borrowed."""
+    with patch("psycopg2.connect") as mock_connect:
+        connection = mock_connect.return_value
+        connection.closed = 0
+        connection.get_transaction_status.return_value = (
+            psycopg2.extensions.TRANSACTION_STATUS_INERROR
+        )
+        pool = ConnectionPool(PostgresConfig())
+
+        with pytest.raises(psycopg2.DatabaseError), pool.connection():
+            raise psycopg2.DatabaseError("query failed")
+
+        # failed transaction is rolled back and the connection is reused
+        connection.rollback.assert_called_once_with()
+        connection.close.assert_not_called()
+        assert pool.size == 1
+        with pool.connection() as reused:
+            assert reused is connection
+        assert mock_connect.call_count == 1
+
+
+@pytest.mark.parametrize(
+    ("error", "closed"),
+    [
+        (psycopg2.OperationalError("server closed the connection"), 0),
+        (psycopg2.InterfaceError("connection already closed"), 0),
+        (ValueError("invalid value"), 2),
+    ],
+)
+def test_pool_discards_broken_connection_on_exception(error, closed):
+    """Test that connection is closed when it breaks while it is borrowed."""
+    with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.closed = closed
+        pool = ConnectionPool(PostgresConfig())
+
+        with pytest.raises(type(error)), pool.connection():
+            raise error
+
+        mock_connect.return_value.close.assert_called_once_with()
+        assert pool.size == 0
+
+        # new connection is opened on demand
+        with pool.connection():
+            pass
+        assert mock_connect.call_count == 2
+
+
+def test_pool_timeout():
+    """Test that borrowing fails when all connections are in use."""
+    config = PostgresConfig(pool_min_size=0, pool_max_size=1, pool_timeout=0.01)
+    with patch("psycopg2.connect"):
+        pool = ConnectionPool(config)
+
+        with pool.connection():
+            with (
+                pytest.raises(psycopg2.pool.PoolError, match="No free connection"),
+                pool.connection(),
+            ):
+                pass
+
+        # connection is available again
+        with pool.connection():
+            pass
+
+
+def test_pool_ready():
+    """Test the pool readiness check."""
+    with patch("psycopg2.connect") as mock_connect:
+        pool = ConnectionPool(PostgresConfig(pool_min_size=0))
+        assert pool.ready()
+
+        mock_connect.side_effect = psycopg2.OperationalError("connection refused")
+        pool.close()
+        assert not pool.ready()
+
+
+def test_shared_connection_pools():
+    """Test that pools are shared between users of the same database."""
+    with patch("psycopg2.connect"):
+        pool = get_connection_pool(PostgresConfig())
+        assert get_connection_pool(PostgresConfig()) is pool
+        assert get_connection_pool(PostgresConfig(dbname="other")) is not pool
+
+        close_connection_pools()
+        assert pool.size == 0
+        assert get_connection_pool(PostgresConfig()) is not pool
+
+
+@pytest.mark.parametrize("use_ca_cert", [True, False])
+def test_pool_uses_ca_cert(use_ca_cert, tmp_path):
+    """Test that CA certificate is used for connections only when requested."""
+    ca_cert_path = tmp_path / "ca.crt"
+    ca_cert_path.touch()
+    config = PostgresConfig(ca_cert_path=ca_cert_path)
+    with patch("psycopg2.connect") as mock_connect:
+        pool = get_connection_pool(config, use_ca_cert)
+        with pool.connection():
+            pass
+        # pools with and without CA certificate are not shared
+        assert get_connection_pool(config, not use_ca_cert) is not pool
+        close_connection_pools()
+
+    expected = ca_cert_path if use_ca_cert else None
+    assert mock_connect.call_args_list[0].kwargs["sslrootcert"] == expected
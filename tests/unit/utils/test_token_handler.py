@@ -6,8 +6,18 @@ from unittest import TestCase, mock
 import pytest
 from langchain_core.messages import AIMessage, HumanMessage
 
-from ols.constants import TOKEN_BUFFER_WEIGHT
-from ols.utils.token_handler import PromptTooLongError, TokenHandler
+from ols.constants import (
+    DEFAULT_TOKENIZER_MODEL,
+    MESSAGE_TOKEN_COUNT_KEY,
+    RAG_CHUNK_TOKEN_COUNT_KEY,
+    TOKEN_BUFFER_WEIGHT,
+)
+from ols.utils.token_handler import (
+    PromptTooLongError,
+    TokenCountCache,
+    TokenHandler,
+    token_count_cache,
+)
 from tests.mock_classes.mock_retrieved_node import MockRetrievedNode
 
 
@@ -176,6 +186,53 @@ class TestTokenHandler(TestCase):
         assert len(rag_chunks) == 1
         assert available_tokens == 1
 
+    @mock.patch("ols.utils.token_handler.TOKEN_BUFFER_WEIGHT", 1.05)
+    @mock.patch("ols.utils.token_handler.MINIMUM_CONTEXT_TOKEN_LIMIT", 1)
+    @mock.patch("ols.utils.token_handler.RAG_SIMILARITY_CUTOFF", 0.4)
+    def test_token_handler_precomputed_token_counts(self):
+        """Test that chunks with precomputed token count are not tokenized."""
+        retrieved_nodes = self._mock_retrieved_obj[:3]
+        counts = self._token_handler_obj.chunk_token_counts(
+            [node.get_text() for node in retrieved_nodes]
+        )
+        for node, count in zip(retrieved_nodes, counts):
+            node.metadata[RAG_CHUNK_TOKEN_COUNT_KEY] = count
+
+        with mock.patch.object(
+            self._token_handler_obj, "text_to_tokens"
+        ) as text_to_tokens:
+            rag_chunks, available_tokens = self._token_handler_obj.truncate_rag_context(
+                retrieved_nodes
+            )
+            text_to_tokens.assert_not_called()
+
+        assert len(rag_chunks) == 3
+        for i in range(3):
+            assert rag_chunks[i].text == "Document:\n" + retrieved_nodes[i].get_text()
+        # the same budget as when the chunks are tokenized
+        assert available_tokens == 473
+
+    @mock.patch("ols.utils.token_handler.TOKEN_BUFFER_WEIGHT", 1.05)
+    @mock.patch("ols.utils.token_handler.MINIMUM_CONTEXT_TOKEN_LIMIT", 4)
+    @mock.patch("ols.utils.token_handler.RAG_SIMILARITY_CUTOFF", 0.4)
+    def test_token_handler_precomputed_token_counts_token_limit(self):
+        """Test that chunk with precomputed token count is truncated when needed."""
+        counts = self._token_handler_obj.chunk_token_counts(
+            [node.get_text() for node in self._mock_retrieved_obj]
+        )
+        for node, count in zip(self._mock_retrieved_obj, counts):
+            node.metadata[RAG_CHUNK_TOKEN_COUNT_KEY] = count
+
+        rag_chunks, available_tokens = self._token_handler_obj.truncate_rag_context(
+            self._mock_retrieved_obj, 13
+        )
+        assert len(rag_chunks) == 2
+        assert (
+            rag_chunks[1].text
+            == "Document:\n" + self._mock_retrieved_obj[1].get_text()[:6]
+        )
+        assert available_tokens == 0
+
     def test_token_handler_empty(self):
         """Test token handler when node is empty."""
         rag_chunks, available_tokens = self._token_handler_obj.truncate_rag_context(
@@ -382,3 +439,105 @@ class TestTokenHandler(TestCase):
 
         assert result == output
         assert was_truncated is False
+
+    @mock.patch("ols.utils.token_handler.TOKEN_BUFFER_WEIGHT", 1.05)
+    def test_limit_conversation_history_stored_token_counts(self):
+        """Check that token counts stored with history messages are used."""
+        history = [HumanMessage("first message"), AIMessage("first answer")] * 3
+        for message in history:
+            message.response_metadata[MESSAGE_TOKEN_COUNT_KEY] = 10
+
+        with mock.patch.object(self._token_handler_obj, "_encoder") as encoder:
+            # every message needs ceil(10 * 1.05) + 1 = 12 tokens
+            truncated_history, truncated = (
+                self._token_handler_obj.limit_conversation_history(history, 36)
+            )
+            encoder.encode.assert_not_called()
+            encoder.encode_batch.assert_not_called()
+
+        assert truncated_history == history[3:]
+        assert truncated
+
+    def test_history_message_token_counts(self):
+        """Check that history messages are counted as they are used in history."""
+        messages = [HumanMessage("  first message\n"), AIMessage("first answer")]
+        counts = self._token_handler_obj.history_message_token_counts(messages)
+
+        assert counts == [
+            len(self._token_handler_obj.text_to_tokens("human: first message")),
+            len(self._token_handler_obj.text_to_tokens("ai: first answer")),
+        ]
+        assert [
+            self._token_handler_obj.history_message_token_count(message)
+            for message in messages
+        ] == counts
+
+    def test_encoder_is_shared(self):
+        """Test that token handlers share the encoder."""
+        assert TokenHandler()._encoder is self._token_handler_obj._encoder
+
+    def test_count_tokens(self):
+        """Test that token counts are remembered."""
+        text = "What is Kubernetes?"
+        expected = len(self._token_handler_obj.text_to_tokens(text))
+
+        assert self._token_handler_obj.count_tokens(text) == expected
+        key = TokenCountCache.key(DEFAULT_TOKENIZER_MODEL, text)
+        assert token_count_cache.get(key) == expected
+
+        # remembered count is used without encoding the text again
+        with mock.patch.object(self._token_handler_obj, "_encoder") as encoder:
+            assert self._token_handler_obj.count_tokens(text) == expected
+            encoder.encode.assert_not_called()
+
+    def test_count_tokens_without_memoization(self):
+        """Test that token count is not remembered when memoization is off."""
+        text = "What is OpenShift Lightspeed?"
+        expected = len(self._token_handler_obj.text_to_tokens(text))
+
+        assert self._token_handler_obj.count_tokens(text, memoize=False) == expected
+        key = TokenCountCache.key(DEFAULT_TOKENIZER_MODEL, text)
+        assert token_count_cache.get(key) is None
+
+    def test_count_tokens_batch(self):
+        """Test counting tokens of many texts."""
+        texts = ["first text", "second longer text", "", "first text"]
+        expected = [len(self._token_handler_obj.text_to_tokens(t)) for t in texts]
+
+        assert (
+            self._token_handler_obj.count_tokens_batch(texts, memoize=False) == expected
+        )
+        assert self._token_handler_obj.count_tokens_batch(texts) == expected
+        assert self._token_handler_obj.count_tokens_batch([]) == []
+
+    @mock.patch("ols.utils.token_handler.TOKEN_BUFFER_WEIGHT", 1.1)
+    def test_approximate_token_count(self):
+        """Test that approximate token count includes buffer."""
+        text = "What is Kubernetes?"
+        tokens = self._token_handler_obj.text_to_tokens(text)
+        assert self._token_handler_obj.approximate_token_count(text) == ceil(
+            len(tokens) * 1.1
+        )
+
+
+def test_token_count_cache_eviction():
+    """Test that the least recently used counts are evicted."""
+    cache = TokenCountCache(max_entries=2)
+    keys = [TokenCountCache.key(DEFAULT_TOKENIZER_MODEL, t) for t in "abc"]
+
+    cache.put(keys[0], 1)
+    cache.put(keys[1], 2)
+    # touch first count, so the second one is the least recently used one
+    assert cache.get(keys[0]) == 1
+    cache.put(keys[2], 3)
+
+    assert len(cache) == 2
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == 1
+    assert cache.get(keys[2]) == 3
+
+    # the same text counted by different tokenizer model is a different entry
+    assert TokenCountCache.key("other", "a") != keys[0]
+
+    cache.clear()
+    assert len(cache) == 0